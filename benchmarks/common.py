@@ -0,0 +1,88 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The benchmarks run against a throw-away SQLite database so they can be executed
+without Postgres or Redis: ``python -m benchmarks.<name>``.
+"""
+import random
+import statistics
+import string
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.entity.models import Base, Contact, User
+
+BENCH_DATABASE_URL = "sqlite+aiosqlite:///./bench.db"
+
+
+async def make_session_maker(url: str = BENCH_DATABASE_URL):
+    """
+    Create a fresh schema and return ``(engine, session_maker)``.
+    """
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    return engine, session_maker
+
+
+async def seed_user(session_maker, email: str = "bench@example.com") -> User:
+    async with session_maker() as session:
+        user = User(username="bench", email=email, password="x", confirmed=True)
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+def random_contact(user_id: int, n: int, rnd: random.Random) -> dict:
+    name = "".join(rnd.choices(string.ascii_lowercase, k=8)).capitalize()
+    return {
+        "name": name,
+        "surname": "".join(rnd.choices(string.ascii_lowercase, k=10)).capitalize(),
+        "email": f"{name.lower()}.{n}@example.com",
+        "phone": f"+380{n:09d}",
+        "birthday": date(1950, 1, 1) + timedelta(days=rnd.randrange(365 * 60)),
+        "additional_data": None,
+        "user_id": user_id,
+    }
+
+
+async def seed_contacts(session_maker, user_id: int, count: int, batch: int = 10_000, seed: int = 42):
+    """
+    Bulk insert ``count`` random contacts for ``user_id``.
+    """
+    rnd = random.Random(seed)
+    async with session_maker() as session:
+        for start in range(0, count, batch):
+            rows = [random_contact(user_id, n, rnd) for n in range(start, min(start + batch, count))]
+            await session.execute(insert(Contact), rows)
+        await session.commit()
+
+
+async def measure(fn, repeat: int = 20) -> dict:
+    """
+    Await ``fn()`` ``repeat`` times and return latency statistics in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def print_table(title: str, rows: list[tuple]):
+    print(f"\n{title}")
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
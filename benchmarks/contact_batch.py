@@ -0,0 +1,71 @@
+"""
+Syncing a set of contact edits: one PATCH or DELETE per contact, each with its own commit, against
+a single ``POST /contacts/batch`` transaction, with a simulated network round trip to the database.
+
+The HTTP and authentication cost each separate request pays on top is not included.
+
+Usage::
+
+    python -m benchmarks.contact_batch [rtt_ms] [operations ...]
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, print_table
+from benchmarks.contact_writes import RoundTrips
+from src.repository import contacts as repository_contacts
+from src.schemas.contact import BatchDelete, BatchUpdate, ContactUpdateShema
+
+
+def operations(first_id: int, count: int) -> list:
+    # Four updates for every delete, like a typical sync.
+    return [BatchDelete(op="delete", id=contact_id) if n % 5 == 4 else
+            BatchUpdate(op="update", id=contact_id, contact=ContactUpdateShema(name=f"Synced {n}"))
+            for n, contact_id in enumerate(range(first_id, first_id + count))]
+
+
+async def one_by_one(batch: list, user, session_maker):
+    for op in batch:
+        async with session_maker() as db:
+            if op.op == "delete":
+                await repository_contacts.delete_contact(op.id, user, db)
+            else:
+                await repository_contacts.patch_contact(op.id, op.contact, user, db)
+
+
+async def batched(batch: list, user, session_maker):
+    async with session_maker() as db:
+        await repository_contacts.apply_batch(batch, user, db)
+
+
+async def main(rtt_ms: float = 1.0, *sizes: int):
+    sizes = sizes or (10, 100, 500)
+    engine, _ = await make_session_maker()
+    session_maker = async_sessionmaker(engine, autoflush=False, autocommit=False)
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, 2 * sum(sizes))
+    round_trips = RoundTrips(engine, rtt_ms / 1000)
+
+    rows = [("operations", "path", "ms", "round trips")]
+    first_id = 1
+    # Writes do not pin or invalidate anything here: there is no Redis in the benchmark.
+    with patch.object(repository_contacts, "after_write"):
+        for size in sizes:
+            for label, fn in (("one request each", one_by_one), ("POST /contacts/batch", batched)):
+                round_trips.count = 0
+                started = time.perf_counter()
+                await fn(operations(first_id, size), user, session_maker)
+                elapsed = time.perf_counter() - started
+                rows.append((size, label, round(elapsed * 1000, 1), round_trips.count))
+                first_id += size
+
+    await engine.dispose()
+    print_table(f"contact sync, {rtt_ms} ms simulated round trip", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(float, sys.argv[1:2]), *map(int, sys.argv[2:])))
@@ -0,0 +1,116 @@
+"""
+Contact update and delete latency: the former SELECT, mutate, commit and refresh path against
+``UPDATE/DELETE ... RETURNING``, with a simulated network round trip to the database.
+
+Usage::
+
+    python -m benchmarks.contact_writes [rtt_ms] [contacts]
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, measure, print_table
+from src.entity.models import Contact
+from src.repository import contacts as repository_contacts
+from src.schemas.contact import ContactShema, ContactUpdateShema
+
+
+async def legacy_update_contact(contact_id: int, contact: ContactShema, user, db):
+    """
+    The previous implementation, kept for comparison.
+    """
+    stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+    result = await db.execute(stmt)
+    contact_in_db = result.scalars().unique().first()
+    if not contact_in_db:
+        return None
+    contact_in_db.name = contact.name
+    contact_in_db.surname = contact.surname
+    contact_in_db.email = contact.email
+    contact_in_db.phone = contact.phone
+    if contact.birthday:
+        contact_in_db.birthday = contact.birthday
+    await db.commit()
+    await db.refresh(contact_in_db)
+    return contact_in_db
+
+
+async def legacy_delete_contact(contact_id: int, user, db):
+    stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+    result = await db.execute(stmt)
+    contact_in_db = result.scalars().unique().first()
+    if not contact_in_db:
+        return None
+    await db.delete(contact_in_db)
+    await db.commit()
+    return contact_in_db
+
+
+class RoundTrips:
+    """
+    Sleeps for ``rtt`` seconds on every statement and commit, and counts them.
+    """
+
+    def __init__(self, engine, rtt: float):
+        self.rtt = rtt
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.statement)
+        event.listen(engine.sync_engine, "commit", self.commit)
+
+    def statement(self, *args):
+        self.count += 1
+        time.sleep(self.rtt)
+
+    def commit(self, *args):
+        self.count += 1
+        time.sleep(self.rtt)
+
+
+async def main(rtt_ms: float = 1.0, count: int = 10_000):
+    engine, _ = await make_session_maker()
+    # Same session settings as the application, expire_on_commit included.
+    session_maker = async_sessionmaker(engine, autoflush=False, autocommit=False)
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, count)
+    names = iter(range(10 ** 9))
+
+    def body():
+        # A new value every call, so the legacy path always flushes an UPDATE.
+        return ContactShema(name=f"Bench {next(names)}", surname="Mark", email="bench.mark@example.com",
+                            phone="+380000000001")
+
+    round_trips = RoundTrips(engine, rtt_ms / 1000)
+    ids = iter(range(1, count + 1))
+    repeat = 50
+
+    async def run(label, fn):
+        round_trips.count = 0
+        async with session_maker() as db:
+            stats = await measure(lambda: fn(db), repeat=repeat)
+        rows.append((label, stats["median_ms"], stats["p95_ms"], round(round_trips.count / repeat, 1)))
+
+    rows = [("operation", "median ms", "p95 ms", "round trips")]
+    # Writes do not pin or invalidate anything here: there is no Redis in the benchmark.
+    with patch.object(repository_contacts, "after_write"):
+        await run("update: select + commit + refresh",
+                  lambda db: legacy_update_contact(1, body(), user, db))
+        await run("update: UPDATE ... RETURNING",
+                  lambda db: repository_contacts.update_contact(1, body(), user, db))
+        await run("patch: UPDATE ... RETURNING one column",
+                  lambda db: repository_contacts.patch_contact(1, ContactUpdateShema(name=body().name), user, db))
+        await run("delete: select + delete + commit",
+                  lambda db: legacy_delete_contact(next(ids) + 1, user, db))
+        await run("delete: DELETE ... RETURNING",
+                  lambda db: repository_contacts.delete_contact(next(ids) + 1, user, db))
+
+    await engine.dispose()
+    print_table(f"contact writes, {rtt_ms} ms simulated round trip", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(float, sys.argv[1:2]), *map(int, sys.argv[2:3])))
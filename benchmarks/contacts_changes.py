@@ -0,0 +1,63 @@
+"""
+Keeping a client in sync after a few edits: reading ``GET /api/contacts/changes`` from the
+previous cursor against re-downloading the address book in cursor pages.
+
+Usage::
+
+    python -m benchmarks.contacts_changes [contacts] [changed]
+"""
+import asyncio
+import sys
+from datetime import timedelta
+from unittest.mock import patch
+
+from sqlalchemy import update
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, measure, print_table
+from src.entity.models import Contact
+from src.repository import contacts as repository_contacts
+
+PAGE_SIZE = 1000
+
+
+async def main(count: int = 100_000, changed: int = 50):
+    engine, session_maker = await make_session_maker()
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, count)
+
+    async with session_maker() as db:
+        now = await repository_contacts._db_now(db)
+        # Everything was synced an hour ago, then ``changed`` contacts were edited a minute ago.
+        await db.execute(update(Contact).values(updated_at=now - timedelta(hours=1)))
+        await db.commit()
+        with patch.object(repository_contacts.config, "CHANGES_SETTLE_SECONDS", 1800):
+            _, cursor, _ = await repository_contacts.get_changes(since=None, limit=count, user=user, db=db)
+        step = count // changed
+        await db.execute(update(Contact).where(Contact.id % step == 0)
+                         .values(updated_at=now - timedelta(minutes=1)))
+        await db.commit()
+
+        async def changes():
+            contacts, _, _ = await repository_contacts.get_changes(since=cursor, limit=PAGE_SIZE, user=user, db=db)
+            assert len(contacts) == changed, len(contacts)
+
+        async def full_download():
+            after = None
+            while True:
+                _, after = await repository_contacts.get_contacts_page(limit=PAGE_SIZE, after=after, query=None,
+                                                                      sort="id", db=db, user=user)
+                if after is None:
+                    return
+
+        rows = [("sync", "median ms", "p95 ms")]
+        for label, fn, repeat in (("GET /contacts/changes?since=", changes, 50),
+                                  ("re-download in cursor pages", full_download, 3)):
+            stats = await measure(fn, repeat=repeat)
+            rows.append((label, stats["median_ms"], stats["p95_ms"]))
+
+    await engine.dispose()
+    print_table(f"sync after {changed} edits, {count} contacts", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
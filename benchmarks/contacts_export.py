@@ -0,0 +1,68 @@
+"""
+Contact export throughput and peak Python memory, streamed from a server-side cursor, against
+loading every contact as an ORM object first.
+
+Usage::
+
+    python -m benchmarks.contacts_export [rows ...]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, print_table
+from src.entity.models import Contact
+from src.services import contacts_io
+
+# Loading everything is only measured up to this size, beyond it the point is made.
+ORM_MAX_ROWS = 100_000
+
+
+async def traced(coro_fn) -> tuple[float, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await coro_fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+async def main(*sizes: int):
+    sizes = sizes or (100_000, 1_000_000)
+    table = [("rows", "path", "seconds", "rows/s", "peak MiB", "MiB sent")]
+    for rows in sizes:
+        engine, session_maker = await make_session_maker()
+        user = await seed_user(session_maker)
+        await seed_contacts(session_maker, user.id, rows)
+
+        for fmt in contacts_io.ENCODERS:
+            async def stream():
+                size = 0
+                async for chunk in contacts_io.export_contacts(fmt, user, session_maker):
+                    size += len(chunk)
+                return size
+
+            elapsed, peak, size = await traced(stream)
+            table.append((rows, f"stream {fmt}", round(elapsed, 2), round(rows / elapsed),
+                          round(peak / 2 ** 20, 2), round(size / 2 ** 20, 1)))
+
+        if rows <= ORM_MAX_ROWS:
+            async def load_all():
+                async with session_maker() as session:
+                    contacts = (await session.execute(select(Contact).where(Contact.user_id == user.id)
+                                                      .order_by(Contact.id))).scalars().all()
+                    return len(contacts_io.encode_csv([contact.__dict__ for contact in contacts]))
+
+            elapsed, peak, size = await traced(load_all)
+            table.append((rows, "ORM load csv", round(elapsed, 2), round(rows / elapsed),
+                          round(peak / 2 ** 20, 2), round(size / 2 ** 20, 1)))
+        await engine.dispose()
+    print_table("Contact export, batches of EXPORT_BATCH_SIZE rows", table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
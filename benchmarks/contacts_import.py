@@ -0,0 +1,59 @@
+"""
+Contact import throughput and peak Python memory for growing CSV files, to check that memory
+stays flat with the file size.
+
+Usage::
+
+    python -m benchmarks.contacts_import [rows ...]
+"""
+import asyncio
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from benchmarks.common import make_session_maker, seed_user, random_contact, print_table
+from src.repository import contacts as repository_contacts
+from src.services import contacts_io
+
+
+def write_csv(rows: int) -> str:
+    rnd = random.Random(7)
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=contacts_io.CONTACT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for n in range(rows):
+            writer.writerow(random_contact(0, n, rnd))
+    return path
+
+
+async def main(*sizes: int):
+    sizes = sizes or (5_000, 20_000)
+    table = [("rows", "seconds", "rows/s", "peak MiB")]
+    for rows in sizes:
+        engine, session_maker = await make_session_maker()
+        user = await seed_user(session_maker)
+        path = write_csv(rows)
+        job = {"job_id": "bench", "user_id": user.id, "format": "csv", "status": "queued", "processed": 0,
+               "created": 0, "skipped": 0, "failed": 0, "errors": []}
+        # No Redis in the benchmark: job state and cache invalidation are skipped.
+        with patch.object(contacts_io, "_save_job"), patch.object(repository_contacts, "after_write"):
+            tracemalloc.start()
+            started = time.perf_counter()
+            await contacts_io.run_import(job, path, user, session_maker)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        assert job["status"] == "done" and job["created"] == rows, job
+        table.append((rows, round(elapsed, 2), round(rows / elapsed), round(peak / 2 ** 20, 2)))
+        await engine.dispose()
+    print_table("CSV import, batches of IMPORT_BATCH_SIZE rows", table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
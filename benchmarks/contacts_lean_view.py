@@ -0,0 +1,60 @@
+"""
+Payload size, query time and serialization time of one page of ``GET /api/contacts`` in the full
+view, which joins and embeds the owner in every contact, against ``view=lean``.
+
+Serialization goes through the same code the route uses: FastAPI's response model handling and
+``JSONResponse`` for the full view, the pydantic adapter for the lean one.
+
+Usage::
+
+    python -m benchmarks.contacts_lean_view [page_size]
+"""
+import asyncio
+import sys
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, measure, print_table
+from src.repository import contacts as repository_contacts
+from src.routes.contacts import LEAN_LIST
+from src.schemas.contact import ContactPage, ContactResponse
+
+
+async def main(page_size: int = 1000):
+    engine, session_maker = await make_session_maker()
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, page_size)
+    field = create_model_field("response", list[ContactResponse] | ContactPage, mode="serialization")
+
+    async with session_maker() as db:
+        async def query_full():
+            return await repository_contacts.get_contacts(limit=page_size, offset=0, query=None, db=db, user=user)
+
+        async def query_lean():
+            return await repository_contacts.get_contacts(limit=page_size, offset=0, query=None, db=db, user=user,
+                                                          lean=True)
+
+        full, lean = await query_full(), await query_lean()
+
+        async def serialize_full():
+            content = await serialize_response(field=field, response_content=full)
+            return JSONResponse(content).body
+
+        async def serialize_lean():
+            return LEAN_LIST.dump_json(LEAN_LIST.validate_python(lean))
+
+        rows = [("view", "query ms", "serialize ms", "payload KiB")]
+        for label, query, serialize in (("full", query_full, serialize_full), ("lean", query_lean, serialize_lean)):
+            query_stats = await measure(query)
+            serialize_stats = await measure(serialize)
+            rows.append((label, query_stats["median_ms"], serialize_stats["median_ms"],
+                         round(len(await serialize()) / 1024, 1)))
+
+    await engine.dispose()
+    print_table(f"GET /api/contacts, {page_size} contacts per page", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,53 @@
+"""
+Page-1000 latency of ``GET /api/contacts`` in offset and cursor mode.
+
+Usage::
+
+    python -m benchmarks.contacts_pagination [contacts] [page_size]
+"""
+import asyncio
+import sys
+
+from sqlalchemy import select
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, measure, print_table
+from src.entity.models import Contact
+from src.repository import contacts as repository_contacts
+
+PAGE = 1000
+
+
+async def main(count: int = 200_000, page_size: int = 100):
+    engine, session_maker = await make_session_maker()
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, count)
+    offset = (PAGE - 1) * page_size
+
+    rows = []
+    async with session_maker() as db:
+        for sort, order_by in (("id", (Contact.id,)), ("name", (Contact.name, Contact.id))):
+            # Cursor pointing at the last row of page 999, i.e. what the client would hold.
+            stmt = select(Contact).where(Contact.user_id == user.id).order_by(*order_by).offset(offset - 1).limit(1)
+            last = (await db.execute(stmt)).scalars().first()
+            cursor = repository_contacts.encode_cursor(sort, last)
+
+            async def cursor_page():
+                await repository_contacts.get_contacts_page(limit=page_size, after=cursor, query=None, sort=sort,
+                                                            db=db, user=user)
+
+            stats = await measure(cursor_page)
+            rows.append((f"cursor sort={sort}", stats["median_ms"], stats["p95_ms"]))
+
+        async def offset_page():
+            await repository_contacts.get_contacts(limit=page_size, offset=offset, query=None, db=db, user=user)
+
+        stats = await measure(offset_page)
+        rows.insert(0, ("offset", stats["median_ms"], stats["p95_ms"]))
+
+    await engine.dispose()
+    print_table(f"page {PAGE} of {page_size} contacts, {count} contacts total",
+                [("mode", "median ms", "p95 ms")] + rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,86 @@
+"""
+Login storm: latency of an unrelated endpoint while many logins with bad passwords are in flight,
+with bcrypt verification on the event loop against the bounded hashing pool.
+
+Usage::
+
+    python -m benchmarks.login_storm [concurrent_logins] [probes]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import make_session_maker, seed_user, print_table
+from main import app
+from src.database.db import get_db
+from src.services import hashing
+from src.services.auth import auth_service
+
+
+async def inline_verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    The previous behaviour: bcrypt runs on the event loop and blocks every other request.
+    """
+    return hashing.verify_and_update(plain_password, hashed_password)
+
+
+async def storm(client: httpx.AsyncClient, email: str, logins: int, probes: int) -> dict:
+    async def login():
+        response = await client.post("/api/auth/login", data={"username": email, "password": "wrong"})
+        return response.status_code
+
+    async def probe():
+        latencies = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            await client.get("/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+        return sorted(latencies)
+
+    codes, latencies = await asyncio.gather(asyncio.gather(*(login() for _ in range(logins))), probe())
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2),
+        "rejected": sum(code == 503 for code in codes),
+    }
+
+
+async def main(logins: int = 200, probes: int = 100):
+    engine, session_maker = await make_session_maker()
+    user = await seed_user(session_maker)
+    async with session_maker() as session:
+        user = await session.merge(user)
+        user.password = hashing.hash_password("secret")
+        await session.commit()
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    rows = [("password verification", "probe p50 ms", "probe p99 ms", "503 responses")]
+    # No lifespan: the rate limiter and Redis are not needed by the login failure path or the probe.
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        original = auth_service.verify_and_update
+        auth_service.verify_and_update = inline_verify_and_update
+        try:
+            stats = await storm(client, user.email, logins, probes)
+        finally:
+            auth_service.verify_and_update = original
+        rows.append(("inline on the event loop", stats["p50_ms"], stats["p99_ms"], stats["rejected"]))
+
+        pool = hashing.hashing_pool
+        stats = await storm(client, user.email, logins, probes)
+        rows.append((f"{pool.kind} pool, {pool.workers} workers, {pool.max_pending} pending",
+                     stats["p50_ms"], stats["p99_ms"], stats["rejected"]))
+    app.dependency_overrides.clear()
+    hashing.hashing_pool.shutdown()
+    await engine.dispose()
+    print_table(f"login storm, {logins} concurrent bad-password logins", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,85 @@
+"""
+Per-request cost of ``MetricsMiddleware``, against no metrics and against updating the
+prometheus_client metrics directly on every request, which takes a lock for the label lookup and
+for every value (and writes to an mmapped file per value in multiprocess mode).
+
+The last column is what ``Metrics.sync`` then costs per request, paid once per sync interval
+instead of inside the request.
+
+Usage::
+
+    python -m benchmarks.metrics_overhead [requests]
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from starlette.responses import Response
+
+from benchmarks.common import print_table
+from benchmarks.user_agent_ban import run
+from src.middleware.metrics import MetricsMiddleware
+from src.services.metrics import LATENCY, REQUESTS, Metrics, route_template
+
+PATH = "/api/contacts/1"
+
+
+class DirectMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+
+
+def make_app(middleware: str, recorder: Metrics):
+    app = FastAPI()
+
+    @app.get("/api/contacts/{contact_id}")
+    async def contact(contact_id: int):
+        return Response()
+
+    if middleware == "prometheus_client per request":
+        app.add_middleware(DirectMetricsMiddleware)
+    elif middleware == "MetricsMiddleware":
+        app.add_middleware(MetricsMiddleware, metrics=recorder)
+    return app
+
+
+async def main(requests: int = 20_000):
+    user_agents = [b"Mozilla/5.0"] * requests
+
+    rows = [("middleware", "us/request", "overhead us", "sync us/request")]
+    baseline = None
+    for label in ("none", "prometheus_client per request", "MetricsMiddleware"):
+        recorder = Metrics()
+        app = make_app(label, recorder)
+        await run(app, user_agents[:1000], path=PATH)
+        recorder.sync()
+        per_request = await run(app, user_agents, path=PATH) / requests * 1e6
+        baseline = per_request if baseline is None else baseline
+        started = time.perf_counter()
+        recorder.sync()
+        sync = (time.perf_counter() - started) / requests * 1e6 if label == "MetricsMiddleware" else 0
+        rows.append((label, round(per_request, 1), round(per_request - baseline, 1), round(sync, 2)))
+
+    print_table(f"request metrics, {requests} requests", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,45 @@
+"""
+Password verification cost per hashing configuration, to pick ``PASSWORD_SCHEMES``, ``BCRYPT_ROUNDS``
+and the ``ARGON2_*`` settings.
+
+Usage::
+
+    python -m benchmarks.password_hashing [repeat]
+"""
+import statistics
+import sys
+import time
+
+from benchmarks.common import print_table
+from src.services.hashing import build_context
+
+# (label, scheme, bcrypt rounds, argon2 time cost, argon2 memory KiB, argon2 parallelism)
+CONFIGURATIONS = [
+    ("bcrypt, rounds 10", "bcrypt", 10, 2, 19456, 1),
+    ("bcrypt, rounds 12 (default)", "bcrypt", 12, 2, 19456, 1),
+    ("bcrypt, rounds 13", "bcrypt", 13, 2, 19456, 1),
+    ("argon2id, t=2, m=19 MiB, p=1", "argon2", 12, 2, 19456, 1),
+    ("argon2id, t=3, m=12 MiB, p=1", "argon2", 12, 3, 12288, 1),
+    ("argon2id, t=1, m=46 MiB, p=1", "argon2", 12, 1, 47104, 1),
+    ("argon2id, t=1, m=64 MiB, p=4", "argon2", 12, 1, 65536, 4),
+]
+
+
+def main(repeat: int = 10):
+    rows = [("configuration", "verify median ms", "verify p95 ms")]
+    for label, scheme, rounds, time_cost, memory_cost, parallelism in CONFIGURATIONS:
+        context = build_context([scheme], rounds, time_cost, memory_cost, parallelism)
+        hashed = context.hash("correct horse battery staple")
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            context.verify("correct horse battery staple", hashed)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        rows.append((label, round(statistics.median(samples), 2),
+                     round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2)))
+    print_table(f"password verification, {repeat} runs each", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+Cost of ``ProfilerMiddleware``: for requests that are not profiled, and for profiled requests to
+a route spending 20 ms on the CPU, at the default sampling interval.
+
+Usage::
+
+    python -m benchmarks.request_profiler [requests]
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from starlette.responses import Response
+
+from benchmarks.common import print_table
+from benchmarks.user_agent_ban import run
+from src.middleware.profiler import ProfilerMiddleware
+from src.services.profiler import ProfileStore, sign_token
+
+PATH = "/api/contacts/1"
+
+
+def work(seconds: float = 0.02):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def make_app(profiler: bool, store: ProfileStore):
+    app = FastAPI()
+
+    @app.get("/api/contacts/{contact_id}")
+    async def contact(contact_id: int):
+        work()
+        return Response()
+
+    if profiler:
+        app.add_middleware(ProfilerMiddleware, store=store, session_factory=None, secret="secret")
+    return app
+
+
+async def main(requests: int = 200):
+    user_agents = [b"Mozilla/5.0"] * requests
+    token = [(b"x-profile-token", sign_token("secret", int(time.time()) + 3600).encode())]
+
+    rows = [("middleware", "request", "us/request", "overhead us", "samples/request")]
+    baseline = None
+    for label, profiler, headers in (("none", False, []), ("ProfilerMiddleware", True, []),
+                                     ("ProfilerMiddleware", True, token)):
+        store = ProfileStore(size=2 * requests)
+        app = make_app(profiler, store)
+        await run(app, user_agents[:10], headers, path=PATH)
+        per_request = await run(app, user_agents, headers, path=PATH) / requests * 1e6
+        baseline = per_request if baseline is None else baseline
+        profiles = store.slowest()
+        samples = sum(profile.samples for profile in profiles) / len(profiles) if profiles else 0
+        rows.append((label, "profiled" if headers else "plain", round(per_request, 1),
+                     round(per_request - baseline, 1), round(samples, 2)))
+
+    print_table(f"request profiler, {requests} requests", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
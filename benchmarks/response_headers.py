@@ -0,0 +1,88 @@
+"""
+Per-request overhead of the middleware stack in front of every route: the former one, with the
+``@app.middleware("http")`` user-agent check and ``CustomMiddleware`` both built on
+``BaseHTTPMiddleware``, against ``UserAgentBanMiddleware`` and ``HeaderInjectionMiddleware``.
+Both keep ``CORSMiddleware``, and requests carry an ``Origin`` header so it does its work.
+
+Measured for a small JSON response and for a streaming one sent in 16 chunks, which
+``BaseHTTPMiddleware`` pushes through a memory stream one chunk at a time.
+
+Usage::
+
+    python -m benchmarks.response_headers [requests]
+"""
+import asyncio
+import re
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks.common import print_table
+from benchmarks.user_agent_ban import run
+from src.middleware.headers import HeaderInjectionMiddleware
+from src.middleware.user_agent import DEFAULT_BAN_PATTERNS, UserAgentBanList, UserAgentBanMiddleware
+
+
+class CustomMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+
+async def chunks():
+    for _ in range(16):
+        yield b"x" * 4096
+
+
+def make_app(stack: str, body: str):
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        if body == "json":
+            return JSONResponse({"message": "Welcome to FastAPI!"})
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    if stack == "none":
+        return app
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"],
+                       allow_headers=["*"])
+    if stack == "BaseHTTPMiddleware":
+        @app.middleware("http")
+        async def user_agent_ban_middleware(request: Request, call_next):
+            user_agent = request.headers.get("user-agent")
+            for ban_pattern in DEFAULT_BAN_PATTERNS:
+                if re.search(ban_pattern, user_agent):
+                    return JSONResponse(status_code=403, content={"detail": "You are banned"})
+            return await call_next(request)
+
+        app.add_middleware(CustomMiddleware)
+    else:
+        app.add_middleware(UserAgentBanMiddleware, ban_list=UserAgentBanList())
+        app.add_middleware(HeaderInjectionMiddleware, headers={"Access-Control-Allow-Origin": "*"})
+    return app
+
+
+async def main(requests: int = 5000):
+    user_agents = [b"Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"] * requests
+    headers = [(b"origin", b"https://app.example.com")]
+
+    rows = [("response", "middleware stack", "us/request", "overhead us")]
+    for body in ("json", "stream"):
+        baseline = None
+        for stack in ("none", "BaseHTTPMiddleware", "pure ASGI"):
+            app = make_app(stack, body)
+            await run(app, user_agents[:1000], headers)
+            per_request = await run(app, user_agents, headers) / requests * 1e6
+            baseline = per_request if baseline is None else baseline
+            rows.append((body, stack, round(per_request, 1), round(per_request - baseline, 1)))
+
+    print_table(f"middleware stack, {requests} requests", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
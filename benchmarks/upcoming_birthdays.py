@@ -0,0 +1,63 @@
+"""
+Upcoming birthdays: the former load-everything Python loop against the SQL window on ``birthday_md``.
+
+Usage::
+
+    python -m benchmarks.upcoming_birthdays [contacts]
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from benchmarks.common import make_session_maker, seed_user, seed_contacts, measure, print_table
+from src.entity.models import Contact
+from src.repository import birthdays as repository_birthdays
+
+
+async def legacy_upcoming_birthdays(db):
+    """
+    The previous implementation, kept for comparison. February 29 birthdays are skipped
+    because ``replace(year=...)`` raises on them in non-leap years.
+    """
+    today = datetime.today().date()
+    in_7_days = today + timedelta(days=7)
+    result = await db.execute(select(Contact))
+    upcoming = []
+    for contact in result.scalars().all():
+        if not contact.birthday:
+            continue
+        try:
+            bday_this_year = contact.birthday.replace(year=today.year)
+            if bday_this_year < today:
+                bday_this_year = bday_this_year.replace(year=today.year + 1)
+        except ValueError:
+            continue
+        if today <= bday_this_year <= in_7_days:
+            upcoming.append(contact)
+    return upcoming
+
+
+async def main(count: int = 1_000_000):
+    engine, session_maker = await make_session_maker()
+    user = await seed_user(session_maker)
+    await seed_contacts(session_maker, user.id, count)
+
+    rows = [("implementation", "median ms", "p95 ms", "contacts returned")]
+    async with session_maker() as db:
+        legacy = await legacy_upcoming_birthdays(db)
+        stats = await measure(lambda: legacy_upcoming_birthdays(db), repeat=3)
+        rows.append(("python loop over select(Contact)", stats["median_ms"], stats["p95_ms"], len(legacy)))
+        db.expunge_all()
+
+        upcoming = await repository_birthdays.get_upcoming_birthdays(user=user, db=db, days=7)
+        stats = await measure(lambda: repository_birthdays.get_upcoming_birthdays(user=user, db=db, days=7))
+        rows.append(("SQL window on birthday_md", stats["median_ms"], stats["p95_ms"], len(upcoming)))
+
+    await engine.dispose()
+    print_table(f"upcoming birthdays (7 days), {count} contacts", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,90 @@
+"""
+Per-request overhead of the user-agent ban check: the former ``@app.middleware("http")`` loop,
+which ran ``re.search`` for every pattern and wrapped the response in ``BaseHTTPMiddleware``,
+against ``UserAgentBanMiddleware``.
+
+Requests are sent straight to the ASGI app, which answers with an empty 200, so the numbers are
+the middleware cost alone. User-agents are drawn from a pool of distinct strings, as in real
+traffic; the pattern list is padded to show how each approach scales with its length.
+
+Usage::
+
+    python -m benchmarks.user_agent_ban [requests] [distinct_user_agents]
+"""
+import asyncio
+import random
+import re
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+from benchmarks.common import print_table
+from src.middleware.user_agent import DEFAULT_BAN_PATTERNS, UserAgentBanList, UserAgentBanMiddleware
+
+
+def make_app(patterns: list[str], middleware: str):
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        return Response()
+
+    if middleware == "http":
+        @app.middleware("http")
+        async def user_agent_ban_middleware(request: Request, call_next):
+            user_agent = request.headers.get("user-agent")
+            for ban_pattern in patterns:
+                if re.search(ban_pattern, user_agent):
+                    return JSONResponse(status_code=403, content={"detail": "You are banned"})
+            return await call_next(request)
+    elif middleware == "asgi":
+        app.add_middleware(UserAgentBanMiddleware, ban_list=UserAgentBanList(patterns))
+    return app
+
+
+async def run(app, user_agents: list[bytes], headers: list[tuple[bytes, bytes]] = (), path: str = "/") -> float:
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for user_agent in user_agents:
+        # The request body, then nothing: the client stays connected until the response is sent.
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+        async def receive():
+            return next(messages, None) or await asyncio.Future()
+
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                 "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+                 "headers": [(b"host", b"localhost"), (b"user-agent", user_agent), *headers],
+                 "client": ("127.0.0.1", 1), "server": ("localhost", 80)}
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+async def main(requests: int = 20_000, distinct: int = 500):
+    rnd = random.Random(42)
+    pool = [f"Mozilla/5.0 (X11; Linux x86_64; rv:{n}.0) Gecko/20100101 Firefox/{n}.0".encode()
+            for n in range(distinct)]
+    user_agents = [rnd.choice(pool) for _ in range(requests)]
+
+    rows = [("patterns", "middleware", "us/request", "overhead us")]
+    for size in (len(DEFAULT_BAN_PATTERNS), 500):
+        # re keeps only 512 compiled patterns; longer lists recompile on every request.
+        patterns = DEFAULT_BAN_PATTERNS + [f"crawler-{n}" for n in range(size - len(DEFAULT_BAN_PATTERNS))]
+        baseline = None
+        for label in ("none", "http", "asgi"):
+            app = make_app(patterns, label)
+            await run(app, user_agents[:1000])
+            per_request = await run(app, user_agents) / requests * 1e6
+            baseline = per_request if baseline is None else baseline
+            rows.append((size, label, round(per_request, 1), round(per_request - baseline, 1)))
+
+    print_table(f"user-agent ban check, {requests} requests, {distinct} distinct user-agents", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
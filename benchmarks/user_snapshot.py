@@ -0,0 +1,49 @@
+"""
+Size and encode/decode time of a cached user: pickled ORM ``User`` against ``UserSnapshot``.
+
+Usage::
+
+    python -m benchmarks.user_snapshot [iterations]
+"""
+import asyncio
+import pickle
+import sys
+import timeit
+
+from sqlalchemy import select
+
+from benchmarks.common import make_session_maker, seed_user, print_table
+from src.entity.models import User
+from src.services.cache import UserSnapshot
+
+
+async def load_user():
+    engine, session_maker = await make_session_maker()
+    await seed_user(session_maker)
+    async with session_maker() as session:
+        user = (await session.execute(select(User))).scalar_one()
+        user.password = "$2b$12$" + "x" * 53
+        user.refresh_token = "eyJ" + "x" * 180
+        user.avatar = "https://www.gravatar.com/avatar/" + "0" * 32 + "?s=500&d=404"
+    await engine.dispose()
+    return user
+
+
+def main(iterations: int = 100_000):
+    user = asyncio.run(load_user())
+    snapshot = UserSnapshot.from_user(user)
+    pickled, packed = pickle.dumps(user), snapshot.encode()
+
+    rows = [("format", "bytes", "encode us", "decode us")]
+    for name, encode, decode, size in (
+            ("pickle(User)", lambda: pickle.dumps(user), lambda: pickle.loads(pickled), len(pickled)),
+            ("UserSnapshot", snapshot.encode, lambda: UserSnapshot.decode(packed), len(packed)),
+    ):
+        encode_us = timeit.timeit(encode, number=iterations) / iterations * 1e6
+        decode_us = timeit.timeit(decode, number=iterations) / iterations * 1e6
+        rows.append((name, size, round(encode_us, 2), round(decode_us, 2)))
+    print_table(f"cached user record, {iterations} iterations", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,19 +1,28 @@
-from typing import Callable
+import asyncio
 from fastapi.templating import Jinja2Templates
 from fastapi_limiter import FastAPILimiter
-import re
 from pathlib import Path
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import redis.asyncio as redis
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import JSONResponse, HTMLResponse
-from src.database.db import get_db
-from src.middleware.middleware import CustomMiddleware
-from src.routes import contacts, birthdays, auth, email_tracker, users
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from src.database.db import get_db, sessionmanager, replica_sessionmanager
+from src.middleware.headers import HeaderInjectionMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.profiler import ProfilerMiddleware
+from src.middleware.query_stats import QueryStatsMiddleware
+from src.middleware.user_agent import UserAgentBanList, UserAgentBanMiddleware
+from src.routes import contacts, birthdays, auth, email_tracker, users, admin
+from src.services.cache import cache_manager, user_cache
+from src.services.hashing import hashing_pool
+from src.services.metrics import metrics, rate_limit_callback, run_sync
+from src.services.profiler import profile_store
+from src.services.tombstones import run_compaction
 from dotenv import load_dotenv
 from src.conf.config import config
 import logging
@@ -29,13 +38,21 @@ async def lifespan(app: FastAPI):
     """
     Lifespan function that initializes FastAPILimiter with Redis connection.
 
-    Initializes FastAPILimiter with Redis connection. This function is used
-    as a lifespan function for FastAPI application.
+    Initializes FastAPILimiter with Redis connection and the pooled Redis
+    client shared by the caches, and subscribes to user cache invalidations.
+    This function is used as a lifespan function for FastAPI application.
 
     It yields control back to the ASGI framework after initializing
-    FastAPILimiter and closes the Redis connection when the application
-    is shutting down.
+    FastAPILimiter and the cache client and closes the Redis connections
+    when the application is shutting down. The database connection pool
+    is warmed up on startup and disposed on shutdown. Contact tombstones
+    are compacted in the background every TOMBSTONE_COMPACTION_INTERVAL
+    seconds, and metrics are synced for /metrics every
+    METRICS_SYNC_INTERVAL seconds.
     """
+    await sessionmanager.warmup()
+    if replica_sessionmanager is not None:
+        await replica_sessionmanager.warmup()
     redis_client = await redis.Redis(
         host=config.REDIS_DOMAIN,
         port=config.REDIS_PORT,
@@ -43,11 +60,38 @@ async def lifespan(app: FastAPI):
         password=config.REDIS_PASSWORD,
         decode_responses=True
     )
-    await FastAPILimiter.init(redis_client)
+    await FastAPILimiter.init(redis_client, http_callback=rate_limit_callback)
+    cache_manager.init(
+        host=config.REDIS_DOMAIN,
+        port=config.REDIS_PORT,
+        password=config.REDIS_PASSWORD,
+        max_connections=config.REDIS_MAX_CONNECTIONS
+    )
+    user_cache_listener = asyncio.create_task(user_cache.listen())
+    compaction = None
+    if config.TOMBSTONE_COMPACTION_INTERVAL > 0:
+        compaction = asyncio.create_task(run_compaction(sessionmanager.session, config.TOMBSTONE_COMPACTION_INTERVAL))
+    metrics_sync = asyncio.create_task(run_sync(config.METRICS_SYNC_INTERVAL))
 
     yield
 
+    user_cache_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await user_cache_listener
+    if compaction is not None:
+        compaction.cancel()
+        with suppress(asyncio.CancelledError):
+            await compaction
+    metrics_sync.cancel()
+    with suppress(asyncio.CancelledError):
+        await metrics_sync
+    metrics.shutdown()
+    hashing_pool.shutdown()
+    await cache_manager.close()
     await redis_client.close()
+    await sessionmanager.close()
+    if replica_sessionmanager is not None:
+        await replica_sessionmanager.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -64,29 +108,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-user_agent_ban_list = [r"Python-urllib", r"python-requests", r"bot", r"spider"]
-
-
-@app.middleware("http")
-async def user_agent_ban_middleware(request: Request, call_next: Callable):
-    """
-    This middleware bans requests from user-agents that match a list of regex patterns.
+app.add_middleware(
+    UserAgentBanMiddleware,
+    ban_list=UserAgentBanList(
+        path=config.USER_AGENT_BAN_FILE or None,
+        cache_size=config.USER_AGENT_CACHE_SIZE,
+        reload_interval=config.USER_AGENT_BAN_RELOAD_SECONDS,
+    ),
+)
 
-    The list of regex patterns is defined in the user_agent_ban_list variable.
-    If a request's user-agent matches any of the patterns, it is rejected with
-    a 403 Forbidden response.
+app.add_middleware(HeaderInjectionMiddleware, headers=config.RESPONSE_HEADERS)
 
-    Otherwise, the request is passed on to the next middleware in the chain.
-    """
-    user_agent = request.headers.get("user-agent")
-    for ban_pattern in user_agent_ban_list:
-        if re.search(ban_pattern, user_agent):
-            return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": "You are banned"})
-    response = await call_next(request)
-    return response
+app.add_middleware(QueryStatsMiddleware, server_timing=config.SERVER_TIMING_HEADER,
+                   repeat_threshold=config.QUERY_REPEAT_WARNING)
 
+app.add_middleware(
+    ProfilerMiddleware,
+    store=profile_store,
+    session_factory=sessionmanager.session,
+    secret=config.PROFILER_SECRET,
+    interval=config.PROFILER_INTERVAL,
+    sample_rate=config.PROFILER_SAMPLE_RATE,
+)
 
-app.add_middleware(CustomMiddleware)
+# Added last so that it is the outermost middleware and also times banned requests.
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 app.include_router(auth.router, prefix="/api", tags=["auth"])
 
@@ -98,6 +144,8 @@ app.include_router(contacts.router, prefix="/api", tags=["contacts"])
 
 app.include_router(birthdays.router, prefix="/api", tags=["birthdays"])
 
+app.include_router(admin.router, prefix="/api", tags=["admin"])
+
 templates = Jinja2Templates(directory="src/templates")
 
 
@@ -124,6 +172,20 @@ async def root(requests: Request):
     return templates.TemplateResponse("index.html", {"request": requests})
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus metrics of every worker: per-route request counts and latency histograms, requests
+    in progress, database pool connections, user cache lookups and rate limiter rejections.
+
+    Returns
+    -------
+    fastapi.Response
+        The metrics in the Prometheus text format.
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/healthchecker", status_code=status.HTTP_200_OK)
 async def healthchecker(db: AsyncSession = Depends(get_db)) :
     """
@@ -0,0 +1,30 @@
+"""scope contacts birthday_md index by user
+
+Revision ID: 0a6e4f3b8c92
+Revises: f2b8c6d14a57
+Create Date: 2026-10-18 16:27:10.553402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6e4f3b8c92'
+down_revision: Union[str, None] = 'f2b8c6d14a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_user_id_birthday_md', 'contacts', ['user_id', 'birthday_md'], unique=False)
+    op.drop_index('ix_contacts_birthday_md', table_name='contacts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_contacts_birthday_md', 'contacts', ['birthday_md'], unique=False)
+    op.drop_index('ix_contacts_user_id_birthday_md', table_name='contacts')
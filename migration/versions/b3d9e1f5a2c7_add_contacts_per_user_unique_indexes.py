@@ -0,0 +1,30 @@
+"""add per-user unique indexes on contacts email and phone
+
+Revision ID: b3d9e1f5a2c7
+Revises: 0a6e4f3b8c92
+Create Date: 2026-10-18 18:02:41.118930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d9e1f5a2c7'
+down_revision: Union[str, None] = '0a6e4f3b8c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ux_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=True)
+    op.create_index('ux_contacts_user_id_phone', 'contacts', ['user_id', 'phone'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_contacts_user_id_phone', table_name='contacts')
+    op.drop_index('ux_contacts_user_id_email', table_name='contacts')
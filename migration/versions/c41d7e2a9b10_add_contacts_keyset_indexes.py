@@ -0,0 +1,30 @@
+"""add contacts keyset indexes
+
+Revision ID: c41d7e2a9b10
+Revises: 455193881d69
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9b10'
+down_revision: Union[str, None] = '455193881d69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False)
+    op.create_index('ix_contacts_user_id_name_id', 'contacts', ['user_id', 'name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_name_id', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
@@ -0,0 +1,47 @@
+"""add contacts tombstones and the changes feed index
+
+Revision ID: d4f7a2c9e1b3
+Revises: b3d9e1f5a2c7
+Create Date: 2026-10-18 21:14:07.502361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7a2c9e1b3'
+down_revision: Union[str, None] = 'b3d9e1f5a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    # Rows without updated_at would never show up in the changes feed.
+    op.execute("UPDATE contacts SET updated_at = coalesce(created_at, now()) WHERE updated_at IS NULL")
+    op.create_index('ix_contacts_user_id_updated_at_id', 'contacts', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_contacts_deleted_at', 'contacts', ['deleted_at'], unique=False,
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    # Tombstones keep their email and phone, so only live contacts have to be unique.
+    op.drop_index('ux_contacts_user_id_email', table_name='contacts')
+    op.drop_index('ux_contacts_user_id_phone', table_name='contacts')
+    op.create_index('ux_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=True,
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ux_contacts_user_id_phone', 'contacts', ['user_id', 'phone'], unique=True,
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM contacts WHERE deleted_at IS NOT NULL")
+    op.drop_index('ux_contacts_user_id_phone', table_name='contacts')
+    op.drop_index('ux_contacts_user_id_email', table_name='contacts')
+    op.create_index('ux_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=True)
+    op.create_index('ux_contacts_user_id_phone', 'contacts', ['user_id', 'phone'], unique=True)
+    op.drop_index('ix_contacts_deleted_at', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_updated_at_id', table_name='contacts')
+    op.drop_column('contacts', 'deleted_at')
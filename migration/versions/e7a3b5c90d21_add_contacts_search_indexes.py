@@ -0,0 +1,46 @@
+"""add contacts search indexes
+
+Revision ID: e7a3b5c90d21
+Revises: c41d7e2a9b10
+Create Date: 2026-10-18 13:40:05.871230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c90d21'
+down_revision: Union[str, None] = 'c41d7e2a9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        "ALTER TABLE contacts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(surname, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(email, '') || ' ' || coalesce(phone, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(additional_data, '')), 'C')) STORED"
+    )
+    op.create_index('ix_contacts_search_vector', 'contacts', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_contacts_name_trgm', 'contacts', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_contacts_email_trgm', 'contacts', ['email'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    op.create_index('ix_contacts_phone_trgm', 'contacts', ['phone'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_phone_trgm', table_name='contacts')
+    op.drop_index('ix_contacts_email_trgm', table_name='contacts')
+    op.drop_index('ix_contacts_name_trgm', table_name='contacts')
+    op.drop_index('ix_contacts_search_vector', table_name='contacts')
+    op.drop_column('contacts', 'search_vector')
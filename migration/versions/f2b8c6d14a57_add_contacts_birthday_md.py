@@ -0,0 +1,33 @@
+"""add contacts birthday_md
+
+Revision ID: f2b8c6d14a57
+Revises: e7a3b5c90d21
+Create Date: 2026-10-18 15:02:44.119356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8c6d14a57'
+down_revision: Union[str, None] = 'e7a3b5c90d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column(
+        'birthday_md', sa.Integer(),
+        sa.Computed('CAST(EXTRACT(month FROM birthday) * 100 + EXTRACT(day FROM birthday) AS INTEGER)', persisted=True),
+        nullable=True))
+    op.create_index('ix_contacts_birthday_md', 'contacts', ['birthday_md'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_birthday_md', table_name='contacts')
+    op.drop_column('contacts', 'birthday_md')
@@ -8,4 +8,13 @@ INVALID_TOKEN_FOR_EMAIL_VERIFICATION = "Invalid token for email verification"
 CHECK_EMAIL = "Check your email for confirmation."
 YOUR_EMAIL_IS_ALREADY_CONFIRMED = "Your email is already confirmed"
 USER_NOT_FOUND = "User not found"
-
+FORBIDDEN = "Operation forbidden"
+SERVICE_BUSY = "Service is busy, try again later"
+CONTACT_EXISTS = "Contact with this email or phone already exists"
+IMPORT_FORMAT_UNKNOWN = "Unknown import format, use csv, ndjson or vcard"
+IMPORT_TOO_LARGE = "Import file is too large"
+IMPORT_JOB_NOT_FOUND = "Import job not found"
+BATCH_TOO_LARGE = "Too many operations in one batch"
+CHANGES_CURSOR_EXPIRED = "The changes cursor has expired, sync again without it"
+PROFILER_DISABLED = "Profiling tokens are disabled, set PROFILER_SECRET"
+PROFILE_NOT_FOUND = "Profile not found"
@@ -1,6 +1,14 @@
+import asyncio
 import contextlib
+import time
+from collections import defaultdict
+from contextvars import ContextVar
 
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from fastapi import Request
+from sqlalchemy import Engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.conf.config import config
 
@@ -12,9 +20,155 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also counts callers waiting for a connection and checkout timeouts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        # Only a checkout that blocks on an exhausted pool yields to other coroutines while counted.
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.timeouts = self.timeouts
+        return pool
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_connection_used(session, transaction, connection):
+    session.info["connection_used"] = True
+
+
+class QueryStats:
+    """
+    SQL statements executed and time spent in the database while serving one request.
+
+    ``statements`` counts the executions of every distinct SQL string, so that the same query run
+    once per row of a previous result (N+1) stands out.
+    """
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: dict[str, int] = defaultdict(int)
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """
+        The statement executed the most times, with its count, or None if nothing ran.
+        """
+        if not self.statements:
+            return None
+        return max(self.statements.items(), key=lambda item: item[1])
+
+
+# Set by ``QueryStatsMiddleware`` for the duration of a request; None outside requests.
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if query_stats.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    started = getattr(context, "query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+class SessionMetrics:
+    """
+    Per-route counts of request sessions and of the ones that actually checked out a connection.
+
+    Sessions only acquire a pooled connection on their first query, so routes whose handlers never
+    query (or are served from a cache) avoid the checkout altogether.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+
+    def record(self, route: str, session: AsyncSession):
+        counts = self.routes[route]
+        counts[0] += 1
+        if session.sync_session.info.get("connection_used"):
+            counts[1] += 1
+
+    def stats(self) -> dict:
+        """
+        Sessions opened, connections checked out and connections avoided per route.
+        """
+        return {
+            route: {"sessions": sessions, "connections": connections, "avoided": sessions - connections}
+            for route, (sessions, connections) in sorted(self.routes.items())
+        }
+
+
+session_metrics = SessionMetrics()
+
+
+def route_name(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+
+async def release_connection(session: AsyncSession):
+    """
+    End the session's transaction and return its connection to the pool as soon as a read-only
+    handler has run its last query, instead of when the request finishes.
+
+    Loaded objects stay usable for serialization; the session opens a new transaction if used again.
+    """
+    await session.close()
+
+
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+    """
+    Owns the application's async engine and session factory.
+
+    The engine uses an :class:`InstrumentedPool` sized per process, so the totals across uvicorn
+    workers are ``workers * (pool_size + max_overflow)`` connections. ``main.lifespan`` calls
+    :meth:`warmup` on startup and :meth:`close` on shutdown.
+    """
+
+    def __init__(self, url: str, pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30,
+                 pool_recycle: int = -1, pool_pre_ping: bool = False, statement_cache_size: int = 100):
+        connect_args = {}
+        if make_url(url).drivername == "postgresql+asyncpg":
+            connect_args["prepared_statement_cache_size"] = statement_cache_size
+        self.pool_size = pool_size
+        self._engine: AsyncEngine | None = create_async_engine(
+            url,
+            poolclass=InstrumentedPool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            connect_args=connect_args,
+        )
         self._session_maker: async_sessionmaker = async_sessionmaker(autoflush=False, autocommit=False,
                                                                      bind=self._engine)
 
@@ -32,14 +186,108 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    async def warmup(self, connections: int | None = None):
+        """
+        Open ``connections`` pooled connections up front, ``pool_size`` by default, so the first
+        requests after a start do not pay for connecting.
+
+        A database that is not reachable yet is logged, not raised; connections are then opened on demand.
+        """
+        if self._engine is None:
+            raise Exception("Engine is not initialized")
+        connections = self.pool_size if connections is None else connections
+        opened = await asyncio.gather(*(self._engine.connect().start() for _ in range(connections)),
+                                      return_exceptions=True)
+        for connection in opened:
+            if isinstance(connection, BaseException):
+                logger.error(f"Error in warmup {connection}")
+            else:
+                await connection.close()
+
+    async def close(self):
+        """
+        Close every pooled connection and drop the engine.
+        """
+        if self._engine is None:
+            return
+        await self._engine.dispose()
+        self._engine = None
+        self._session_maker = None
+
+    def pool_status(self) -> dict:
+        """
+        Connection pool statistics of this process.
+
+        Returns:
+            dict: The pool size, checked in and checked out connections, overflow in use,
+            callers waiting for a connection and checkout timeouts since start.
+        """
+        if self._engine is None:
+            return {}
+        pool = self._engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "waiting": getattr(pool, "waiting", 0),
+            "timeouts": getattr(pool, "timeouts", 0),
+        }
 
-sessionmanager = DatabaseSessionManager(config.DB_URL)
 
+sessionmanager = DatabaseSessionManager(
+    config.DB_URL,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+    statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+)
 
-async def get_db():
+
+# Read replica for read-only routes, see ``src.services.replica.get_read_db``. Unset means no replica.
+replica_sessionmanager = DatabaseSessionManager(
+    config.DB_REPLICA_URL,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+    statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+) if config.DB_REPLICA_URL else None
+
+
+async def get_db(request: Request):
     async with sessionmanager.session() as session:
         try:
             yield session
         except Exception as err:
             logger.error(f"Error in get_db {err}")
             raise
+        finally:
+            session_metrics.record(route_name(request), session)
+
+
+async def get_replica_db(request: Request):
+    """
+    Session on the read replica, or None if no replica is configured.
+    """
+    if replica_sessionmanager is None:
+        yield None
+        return
+    async with replica_sessionmanager.session() as session:
+        try:
+            yield session
+        except Exception as err:
+            logger.error(f"Error in get_replica_db {err}")
+            raise
+        finally:
+            session_metrics.record(f"{route_name(request)} (replica)", session)
+
+
+def get_session_factory():
+    """
+    Session factory for work that outlives the request, such as background jobs.
+    """
+    return sessionmanager.session
@@ -1,7 +1,9 @@
-from datetime import date
+from datetime import date, datetime
 import enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Date, Text, Integer, ForeignKey, DateTime, func, Enum, Boolean
+from sqlalchemy import (String, Date, Text, Integer, ForeignKey, DateTime, func, Enum, Boolean, Index, DDL, event,
+                        Computed, cast, extract, column, text)
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -9,6 +11,13 @@ class Base(DeclarativeBase):
     pass
 
 
+# SQLite stores ``func.now()`` as "YYYY-MM-DD HH:MM:SS"; bound datetimes use the same text format so
+# that they compare correctly with it, e.g. the changes feed cursor against ``updated_at``.
+ChangeTimestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite")
+
+
 class Contact(Base):
     __tablename__ = "contacts"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -17,14 +26,72 @@ class Contact(Base):
     email: Mapped[str] = mapped_column(String(150), nullable=False)
     phone: Mapped[str] = mapped_column(String(20), nullable=False)
     birthday: Mapped[date] = mapped_column(Date, nullable=True)
+    # month * 100 + day of the birthday, e.g. 229 for February 29; used by the upcoming birthdays window.
+    birthday_md: Mapped[int] = mapped_column(Integer, Computed(
+        cast(extract("month", column("birthday", Date)) * 100 + extract("day", column("birthday", Date)), Integer),
+        persisted=True), nullable=True)
     additional_data: Mapped[str] = mapped_column(Text, nullable=True)
     created_at: Mapped[date] = mapped_column("created_at", DateTime, default=func.now(), nullable=True)
-    updated_at: Mapped[date] = mapped_column("updated_at", DateTime, default=func.now(), onupdate=func.now(),
+    updated_at: Mapped[date] = mapped_column("updated_at", ChangeTimestamp, default=func.now(), onupdate=func.now(),
                                              nullable=True)
+    # Set instead of deleting the row: the tombstone shows up in the changes feed until it is compacted.
+    deleted_at: Mapped[datetime] = mapped_column(ChangeTimestamp, nullable=True)
     user_id: Mapped[int] = mapped_column(Integer,
                                          ForeignKey("users.id"), nullable=True)
     user: Mapped["User"] = relationship("User", backref="contacts", lazy="joined")
 
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_name_id", "user_id", "name", "id"),
+        Index("ix_contacts_user_id_birthday_md", "user_id", "birthday_md"),
+        Index("ux_contacts_user_id_email", "user_id", "email", unique=True,
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ux_contacts_user_id_phone", "user_id", "phone", unique=True,
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ix_contacts_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Only tombstones, for their compaction.
+        Index("ix_contacts_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL"),
+              sqlite_where=text("deleted_at IS NOT NULL")),
+    )
+
+
+# Search backend DDL, see src.repository.search. On Postgres the same objects are created by
+# the e7a3b5c90d21 migration; the listeners keep ``Base.metadata.create_all`` in sync with it.
+CONTACTS_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE contacts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(surname, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(email, '') || ' ' || coalesce(phone, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(additional_data, '')), 'C')) STORED",
+        "CREATE INDEX ix_contacts_search_vector ON contacts USING gin (search_vector)",
+        "CREATE INDEX ix_contacts_name_trgm ON contacts USING gin (name gin_trgm_ops)",
+        "CREATE INDEX ix_contacts_email_trgm ON contacts USING gin (email gin_trgm_ops)",
+        "CREATE INDEX ix_contacts_phone_trgm ON contacts USING gin (phone gin_trgm_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5("
+        "name, surname, email, phone, additional_data, "
+        "content='contacts', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+        "INSERT INTO contacts_fts(rowid, name, surname, email, phone, additional_data) "
+        "VALUES (new.id, new.name, new.surname, new.email, new.phone, new.additional_data); END",
+        "CREATE TRIGGER contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, name, surname, email, phone, additional_data) "
+        "VALUES ('delete', old.id, old.name, old.surname, old.email, old.phone, old.additional_data); END",
+        "CREATE TRIGGER contacts_fts_au AFTER UPDATE ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, name, surname, email, phone, additional_data) "
+        "VALUES ('delete', old.id, old.name, old.surname, old.email, old.phone, old.additional_data); "
+        "INSERT INTO contacts_fts(rowid, name, surname, email, phone, additional_data) "
+        "VALUES (new.id, new.name, new.surname, new.email, new.phone, new.additional_data); END",
+    ],
+}
+
+for _dialect, _statements in CONTACTS_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Contact.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Contact.__table__, "before_drop", DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"))
+
 
 class Role(enum.Enum):
     admin = "admin"
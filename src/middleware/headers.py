@@ -0,0 +1,35 @@
+from typing import Mapping
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class HeaderInjectionMiddleware:
+    """
+    Pure ASGI middleware adding static headers to every HTTP response.
+
+    The headers are encoded once, and each ``http.response.start`` message has its header list
+    extended in place; the body messages are passed through untouched, so streaming responses
+    keep streaming. A header the application or an inner middleware already set is left alone,
+    so ``CORSMiddleware`` echoing the request origin for credentialed requests wins over a
+    static ``Access-Control-Allow-Origin: *``.
+    """
+
+    def __init__(self, app: ASGIApp, headers: Mapping[str, str]):
+        self.app = app
+        self.headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers")
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers or ())
+                present = {name.lower() for name, _ in headers}
+                headers.extend(header for header in self.headers if header[0] not in present)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,41 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.metrics import Metrics, route_template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording the latency, status and route template of every HTTP request.
+
+    The route template is read from the scope once the router has matched the request, so the
+    middleware has to wrap the whole app, outside every other middleware, to see rejected requests
+    too. Recording is a couple of counter updates and a list append on the event loop thread.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_progress -= 1
+            metrics.observe(scope["method"], route_template(scope), status, time.perf_counter() - started)
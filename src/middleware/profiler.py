@@ -0,0 +1,103 @@
+import asyncio
+import random
+import secrets
+import time
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.entity.models import Role
+from src.services.auth import auth_service
+from src.services.metrics import route_template
+from src.services.profiler import ProfileStore, RequestProfile, Sampler, TOKEN_HEADER, verify_token
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware running a :class:`~src.services.profiler.Sampler` over single requests.
+
+    A request is profiled when it carries a valid ``X-Profile-Token`` header signed with
+    ``secret``, when an admin adds ``profile=1`` to the query string, or at random with
+    probability ``sample_rate``. Its response gets an ``X-Profile-Id`` header and the profile goes
+    to ``store``, readable from the ``/api/admin/profiles`` routes. Other requests pay for a
+    header scan only.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, session_factory, secret: str = "",
+                 interval: float = 0.005, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store
+        self.session_factory = session_factory
+        self.secret = secret
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.token_header = TOKEN_HEADER.lower().encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not await self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = secrets.token_hex(8)
+        status = 500
+
+        async def send_with_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = message.get("headers")
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers or ())
+                headers.append((b"x-profile-id", profile_id.encode()))
+            await send(message)
+
+        sampler = Sampler(asyncio.current_task(), self.interval)
+        started_at = time.time()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            self.store.add(RequestProfile(
+                id=profile_id, method=scope["method"], route=route_template(scope), path=scope["path"],
+                status=status, started_at=started_at, duration=time.perf_counter() - started,
+                samples=sampler.samples, stacks=dict(sampler.stacks),
+            ))
+
+    async def requested(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        token = authorization = None
+        for name, value in scope["headers"]:
+            if name == self.token_header:
+                token = value.decode("latin-1")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+        if token is not None and verify_token(token, self.secret):
+            return True
+        if b"profile=" in scope["query_string"] and authorization is not None:
+            if parse_qs(scope["query_string"].decode("latin-1")).get("profile") == ["1"]:
+                return await self.is_admin(authorization)
+        return False
+
+    async def is_admin(self, authorization: str) -> bool:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+        try:
+            # The session only connects if the user is not cached.
+            async with self.session_factory() as db:
+                try:
+                    user = await auth_service.get_current_user(token, db)
+                except HTTPException:
+                    return False
+        except Exception as err:
+            logger.error(f"Error in ProfilerMiddleware.is_admin {err}")
+            return False
+        return user.role == Role.admin
@@ -0,0 +1,58 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database.db import QueryStats, query_stats
+from src.services.metrics import route_template
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware counting the SQL statements and database time of every HTTP request.
+
+    The counts are reported in a ``Server-Timing: db;dur=<ms>;desc="<n> queries"`` response
+    header, which covers the statements run before the response starts, and logged once the
+    request is done: at debug level, or as a warning when one statement ran
+    ``repeat_threshold`` times or more, the usual sign of an N+1 query.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True, repeat_threshold: int = 10):
+        self.app = app
+        self.server_timing = server_timing
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = message.get("headers")
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers or ())
+                value = f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                headers.append((b"server-timing", value.encode("latin-1")))
+            await send(message)
+
+        token = query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            self.log(scope, stats)
+
+    def log(self, scope: Scope, stats: QueryStats):
+        route = f"{scope['method']} {route_template(scope)}"
+        extra = {"route": route, "queries": stats.count, "db_ms": round(stats.seconds * 1000, 1)}
+        message = f"{route}: {stats.count} queries in {extra['db_ms']} ms"
+        repeated = stats.most_repeated()
+        if repeated is not None and repeated[1] >= self.repeat_threshold:
+            statement, times = repeated
+            logger.warning(f"{message}, possible N+1: {times} x {statement}", extra=extra)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(message, extra=extra)
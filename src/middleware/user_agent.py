@@ -0,0 +1,109 @@
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BAN_PATTERNS = [r"Python-urllib", r"python-requests", r"bot", r"spider"]
+
+
+class UserAgentBanList:
+    """
+    Decides whether a user-agent is banned.
+
+    All patterns are compiled once into a single alternation, so a lookup is one regex scan
+    whatever the length of the list, and verdicts are kept in a bounded LRU keyed by the
+    user-agent string: real traffic only carries a few hundred distinct ones.
+
+    If ``path`` is given the patterns are read from that file, one regex per line, blank lines
+    and ``#`` comments ignored. The file's mtime is checked at most every ``reload_interval``
+    seconds and the list is reloaded when it changes; a file that is missing or holds an
+    invalid pattern is logged and the previous list is kept.
+    """
+
+    def __init__(self, patterns: Iterable[str] = DEFAULT_BAN_PATTERNS, path: str | None = None,
+                 cache_size: int = 4096, reload_interval: float = 5.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self._verdicts: OrderedDict[str, bool] = OrderedDict()
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self.load(patterns)
+        if path:
+            self.reload()
+
+    def load(self, patterns: Iterable[str]):
+        patterns = list(patterns)
+        self._regex = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+        self.patterns = patterns
+        self._verdicts.clear()
+
+    def reload(self) -> bool:
+        """
+        Reload the patterns from ``path`` if the file changed since the last load.
+
+        Returns:
+            bool: True if a new list was loaded.
+        """
+        self._checked_at = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return False
+            with open(self.path, encoding="utf-8") as file:
+                patterns = [line.strip() for line in file]
+            patterns = [pattern for pattern in patterns if pattern and not pattern.startswith("#")]
+            self.load(patterns)
+        except (OSError, re.error) as err:
+            logger.error(f"Error in UserAgentBanList.reload {err}")
+            return False
+        self._mtime = mtime
+        logger.info(f"Loaded {len(patterns)} user-agent ban patterns from {self.path}")
+        return True
+
+    def is_banned(self, user_agent: str) -> bool:
+        if self.path and time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+        verdict = self._verdicts.get(user_agent)
+        if verdict is not None:
+            self._verdicts.move_to_end(user_agent)
+            return verdict
+        verdict = self._regex is not None and self._regex.search(user_agent) is not None
+        self._verdicts[user_agent] = verdict
+        if len(self._verdicts) > self.cache_size:
+            self._verdicts.popitem(last=False)
+        return verdict
+
+
+class UserAgentBanMiddleware:
+    """
+    Pure ASGI middleware rejecting requests whose user-agent is on the ban list with 403.
+
+    A request without a user-agent header is checked as an empty string. Allowed requests are
+    passed through untouched, so responses are streamed as the application sends them.
+    """
+
+    def __init__(self, app: ASGIApp, ban_list: UserAgentBanList):
+        self.app = app
+        self.ban_list = ban_list
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            user_agent = ""
+            for name, value in scope["headers"]:
+                if name == b"user-agent":
+                    user_agent = value.decode("latin-1")
+                    break
+            if self.ban_list.is_banned(user_agent):
+                response = JSONResponse(status_code=403, content={"detail": "You are banned"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
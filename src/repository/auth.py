@@ -8,6 +8,7 @@ import logging
 from src.database.db import get_db
 from src.entity.models import User
 from src.schemas.user import UserShema
+from src.services.cache import user_cache
 
 load_dotenv()
 
@@ -61,6 +62,22 @@ async def create_user(body: UserShema, db: AsyncSession = Depends(get_db)):
     return new_user
 
 
+async def update_password(user: User, hashed_password: str, db: AsyncSession = Depends(get_db)):
+    """
+    Store a new password hash for the given user, e.g. after a rehash on login.
+
+    Args:
+        user (User): The user.
+        hashed_password (str): The new password hash.
+        db (AsyncSession): The database session.
+
+    Returns:
+        None
+    """
+    user.password = hashed_password
+    await db.commit()
+
+
 async def update_token(user: UserShema, refresh_token: str | None, db: AsyncSession = Depends(get_db)):
     """
     Update the refresh token for the given user.
@@ -76,23 +93,24 @@ async def update_token(user: UserShema, refresh_token: str | None, db: AsyncSess
     user.refresh_token = refresh_token
     db.add(user)
     await db.commit()
+    await user_cache.invalidate(user.email)
 
 
-async def confirmed_email(email: str, db: AsyncSession = Depends(get_db)) -> None:
+async def confirmed_email(user: User, db: AsyncSession = Depends(get_db)) -> None:
     """
     Confirm the given user's email address.
 
     Args:
-        email (str): The user's email address.
+        user (User): The user, as loaded by the caller from the same session.
         db (AsyncSession): The database session.
 
     Returns:
         None
     """
-    user = await get_user_by_email(email=email, db=db)
     user.confirmed = True
     db.add(user)
     await db.commit()
+    await user_cache.invalidate(user.email)
 
 
 def repository_auth():
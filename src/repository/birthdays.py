@@ -1,38 +1,136 @@
-from datetime import datetime, timedelta
+from calendar import isleap
+from datetime import datetime, date, time, timedelta
+import json
+import logging
+
 from fastapi import Depends
-from sqlalchemy import select
+from redis import RedisError
+from sqlalchemy import select, or_, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.entity.models import Contact
+from src.entity.models import Contact, User
 from src.database.db import get_db
+from src.schemas.contact import ContactResponse
+from src.services.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+def month_day(day: date) -> int:
+    """
+    Encode a date the way ``Contact.birthday_md`` stores it: ``month * 100 + day``.
+    """
+    return day.month * 100 + day.day
+
+
+def birthday_window(today: date, days: int) -> tuple[int, int] | None:
+    """
+    Compute the ``birthday_md`` range of birthdays falling within ``days`` days from ``today``.
 
+    The range wraps around the end of the year when ``start > end``. Contacts born on February 29
+    celebrate on February 28 in non-leap years, so a window ending on such a February 28 also
+    covers 229.
 
+    Args:
+        today (date): The first day of the window.
+        days (int): The length of the window in days, ``today`` included as day 0.
 
+    Returns:
+        tuple[int, int] | None: The inclusive ``(start, end)`` range, or None if the window spans a whole year.
+    """
+    if days >= 365:
+        return None
+    last_day = today + timedelta(days=days)
+    start, end = month_day(today), month_day(last_day)
+    if end == 228 and not isleap(last_day.year):
+        end = 229
+    return start, end
 
-async def get_upcoming_birthdays(db: AsyncSession = Depends(get_db)):
+
+async def get_upcoming_birthdays(user: User, db: AsyncSession = Depends(get_db), days: int = 7,
+                                 today: date | None = None):
     """
-    Get a list of contacts that have a birthday in the next 7 days.
+    Get a list of the user's contacts that have a birthday in the next ``days`` days.
+
+    The window is evaluated in SQL against the ``(user_id, birthday_md)`` index, so only matching
+    contacts are loaded. Results are ordered by the upcoming birthday date.
 
     Args:
+        user (User): The owner of the contacts.
         db (AsyncSession): The database session to use.
+        days (int): The length of the window in days. Defaults to 7.
+        today (date | None): The first day of the window. Defaults to the current date.
 
     Returns:
-        list[Contact]: A list of contacts with a birthday in the next 7 days.
+        list[Contact]: A list of contacts with a birthday in the next ``days`` days.
+    """
+    today = today or datetime.today().date()
+    start = month_day(today)
+    stmt = select(Contact).where(Contact.user_id == user.id, Contact.deleted_at.is_(None),
+                                 Contact.birthday_md.is_not(None))
+    window = birthday_window(today, days)
+    if window is not None:
+        start, end = window
+        if start <= end:
+            stmt = stmt.where(Contact.birthday_md.between(start, end))
+        else:
+            stmt = stmt.where(or_(Contact.birthday_md >= start, Contact.birthday_md <= end))
+    stmt = stmt.order_by(case((Contact.birthday_md < start, 1), else_=0), Contact.birthday_md, Contact.id)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+def upcoming_birthdays_key(user_id: int, today: date) -> str:
+    """
+    Redis key of the cached upcoming birthdays of a user for a given day. The hash holds one field per window size.
+    """
+    return f"upcoming_birthdays:{user_id}:{today.isoformat()}"
+
+
+async def get_cached_upcoming_birthdays(user: User, db: AsyncSession = Depends(get_db), days: int = 7):
+    """
+    Get the user's upcoming birthdays through the Redis cache.
+
+    Results are cached per user and per day, and expire at midnight. Contact writes drop the entry with
+    :func:`invalidate_upcoming_birthdays`. If Redis is unavailable the database is queried directly.
+
+    Args:
+        user (User): The owner of the contacts.
+        db (AsyncSession): The database session to use.
+        days (int): The length of the window in days. Defaults to 7.
+
+    Returns:
+        list[dict]: The contacts serialized as :class:`ContactResponse` dictionaries.
     """
     today = datetime.today().date()
-    in_7_days = today + timedelta(days=7)
-    result = await db.execute(select(Contact))
-    users = result.scalars().all()
-    upcoming = []
-    for user in users:
-        if not user.birthday:
-            continue
-        birthday = user.birthday
-        bday_this_year = birthday.replace(year=today.year)
-
-        if bday_this_year < today:
-            bday_this_year = bday_this_year.replace(year=today.year + 1)
-
-        if today <= bday_this_year <= in_7_days:
-            upcoming.append(user)
-
-    return upcoming
+    key = upcoming_birthdays_key(user.id, today)
+    try:
+        cached = await cache_manager.client.hget(key, str(days))
+    except RedisError as err:
+        logger.error(f"Error in get_cached_upcoming_birthdays {err}")
+        cached = None
+    if cached is not None:
+        return json.loads(cached)
+
+    contacts = await get_upcoming_birthdays(user=user, db=db, days=days, today=today)
+    payload = [ContactResponse.model_validate(contact).model_dump(mode="json") for contact in contacts]
+    try:
+        async with cache_manager.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, str(days), json.dumps(payload))
+            pipe.expireat(key, datetime.combine(today + timedelta(days=1), time.min))
+            await pipe.execute()
+    except RedisError as err:
+        logger.error(f"Error in get_cached_upcoming_birthdays {err}")
+    return payload
+
+
+async def invalidate_upcoming_birthdays(user_id: int) -> None:
+    """
+    Drop today's cached upcoming birthdays of a user after one of their contacts changed.
+
+    Args:
+        user_id (int): The owner of the changed contact.
+    """
+    try:
+        await cache_manager.client.delete(upcoming_birthdays_key(user_id, datetime.today().date()))
+    except RedisError as err:
+        logger.error(f"Error in invalidate_upcoming_birthdays {err}")
@@ -1,43 +1,179 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Sequence
+
 from fastapi import Depends
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select, or_, cast, String
+from sqlalchemy import DateTime, RowMapping, case, cast, func, literal, or_, select, tuple_, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from src.conf.config import config
 from src.database.db import get_db
 
 from src.entity.models import Contact, User
-from src.schemas.contact import ContactShema
+from src.repository import search
+from src.repository.birthdays import invalidate_upcoming_birthdays
+from src.schemas.contact import BatchCreate, BatchDelete, BatchUpdate, ContactShema, ContactUpdateShema
+from src.services.replica import pin_to_primary
+
+
+CURSOR_SORT_KEYS = ("id", "name")
+
+
+def encode_cursor(sort: str, contact: Contact) -> str:
+    """
+    Build an opaque keyset cursor pointing right after the given contact.
+
+    Args:
+        sort (str): The sort key the page was built with, ``"id"`` or ``"name"``.
+        contact (Contact): The last contact of the current page.
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    if sort == "id":
+        values = [contact.id]
+    else:
+        values = [contact.name, contact.id]
+    return _encode_values(sort, values)
+
+
+def _encode_values(sort: str, values: list) -> str:
+    raw = json.dumps({"s": sort, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """
+    Decode a cursor produced by :func:`encode_cursor`, or a changes feed cursor.
+
+    Args:
+        cursor (str): The cursor received from the client.
+        sort (str): The sort key of the current request.
+
+    Returns:
+        list: The keyset values, ``[id]``, ``[name, id]`` or ``[issued_at, updated_at, id]`` for the
+        changes feed, with the timestamps parsed to datetimes.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort key.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Malformed cursor")
+    expected = {"id": 1, "name": 2, "updated_at": 3}[sort]
+    if payload.get("s") != sort or not isinstance(values, list) or len(values) != expected:
+        raise ValueError("Cursor does not match the requested sort")
+    if not isinstance(values[-1], int) or isinstance(values[-1], bool):
+        raise ValueError("Malformed cursor")
+    if sort == "name" and not isinstance(values[0], str):
+        raise ValueError("Malformed cursor")
+    if sort == "updated_at":
+        try:
+            values = [datetime.fromisoformat(values[0]), datetime.fromisoformat(values[1]), values[2]]
+        except (TypeError, ValueError):
+            raise ValueError("Malformed cursor")
+    return values
+
+
+async def after_write(user: User) -> None:
+    """
+    Hook run after every committed write to a user's contacts: drops their cached upcoming birthdays
+    and pins their reads to the primary until the replicas catch up.
+
+    Args:
+        user (User): The owner of the changed contacts.
+    """
+    await invalidate_upcoming_birthdays(user.id)
+    await pin_to_primary(user.id)
+
+
+def _select_contacts(lean: bool):
+    return select(*LEAN_COLUMNS) if lean else select(Contact)
 
 
 async def get_contacts(limit: int, offset: int, query: str | None,
-                       db: AsyncSession, user: User):
+                       db: AsyncSession, user: User, lean: bool = False):
     """
     Retrieve a list of contacts for the current user.
 
-    This function returns a list of contacts that belong to the current user.
+    This function returns a list of contacts that belong to the current user. With ``lean`` only
+    the :data:`LEAN_COLUMNS` are selected, as plain rows: no ORM objects and no join to ``users``.
 
     Args:
         limit (int): The maximum number of contacts to return.
         offset (int): The number of contacts to skip before starting to collect the result set. Must be non-negative.
         query (str | None): An optional search query to filter contacts by name, email, phone, birthday, or additional data.
+            Matches are ordered by relevance, see :mod:`src.repository.search`.
+        db (AsyncSession): The database session dependency.
+        user (User): The current authenticated user dependency.
+        lean (bool): Select the contact columns only. Defaults to False.
+
+    Returns:
+        list[Contact] | list[Row]: A list of contacts that match the search criteria.
+    """
+    stmt = _select_contacts(lean).where(Contact.user_id == user.id, Contact.deleted_at.is_(None))
+    if query:
+        dialect = search.dialect_name(db)
+        stmt = stmt.where(search.search_condition(query, dialect))
+        rank = search.search_rank(query, dialect)
+        if rank is not None:
+            stmt = stmt.order_by(rank.desc())
+    stmt = stmt.order_by(Contact.id).offset(offset).limit(limit)
+    result = await db.execute(stmt)
+    return result.all() if lean else result.scalars().all()
+
+
+async def get_contacts_page(limit: int, after: str | None, query: str | None, sort: str,
+                            db: AsyncSession, user: User, lean: bool = False):
+    """
+    Retrieve one keyset-paginated page of contacts for the current user.
+
+    Unlike offset pagination, the page is located with an index seek on
+    ``(user_id, id)`` or ``(user_id, name, id)``, so the cost does not grow with the page number.
+
+    Args:
+        limit (int): The maximum number of contacts to return.
+        after (str | None): The cursor returned with the previous page, or None for the first page.
+        query (str | None): An optional search query, see :func:`get_contacts`. Cursor pages keep the
+            keyset order instead of ordering matches by relevance.
+        sort (str): The sort key, ``"id"`` or ``"name"``.
         db (AsyncSession): The database session dependency.
         user (User): The current authenticated user dependency.
+        lean (bool): Select the contact columns only, see :func:`get_contacts`. Defaults to False.
 
     Returns:
-        list[Contact]: A list of contacts that match the search criteria.
+        tuple[list[Contact] | list[Row], str | None]: The contacts and the cursor of the next page, if there is one.
+
+    Raises:
+        ValueError: If ``after`` is not a valid cursor for ``sort``.
     """
-    stmt = select(Contact).filter_by(user=user).offset(offset).limit(limit)
+    if sort == "id":
+        order_by = (Contact.id,)
+    else:
+        order_by = (Contact.name, Contact.id)
+    stmt = (_select_contacts(lean).where(Contact.user_id == user.id, Contact.deleted_at.is_(None))
+            .order_by(*order_by).limit(limit + 1))
+    if after:
+        values = decode_cursor(after, sort)
+        stmt = stmt.where(tuple_(*order_by) > tuple_(*values))
     if query:
-        search = f"%{query.lower()}%"
-        stmt = stmt.where(or_(
-            Contact.name.ilike(search),
-            Contact.email.ilike(search),
-            Contact.phone.ilike(search),
-            cast(Contact.birthday, String).like(search),
-            Contact.additional_data.ilike(search)
-        ))
+        stmt = stmt.where(search.search_condition(query, search.dialect_name(db)))
     result = await db.execute(stmt)
-    return result.scalars().all()
+    contacts = list(result.all() if lean else result.scalars().all())
+    next_cursor = None
+    if limit > 0 and len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(sort, contacts[-1])
+    return contacts, next_cursor
 
 
 async def get_contact_by_id(contact_id: int, user: User, db: AsyncSession = Depends(get_db)):
@@ -54,7 +190,7 @@ async def get_contact_by_id(contact_id: int, user: User, db: AsyncSession = Depe
     Returns:
         Contact | None: The contact that matches the given ID, or None if not found.
     """
-    stmt = select(Contact).where(Contact.id == contact_id, Contact.user == user)
+    stmt = select(Contact).where(Contact.id == contact_id, Contact.user_id == user.id, Contact.deleted_at.is_(None))
     result = await db.execute(stmt)
     return result.scalars().first()
 
@@ -63,8 +199,9 @@ async def create_contact(contact: ContactShema, user: User, db: AsyncSession = D
     """
     Create a new contact for the current user.
 
-    This function checks if a contact with the same email or phone already exists for the current user.
-    If it does not exist, it creates a new contact and assigns it to the current user.
+    The contact is inserted with a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING``: the
+    per-user unique indexes on ``(user_id, email)`` and ``(user_id, phone)`` reject duplicates
+    atomically, and nothing is returned for them.
 
     Args:
         contact (ContactShema): The contact details to create.
@@ -72,27 +209,122 @@ async def create_contact(contact: ContactShema, user: User, db: AsyncSession = D
         db (AsyncSession): The database session dependency.
 
     Returns:
-        Contact: The newly created contact if successful, or None if a contact with the same email or phone already exists.
+        Contact: The newly created contact if successful, or None if the user already has a contact with the same email or phone.
     """
-
-    stmt = select(Contact).where(or_(Contact.email == contact.email, Contact.phone == contact.phone))
+    insert = sqlite.insert if search.dialect_name(db) == "sqlite" else postgresql.insert
+    stmt = (insert(Contact).values(**contact.model_dump(), user_id=user.id).on_conflict_do_nothing()
+            .returning(Contact))
     result = await db.execute(stmt)
-    contact_in_db = result.scalars().unique().first()
-    if contact_in_db:
+    new_contact = result.scalars().first()
+    if not new_contact:
+        await db.rollback()
+        return None
+    db.expunge(new_contact)
+    await db.commit()
+    await after_write(user)
+    return _attach_owner(new_contact, user)
+
+
+async def import_contacts(contacts: list[dict], user: User, db: AsyncSession = Depends(get_db)) -> int:
+    """
+    Insert a batch of validated contacts for the current user with ``INSERT ... ON CONFLICT DO NOTHING``
+    and commit it.
+
+    Contacts whose email or phone the user already has, in the database or earlier in the batch, are skipped.
+
+    Args:
+        contacts (list[dict]): The contact fields, as dumped from :class:`ContactShema`.
+        user (User): The current authenticated user.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        int: The number of contacts created.
+    """
+    if not contacts:
+        return 0
+    insert = sqlite.insert if search.dialect_name(db) == "sqlite" else postgresql.insert
+    # Executed with a parameter list, the statement is compiled once and cached; SQLAlchemy's
+    # "insertmanyvalues" sends it as multi-row INSERTs.
+    stmt = insert(Contact.__table__).on_conflict_do_nothing().returning(Contact.id)
+    result = await db.execute(stmt, [{**contact, "user_id": user.id} for contact in contacts])
+    created = len(result.all())
+    await db.commit()
+    if created:
+        await after_write(user)
+    return created
+
+
+EXPORT_COLUMNS = (Contact.id, Contact.name, Contact.surname, Contact.email, Contact.phone, Contact.birthday,
+                  Contact.additional_data)
+# The lean list view: a contact without its owner, who is the user asking anyway.
+LEAN_COLUMNS = (*EXPORT_COLUMNS, Contact.created_at, Contact.updated_at)
+
+
+async def stream_contacts(user: User, db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Stream all of the user's contacts in ID order through a server-side cursor.
+
+    Plain column rows are fetched ``batch_size`` at a time, without building ORM objects, so memory
+    stays bounded by one batch whatever the number of contacts.
+
+    Args:
+        user (User): The owner of the contacts.
+        db (AsyncSession): A session dedicated to the stream; its connection is held until the stream ends.
+        batch_size (int): The number of rows fetched per round trip. Defaults to 1000.
+
+    Yields:
+        Sequence[RowMapping]: The next batch of rows, keyed by the :data:`EXPORT_COLUMNS` names.
+    """
+    stmt = (select(*EXPORT_COLUMNS).where(Contact.user_id == user.id, Contact.deleted_at.is_(None))
+            .order_by(Contact.id).execution_options(yield_per=batch_size))
+    result = await db.stream(stmt)
+    async for rows in result.mappings().partitions():
+        yield rows
+
+
+def _attach_owner(contact: Contact, user: User) -> Contact:
+    """
+    Fill the ``user`` relationship of a contact loaded by ``RETURNING``, which cannot join it, from
+    the user who made the request, so that serializing it does not trigger a lazy load.
+    """
+    owner = user if isinstance(user, User) else User(id=user.id, username=user.username, email=user.email,
+                                                     avatar=user.avatar)
+    set_committed_value(contact, "user", owner)
+    return contact
+
+
+async def _update_returning(contact_id: int, values: dict, user: User, db: AsyncSession) -> Contact | None:
+    """
+    Update the given columns of a user's contact in a single ``UPDATE ... RETURNING`` statement.
+
+    Raises:
+        IntegrityError: If the new email or phone belongs to another of the user's contacts.
+    """
+    if not values:
+        return await get_contact_by_id(contact_id=contact_id, user=user, db=db)
+    stmt = (update(Contact).where(Contact.id == contact_id, Contact.user_id == user.id, Contact.deleted_at.is_(None))
+            .values(**values).returning(Contact))
+    try:
+        result = await db.execute(stmt)
+    except IntegrityError:
+        await db.rollback()
+        raise
+    contact_in_db = result.scalars().first()
+    if not contact_in_db:
         return None
-    new_contact = Contact(**contact.model_dump(), user_id=user.id)
-    db .add(new_contact)
+    # Detach before committing so the returned row is not expired and reloaded.
+    db.expunge(contact_in_db)
     await db.commit()
-    await db.refresh(new_contact)
-    return new_contact
+    await after_write(user)
+    return _attach_owner(contact_in_db, user)
 
 
 async def update_contact(contact_id: int, contact: ContactShema, user: User, db: AsyncSession = Depends(get_db)):
     """
     Update an existing contact for the current user.
 
-    This function checks if a contact with the given ID exists for the current user.
-    If it does, it updates the contact with the provided details.
+    The contact is updated and returned in a single ``UPDATE ... RETURNING`` round trip scoped by
+    ``user_id``. A missing birthday keeps the stored one.
 
     Args:
         contact_id (int): The ID of the contact to update.
@@ -103,30 +335,38 @@ async def update_contact(contact_id: int, contact: ContactShema, user: User, db:
     Returns:
         Contact | None: The updated contact if successful, or None if the contact does not exist.
     """
-    stmt = select(Contact).filter_by(id=contact_id, user=user)
-    result = await db.execute(stmt)
-    contact_in_db = result.scalars().unique().first()
-    if not contact_in_db:
-        return None
-    contact_in_db.name = contact.name
-    contact_in_db.surname = contact.surname
-    contact_in_db.email = contact.email
-    contact_in_db.phone = contact.phone
-    if contact.birthday:
-        contact_in_db.birthday = contact.birthday
-    if contact_in_db.birthday:
-        contact_in_db.additional_data = contact.additional_data
-    await db.commit()
-    await db.refresh(contact_in_db)
-    return contact_in_db
+    values = contact.model_dump()
+    if values["birthday"] is None:
+        del values["birthday"]
+    return await _update_returning(contact_id, values, user, db)
+
+
+async def patch_contact(contact_id: int, contact: ContactUpdateShema, user: User, db: AsyncSession = Depends(get_db)):
+    """
+    Partially update an existing contact for the current user.
+
+    Only the fields present in the request are written, in a single ``UPDATE ... RETURNING``
+    round trip scoped by ``user_id``.
+
+    Args:
+        contact_id (int): The ID of the contact to update.
+        contact (ContactUpdateShema): The fields to change.
+        user (User): The current authenticated user.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        Contact | None: The updated contact if successful, or None if the contact does not exist.
+    """
+    return await _update_returning(contact_id, contact.model_dump(exclude_unset=True), user, db)
 
 
 async def delete_contact(contact_id: int, user: User, db: AsyncSession = Depends(get_db)):
     """
     Delete a contact for the current user.
 
-    This function checks if a contact with the given ID exists for the current user.
-    If it does, it deletes the contact.
+    The contact is turned into a tombstone, by setting ``deleted_at``, and returned in a single
+    ``UPDATE ... RETURNING`` round trip scoped by ``user_id``. Tombstones are hidden from every read
+    but the changes feed, see :func:`get_changes`, until :func:`compact_tombstones` removes them.
 
     Args:
         contact_id (int): The ID of the contact to delete.
@@ -136,11 +376,246 @@ async def delete_contact(contact_id: int, user: User, db: AsyncSession = Depends
     Returns:
         Contact | None: The deleted contact if successful, or None if the contact does not exist.
     """
-    stmt = select(Contact).filter_by(id=contact_id, user=user)
+    stmt = (update(Contact).where(Contact.id == contact_id, Contact.user_id == user.id, Contact.deleted_at.is_(None))
+            .values(deleted_at=func.now()).returning(Contact))
     result = await db.execute(stmt)
-    contact_in_db = result.scalars().unique().first()
+    contact_in_db = result.scalars().first()
     if not contact_in_db:
         return None
-    await db.delete(contact_in_db)
+    db.expunge(contact_in_db)
     await db.commit()
-    return contact_in_db
+    await after_write(user)
+    return _attach_owner(contact_in_db, user)
+
+
+UNIQUE_FIELDS = ("email", "phone")
+
+
+async def apply_batch(operations: list[BatchCreate | BatchUpdate | BatchDelete], user: User,
+                      db: AsyncSession = Depends(get_db)) -> list[dict]:
+    """
+    Apply a batch of create, update and delete operations for the current user in one transaction.
+
+    Each kind of operation runs as one set-based statement whatever the batch size: deletes first,
+    as tombstones like :func:`delete_contact`, with ``UPDATE ... WHERE id IN (...) RETURNING``,
+    then updates with a single ``UPDATE ... SET column = CASE id WHEN ... END ... RETURNING``, then
+    creates with ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+
+    Operations on contacts that do not exist, or were deleted earlier in the batch, are reported as
+    ``not_found``. An update to an email or phone held by another contact before the batch, or
+    taken by an earlier update of the batch, is reported as ``conflict`` and skipped, as are creates
+    rejected by the unique indexes. Several updates of the same contact are merged in order.
+
+    Args:
+        operations (list[BatchCreate | BatchUpdate | BatchDelete]): The operations, in request order.
+        user (User): The current authenticated user.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        list[dict]: One result per operation, in request order, as :class:`BatchResult` fields.
+
+    Raises:
+        IntegrityError: If the updates still violate a unique index, e.g. two contacts swapping
+            emails; nothing is applied.
+    """
+    results = [{"index": index, "op": op.op, "status": "not_found", "id": getattr(op, "id", None),
+                "contact": None} for index, op in enumerate(operations)]
+    try:
+        deleted = await _batch_delete([op for op in operations if op.op == "delete"], user, db)
+        updated = await _batch_update([(index, op) for index, op in enumerate(operations) if op.op == "update"],
+                                      results, user, db)
+        created = await _batch_create([(index, op) for index, op in enumerate(operations) if op.op == "create"],
+                                      results, user, db)
+    except IntegrityError:
+        await db.rollback()
+        raise
+    contacts = {contact.id: contact for contact in (*updated, *created)}
+    for contact in contacts.values():
+        # Detach before committing so the returned rows are not expired and reloaded.
+        db.expunge(contact)
+    await db.commit()
+    if deleted or updated or created:
+        await after_write(user)
+
+    for result in results:
+        if result["op"] == "delete" and result["id"] in deleted:
+            result["status"] = "deleted"
+        elif result["status"] in ("updated", "created"):
+            result["contact"] = _attach_owner(contacts[result["id"]], user)
+    return results
+
+
+async def _batch_delete(deletes: list[BatchDelete], user: User, db: AsyncSession) -> set[int]:
+    if not deletes:
+        return set()
+    stmt = (update(Contact).where(Contact.user_id == user.id, Contact.id.in_({op.id for op in deletes}),
+                                  Contact.deleted_at.is_(None))
+            .values(deleted_at=func.now()).returning(Contact.id))
+    return set((await db.execute(stmt)).scalars().all())
+
+
+async def _batch_update(updates: list[tuple[int, BatchUpdate]], results: list[dict], user: User,
+                        db: AsyncSession) -> list[Contact]:
+    if not updates:
+        return []
+    stmt = select(Contact.id).where(Contact.user_id == user.id, Contact.id.in_({op.id for _, op in updates}),
+                                    Contact.deleted_at.is_(None))
+    existing = set((await db.execute(stmt)).scalars().all())
+    changes = {index: op.contact.model_dump(exclude_unset=True) for index, op in updates}
+
+    # Who holds each new email and phone before the batch.
+    wanted = {field: {change[field] for change in changes.values() if change.get(field) is not None}
+              for field in UNIQUE_FIELDS}
+    holders = {}
+    if wanted["email"] or wanted["phone"]:
+        stmt = select(Contact.id, Contact.email, Contact.phone).where(
+            Contact.user_id == user.id, Contact.deleted_at.is_(None),
+            or_(Contact.email.in_(wanted["email"]), Contact.phone.in_(wanted["phone"])))
+        for row in await db.execute(stmt):
+            holders[("email", row.email)] = row.id
+            holders[("phone", row.phone)] = row.id
+
+    values: dict[int, dict] = {}
+    for index, op in updates:
+        if op.id not in existing:
+            continue
+        keys = [(field, changes[index][field]) for field in UNIQUE_FIELDS if changes[index].get(field) is not None]
+        if any(holders.get(key, op.id) != op.id for key in keys):
+            results[index]["status"] = "conflict"
+            continue
+        holders.update((key, op.id) for key in keys)
+        values.setdefault(op.id, {}).update(changes[index])
+        results[index]["status"] = "updated"
+    if not values:
+        return []
+
+    contacts = []
+    changed = {contact_id: change for contact_id, change in values.items() if change}
+    if changed:
+        table = Contact.__table__
+        assignments = {
+            field: case({contact_id: literal(change[field], table.c[field].type)
+                         for contact_id, change in changed.items() if field in change},
+                        value=Contact.id, else_=getattr(Contact, field))
+            for field in {field for change in changed.values() for field in change}
+        }
+        stmt = (update(Contact).where(Contact.user_id == user.id, Contact.id.in_(changed)).values(assignments)
+                .returning(Contact))
+        contacts += (await db.execute(stmt)).scalars().all()
+    # Contacts updated with no field to change are returned as they are.
+    unchanged = [contact_id for contact_id in values if contact_id not in changed]
+    if unchanged:
+        contacts += (await db.execute(select(Contact).where(Contact.id.in_(unchanged)))).scalars().all()
+    return contacts
+
+
+async def _batch_create(creates: list[tuple[int, BatchCreate]], results: list[dict], user: User,
+                        db: AsyncSession) -> list[Contact]:
+    if not creates:
+        return []
+    insert = sqlite.insert if search.dialect_name(db) == "sqlite" else postgresql.insert
+    stmt = insert(Contact).on_conflict_do_nothing().returning(Contact)
+    contacts = (await db.scalars(stmt, [{**op.contact.model_dump(), "user_id": user.id} for _, op in creates])).all()
+    # Rows come back unordered and without the skipped ones; the email identifies them per user.
+    by_email = {contact.email: contact for contact in contacts}
+    for index, op in creates:
+        contact = by_email.get(op.contact.email)
+        if contact is not None and contact.phone == op.contact.phone:
+            del by_email[op.contact.email]
+            results[index].update(status="created", id=contact.id)
+        else:
+            results[index]["status"] = "conflict"
+    return list(contacts)
+
+
+class CursorExpired(Exception):
+    pass
+
+
+async def _db_now(db: AsyncSession) -> datetime:
+    """
+    The database clock, as a naive timestamp like ``func.now()`` writes it to ``updated_at``.
+    """
+    now = func.now() if search.dialect_name(db) == "sqlite" else cast(func.now(), DateTime)
+    return await db.scalar(select(now))
+
+
+async def get_changes(since: str | None, limit: int, user: User,
+                      db: AsyncSession = Depends(get_db)) -> tuple[list[Contact], str, bool]:
+    """
+    Retrieve the user's contacts changed after a changes feed cursor, tombstones included.
+
+    Changes come in ``(updated_at, id)`` order from the ``(user_id, updated_at, id)`` index.
+    Without a cursor the live contacts are returned, as a first full sync. Only changes older than
+    ``CHANGES_SETTLE_SECONDS`` are served: ``updated_at`` is taken from the database clock when a
+    write starts, so a transaction still running can commit a timestamp that is already behind
+    the newest one. When there is nothing more to read, the next cursor moves up to that horizon,
+    so the cursors of quiet address books do not expire.
+
+    A cursor also carries the horizon of the sync it continues, the time up to which the client has
+    seen every change; it expires by that time, not by the position it points at, so paging through
+    contacts last changed long ago does not expire it.
+
+    Args:
+        since (str | None): The cursor returned by the previous call, or None for a full sync.
+        limit (int): The maximum number of changes to return.
+        user (User): The current authenticated user.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        tuple[list[Contact], str, bool]: The changed contacts, the cursor to pass as ``since`` next
+        time, and whether more changes are already waiting.
+
+    Raises:
+        ValueError: If ``since`` is not a changes feed cursor.
+        CursorExpired: If ``since`` was issued more than ``TOMBSTONE_RETENTION_DAYS`` ago, so
+            tombstones it needs may have been compacted; the client has to sync from scratch.
+    """
+    now = await _db_now(db)
+    horizon = now - timedelta(seconds=config.CHANGES_SETTLE_SECONDS)
+    issued_at = horizon
+    stmt = select(Contact).where(Contact.user_id == user.id, Contact.updated_at < horizon)
+    if since:
+        issued_at, updated_at, contact_id = decode_cursor(since, "updated_at")
+        if issued_at < now - timedelta(days=config.TOMBSTONE_RETENTION_DAYS):
+            raise CursorExpired()
+        stmt = stmt.where(tuple_(Contact.updated_at, Contact.id) >
+                          tuple_(literal(updated_at, Contact.updated_at.type), contact_id))
+    else:
+        stmt = stmt.where(Contact.deleted_at.is_(None))
+    stmt = stmt.order_by(Contact.updated_at, Contact.id).limit(limit + 1)
+    result = await db.execute(stmt)
+    contacts = list(result.scalars().all())
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        return contacts, _encode_values("updated_at", [issued_at.isoformat(), last.updated_at.isoformat(),
+                                                       last.id]), True
+    return contacts, _encode_values("updated_at", [horizon.isoformat(), horizon.isoformat(), 0]), False
+
+
+async def compact_tombstones(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Remove the tombstones older than ``TOMBSTONE_RETENTION_DAYS`` for good.
+
+    Rows are deleted ``batch_size`` at a time, each batch in its own transaction, so that
+    compaction never holds locks on many rows for long. Changes feed cursors older than the
+    retention are refused with :class:`CursorExpired`, so no client can miss a removed tombstone.
+
+    Args:
+        db (AsyncSession): The database session to use.
+        batch_size (int): The number of tombstones deleted per transaction. Defaults to 1000.
+
+    Returns:
+        int: The number of tombstones removed.
+    """
+    cutoff = await _db_now(db) - timedelta(days=config.TOMBSTONE_RETENTION_DAYS)
+    removed = 0
+    while True:
+        expired = (select(Contact.id).where(Contact.deleted_at < literal(cutoff, Contact.deleted_at.type))
+                   .limit(batch_size).scalar_subquery())
+        result = await db.execute(delete(Contact).where(Contact.id.in_(expired)))
+        await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
@@ -0,0 +1,128 @@
+import re
+from datetime import date
+
+from sqlalchemy import or_, and_, func, literal_column, select, true, table, column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entity.models import Contact
+
+search_vector = literal_column("contacts.search_vector", type_=TSVECTOR)
+contacts_fts = table("contacts_fts", column("rowid"))
+# FTS5 exposes a hidden column named after the table; it is the left operand of MATCH and bm25().
+contacts_fts_column = literal_column("contacts_fts")
+
+_DATE_PREFIX = re.compile(r"^(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?$")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# The FTS5 trigram tokenizer cannot match anything shorter than three characters.
+FTS5_MIN_LENGTH = 3
+# bm25() weights of the contacts_fts columns: name, surname, email, phone, additional_data.
+FTS5_WEIGHTS = (10.0, 10.0, 4.0, 4.0, 1.0)
+
+
+def dialect_name(db: AsyncSession) -> str:
+    """
+    Name of the SQL dialect the session is bound to, e.g. ``"postgresql"`` or ``"sqlite"``.
+    """
+    bind = getattr(db, "bind", None)
+    name = getattr(getattr(bind, "dialect", None), "name", None)
+    return name if isinstance(name, str) else "postgresql"
+
+
+def _birthday_condition(query: str):
+    """
+    Match ``YYYY``, ``YYYY-MM`` or ``YYYY-MM-DD`` queries against the birthday as a date range.
+    """
+    match = _DATE_PREFIX.match(query)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    try:
+        if day:
+            start = end = date(int(year), int(month), int(day))
+        elif month:
+            start = date(int(year), int(month), 1)
+            end = date(int(year) + (int(month) == 12), int(month) % 12 + 1, 1)
+            return and_(Contact.birthday >= start, Contact.birthday < end)
+        else:
+            start, end = date(int(year), 1, 1), date(int(year), 12, 31)
+    except ValueError:
+        return None
+    return Contact.birthday.between(start, end)
+
+
+def _tsquery(query: str):
+    words = _WORD.findall(query.lower())
+    if not words:
+        return None
+    return func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+
+
+def _fts5_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+def search_condition(query: str, dialect: str):
+    """
+    Build the WHERE clause of a contacts search.
+
+    On Postgres the query is matched against the ``search_vector`` generated column (GIN index)
+    with prefix matching per word, and against name, email and phone with ``ILIKE`` backed by
+    ``pg_trgm`` GIN indexes for substring matches. On SQLite the ``contacts_fts`` FTS5 table with
+    the trigram tokenizer is used. Date-like queries additionally match the birthday.
+
+    Args:
+        query (str): The raw search query.
+        dialect (str): The SQL dialect name.
+
+    Returns:
+        ColumnElement: The filter expression.
+    """
+    query = query.strip()
+    pattern = f"%{query.lower()}%"
+    conditions = []
+    if dialect == "postgresql":
+        tsquery = _tsquery(query)
+        if tsquery is not None:
+            conditions.append(search_vector.op("@@")(tsquery))
+        conditions += [Contact.name.ilike(pattern), Contact.email.ilike(pattern), Contact.phone.ilike(pattern)]
+    elif dialect == "sqlite" and len(query) >= FTS5_MIN_LENGTH:
+        matches = select(contacts_fts.c.rowid).where(contacts_fts_column.match(_fts5_phrase(query)))
+        conditions.append(Contact.id.in_(matches))
+    else:
+        conditions += [Contact.name.ilike(pattern), Contact.surname.ilike(pattern), Contact.email.ilike(pattern),
+                       Contact.phone.ilike(pattern), Contact.additional_data.ilike(pattern)]
+    birthday = _birthday_condition(query)
+    if birthday is not None:
+        conditions.append(birthday)
+    return or_(*conditions) if conditions else true()
+
+
+def search_rank(query: str, dialect: str):
+    """
+    Build a relevance score for a contacts search, higher is better.
+
+    Args:
+        query (str): The raw search query.
+        dialect (str): The SQL dialect name.
+
+    Returns:
+        ColumnElement | None: The rank expression, or None if the backend cannot rank this query.
+    """
+    query = query.strip()
+    if dialect == "postgresql":
+        rank = func.greatest(func.similarity(Contact.name, query), func.similarity(Contact.email, query))
+        tsquery = _tsquery(query)
+        if tsquery is not None:
+            rank = rank + func.ts_rank_cd(search_vector, tsquery)
+        return rank
+    if dialect == "sqlite" and len(query) >= FTS5_MIN_LENGTH:
+        # bm25() is only available inside an FTS query, so rank through a correlated lookup. The column
+        # weights mirror the A/B/C weights of the Postgres search_vector.
+        return -(
+            select(func.bm25(contacts_fts_column, *FTS5_WEIGHTS)).select_from(contacts_fts)
+            .where(contacts_fts_column.match(_fts5_phrase(query)), contacts_fts.c.rowid == Contact.id)
+            .scalar_subquery()
+        )
+    return None
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.db import get_db
 from src.schemas.user import UserShema
 from src.repository.auth import get_user_by_email
+from src.services.cache import user_cache
 
 
 async def update_avatar(email: str, url: str | None, db: AsyncSession = Depends(get_db)) -> UserShema:
@@ -23,4 +24,5 @@ async def update_avatar(email: str, url: str | None, db: AsyncSession = Depends(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await user_cache.invalidate(email)
     return user
@@ -0,0 +1,119 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf import messages
+from src.conf.config import config
+
+from src.database.db import get_db, sessionmanager, replica_sessionmanager, session_metrics
+from src.entity.models import Role
+from src.repository import contacts as repository_contacts
+from src.services.cache import user_cache
+from src.services.hashing import hashing_pool
+from src.services.profiler import TOKEN_HEADER, profile_store, sign_token
+from src.services.roles import RoleAccess
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+admin_only = RoleAccess([Role.admin])
+
+
+@router.get("/cache_stats", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def cache_stats():
+    """
+    Hit and miss counters of this worker's user cache.
+
+    Returns:
+        dict: The counters, see :meth:`src.services.cache.UserCache.stats`.
+    """
+    return {"user_cache": user_cache.stats()}
+
+
+@router.get("/hashing_stats", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def hashing_stats():
+    """
+    Queueing metrics of this worker's password hashing pool.
+
+    Returns:
+        dict: The metrics, see :meth:`src.services.hashing.HashingPool.stats`.
+    """
+    return {"password_hashing": hashing_pool.stats()}
+
+
+@router.get("/db_pool", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def db_pool():
+    """
+    Database connection pool statistics of this worker, to size ``DB_POOL_SIZE`` and ``DB_MAX_OVERFLOW``.
+
+    Returns:
+        dict: The statistics, see :meth:`src.database.db.DatabaseSessionManager.pool_status`.
+    """
+    return {"db_pool": sessionmanager.pool_status(),
+            "replica_pool": replica_sessionmanager.pool_status() if replica_sessionmanager is not None else None}
+
+
+@router.get("/db_sessions", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def db_sessions():
+    """
+    Request sessions per route of this worker, and how many of them never checked out a connection.
+
+    Returns:
+        dict: The counts, see :meth:`src.database.db.SessionMetrics.stats`.
+    """
+    return {"db_sessions": session_metrics.stats()}
+
+
+@router.post("/compact_tombstones", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def compact_tombstones(db: AsyncSession = Depends(get_db)):
+    """
+    Remove the contact tombstones older than ``TOMBSTONE_RETENTION_DAYS`` now, instead of waiting
+    for the background compaction.
+
+    Returns:
+        dict: The number of tombstones removed.
+    """
+    return {"removed": await repository_contacts.compact_tombstones(db)}
+
+
+@router.get("/profiles", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def profiles():
+    """
+    The slowest profiled requests of this worker, slowest first.
+
+    Requests are profiled on demand, see :class:`src.middleware.profiler.ProfilerMiddleware`.
+
+    Returns:
+        dict: A summary of every profile; the stacks are read from ``/admin/profiles/{profile_id}``.
+    """
+    return {"profiles": [profile.summary() for profile in profile_store.slowest()]}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(admin_only)])
+async def profile(profile_id: str):
+    """
+    The sampled stacks of a profiled request, in the collapsed format of flamegraph.pl and speedscope.
+
+    Raises:
+        HTTPException: 404 if this worker has no such profile.
+    """
+    found = profile_store.get(profile_id)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.PROFILE_NOT_FOUND)
+    return PlainTextResponse(found.folded())
+
+
+@router.post("/profiles/token", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def profile_token(ttl: int = Query(300, ge=1, le=86400)):
+    """
+    A signed token that gets any request carrying it in the ``X-Profile-Token`` header profiled,
+    for ``ttl`` seconds, without an admin login on that request.
+
+    Raises:
+        HTTPException: 400 if ``PROFILER_SECRET`` is not set.
+    """
+    if not config.PROFILER_SECRET:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.PROFILER_DISABLED)
+    expires = int(time.time()) + ttl
+    return {"header": TOKEN_HEADER, "token": sign_token(config.PROFILER_SECRET, expires), "expires": expires}
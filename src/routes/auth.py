@@ -28,6 +28,7 @@ async def signup(body: UserShema, bt: BackgroundTasks, request: Request, db: Ses
 
     Raises:
     HTTPException: If the given email already exists.
+    If the password hashing pool is saturated (503).
 
     Returns:
     UserResponse: The created user.
@@ -35,7 +36,7 @@ async def signup(body: UserShema, bt: BackgroundTasks, request: Request, db: Ses
     exist_user = await repository_auth.get_user_by_email(email=body.email, db=db)
     if exist_user:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.ACCOUNT_EXISTS)
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.hash_password(body.password)
     new_user = await repository_auth.create_user(body=body, db=db)
     bt.add_task(send_email, new_user.email, new_user.username, str(request.base_url))
     return new_user
@@ -53,6 +54,7 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
     Raises:
     HTTPException: If the given email or password is invalid.
     If the email is not confirmed.
+    If the password hashing pool is saturated (503).
 
     Returns:
     TokenShema: The access and refresh tokens.
@@ -62,8 +64,11 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.CREDENTIALS_EXCEPTION)
     if not user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.EMAIL_NOT_CONFIRMED)
-    if not auth_service.verify_password(body.password, user.password):
+    verified, new_hash = await auth_service.verify_and_update(body.password, user.password)
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.CREDENTIALS_EXCEPTION)
+    if new_hash:
+        await repository_auth.update_password(user, new_hash, db)
     access_token = await auth_service.create_access_token(data={"sub": user.email})
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
     await repository_auth.update_token(user=user, refresh_token=refresh_token, db=db)
@@ -124,7 +129,7 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.VERIFICATION_ERROR)
     if user.confirmed:
         return {"message": "Your email is already confirmed"}
-    await repository_auth.confirmed_email(email, db)
+    await repository_auth.confirmed_email(user, db)
     return {"message": "Email confirmed"}
 
 
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import release_connection
+from src.entity.models import User
 from src.repository import birthdays as repository_birthdays
 from src.schemas.contact import  ContactResponse
+from src.services.auth import auth_service
+from src.services.replica import get_read_db
 
 router = APIRouter(prefix="/birthdays", tags=["birthdays"])
 
 @router.get("/upcoming_birthdays", response_model=list[ContactResponse])
-async def get_upcoming_birthdays(db: AsyncSession = Depends(get_db)):
+async def get_upcoming_birthdays(days: int = Query(7, ge=1, le=366), db: AsyncSession = Depends(get_read_db),
+                                 current_user: User = Depends(auth_service.get_current_user)):
     """
-    Get list of users whose birthday is in the next 7 days
+    Get list of the current user's contacts whose birthday is in the next ``days`` days (7 by default)
     """
-    users = await repository_birthdays.get_upcoming_birthdays(db=db)
+    users = await repository_birthdays.get_cached_upcoming_birthdays(user=current_user, db=db, days=days)
+    await release_connection(db)
     return users
 
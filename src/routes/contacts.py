@@ -1,42 +1,211 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, status, Path, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.conf import messages
+from src.conf.config import config
+from src.database.db import get_db, get_session_factory, release_connection
 from src.entity.models import User
 from src.repository import contacts as repository_contacts
-from src.schemas.contact import ContactResponse, ContactShema
+from src.schemas.contact import (BatchRequest, BatchResponse, ContactChangesPage, ContactLeanPage,
+                                 ContactLeanResponse, ContactResponse, ContactShema, ContactUpdateShema, ContactPage,
+                                 ImportJobResponse)
+from src.services import contacts_io
 from src.services.auth import auth_service
+from src.services.replica import get_read_db
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+LEAN_LIST = TypeAdapter(list[ContactLeanResponse])
+
 
-@router.get("/", response_model=list[ContactResponse])
+@router.get("/", response_model=list[ContactResponse] | ContactPage,
+            responses={200: {"model": list[ContactLeanResponse] | ContactLeanPage}})
 async def get_contacts(limit: int = Query(10), offset: int = Query(0, ge=0), query: str | None = Query(None),
-                       db: AsyncSession = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
+                       pagination: Literal["offset", "cursor"] = Query("offset"),
+                       after: str | None = Query(None), sort: Literal["id", "name"] = Query("id"),
+                       view: Literal["full", "lean"] = Query("full"),
+                       db: AsyncSession = Depends(get_read_db), current_user: User = Depends(auth_service.get_current_user)):
     """
     Retrieve a list of contacts for the current user.
 
     This endpoint returns a paginated list of contacts that belong to the current user.
     The results can be filtered by a search query.
 
+    With ``pagination=offset`` (the default) a plain list is returned. With ``pagination=cursor``
+    the response is a page object with ``items`` and ``next_cursor``; pass ``next_cursor`` back
+    as ``after`` to get the following page.
+
+    With ``view=lean`` the contacts come without the embedded ``user``, which is always the
+    current user: only contact columns are selected, without joining ``users``, and the page is
+    serialized in one pass straight to JSON.
+
     Args:
         limit (int): The maximum number of contacts to return. Defaults to 10.
         offset (int): The number of contacts to skip before starting to collect the result set. Must be non-negative. Defaults to 0.
         query (str | None): An optional search query to filter contacts by name, email, phone, birthday, or additional data.
-        db (AsyncSession): The database session dependency.
+        pagination (str): Pagination mode, ``offset`` or ``cursor``. Defaults to ``offset``.
+        after (str | None): The cursor of the previous page. Only used in cursor mode.
+        sort (str): Sort key for cursor mode, ``id`` or ``name``. Defaults to ``id``.
+        view (str): ``full`` contacts or ``lean`` ones without the user. Defaults to ``full``.
+        db (AsyncSession): The read session dependency, on a replica unless the user wrote recently.
         current_user (User): The current authenticated user dependency.
 
     Returns:
-        list[ContactResponse]: A list of contacts that match the search criteria.
+        list[ContactResponse] | ContactPage: The contacts that match the search criteria, as
+        :class:`ContactLeanResponse` items with ``view=lean``.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
     """
 
     print("current_user", current_user)
-    contacts = await repository_contacts.get_contacts(limit=limit, offset=offset, query=query, db=db, user=current_user)
+    lean = view == "lean"
+    if pagination == "cursor":
+        try:
+            contacts, next_cursor = await repository_contacts.get_contacts_page(limit=limit, after=after, query=query,
+                                                                                sort=sort, db=db, user=current_user,
+                                                                                lean=lean)
+        except ValueError as err:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+        await release_connection(db)
+        if lean:
+            page = ContactLeanPage(items=LEAN_LIST.validate_python(contacts), next_cursor=next_cursor)
+            return Response(content=page.model_dump_json(), media_type="application/json")
+        return {"items": contacts, "next_cursor": next_cursor}
+    contacts = await repository_contacts.get_contacts(limit=limit, offset=offset, query=query, db=db, user=current_user,
+                                                      lean=lean)
+    await release_connection(db)
+    if lean:
+        return Response(content=LEAN_LIST.dump_json(LEAN_LIST.validate_python(contacts)), media_type="application/json")
     return contacts
 
 
+@router.get("/changes", response_model=ContactChangesPage)
+async def get_changes(since: str | None = Query(None), limit: int = Query(100, ge=1, le=1000),
+                      db: AsyncSession = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Retrieve the changes to the current user's contacts since the previous sync.
+
+    Call it without ``since`` for a full sync of the live contacts, then pass the returned
+    ``next_cursor`` as ``since`` to get only what changed afterwards: created and updated contacts
+    with their data, deleted ones as ``deleted`` tombstones. Keep calling while ``has_more`` is true.
+    Changes appear a few seconds after they are made, see ``CHANGES_SETTLE_SECONDS``. The feed
+    reads from the primary, as replica lag could hide changes behind the cursor.
+
+    Args:
+        since (str | None): The cursor returned by the previous call.
+        limit (int): The maximum number of changes to return. Defaults to 100.
+        db (AsyncSession): The database session dependency.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        ContactChangesPage: The changes in order, the next cursor and whether more are waiting.
+
+    Raises:
+        HTTPException: If the cursor is invalid (400), or older than ``TOMBSTONE_RETENTION_DAYS`` (410),
+            in which case the client must sync again without ``since``.
+    """
+    try:
+        contacts, next_cursor, has_more = await repository_contacts.get_changes(since=since, limit=limit,
+                                                                               user=current_user, db=db)
+    except repository_contacts.CursorExpired:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=messages.CHANGES_CURSOR_EXPIRED)
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+    await release_connection(db)
+    changes = [{"id": contact.id, "updated_at": contact.updated_at, "deleted": contact.deleted_at is not None,
+                "contact": None if contact.deleted_at is not None else contact} for contact in contacts]
+    return {"changes": changes, "next_cursor": next_cursor, "has_more": has_more}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts(format: Literal["csv", "ndjson", "vcard"] = Query("csv"),
+                          session_factory=Depends(get_session_factory),
+                          current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Export all contacts of the current user as a CSV, NDJSON or vCard file.
+
+    The file is streamed from a server-side cursor while it is downloaded, so its size is not
+    limited by the server's memory. CSV and vCard exports can be imported back with ``POST /contacts/import``.
+
+    Args:
+        format (str): ``csv``, ``ndjson`` or ``vcard``. Defaults to ``csv``.
+        session_factory: The session factory dependency of the stream.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        StreamingResponse: The file, as an attachment.
+    """
+    filename = f"contacts.{contacts_io.EXPORT_EXTENSIONS[format]}"
+    return StreamingResponse(contacts_io.export_contacts(format, current_user, session_factory),
+                             media_type=contacts_io.EXPORT_MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.post("/import", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_contacts(bt: BackgroundTasks, file: UploadFile = File(),
+                          format: Literal["csv", "ndjson", "vcard"] | None = Query(None),
+                          session_factory=Depends(get_session_factory),
+                          current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Import contacts for the current user from a CSV, NDJSON or vCard file.
+
+    The upload is streamed to a temporary file and imported by a background job; poll
+    ``GET /contacts/import/{job_id}`` for progress and the per-row error report. CSV files need a
+    header row naming the contact fields. Contacts whose email or phone the user already has are skipped.
+
+    Args:
+        bt (BackgroundTasks): The background tasks to add the import job to.
+        file (UploadFile): The file to import.
+        format (str | None): ``csv``, ``ndjson`` or ``vcard``. Defaults to the file extension.
+        session_factory: The session factory dependency of the job.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        ImportJobResponse: The queued job.
+
+    Raises:
+        HTTPException: If the format is unknown (400) or the file exceeds ``IMPORT_MAX_BYTES`` (413).
+    """
+    fmt = format or contacts_io.detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.IMPORT_FORMAT_UNKNOWN)
+    try:
+        job, path = await contacts_io.queue_import(file, fmt, current_user)
+    except contacts_io.UploadTooLarge:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=messages.IMPORT_TOO_LARGE)
+    bt.add_task(contacts_io.run_import, job, path, current_user, session_factory)
+    return job
+
+
+@router.get("/import/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(job_id: str, current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Retrieve the progress and error report of one of the current user's import jobs.
+
+    Args:
+        job_id (str): The ID returned by ``POST /contacts/import``.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        ImportJobResponse: The job state.
+
+    Raises:
+        HTTPException: If the job is not found, has expired or belongs to another user.
+    """
+    job = await contacts_io.get_import_job(job_id, current_user)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.IMPORT_JOB_NOT_FOUND)
+    return job
+
+
 @router.get("/{contact_id}", response_model=ContactResponse)
-async def get_user(contact_id: int, db: AsyncSession = Depends(get_db),
+async def get_user(contact_id: int, db: AsyncSession = Depends(get_read_db),
                    current_user: User = Depends(auth_service.get_current_user)):
     """
     Retrieve a contact by ID for the current user.
@@ -45,7 +214,7 @@ async def get_user(contact_id: int, db: AsyncSession = Depends(get_db),
 
     Args:
         contact_id (int): The ID of the contact to retrieve.
-        db (AsyncSession): The database session dependency.
+        db (AsyncSession): The read session dependency, on a replica unless the user wrote recently.
         current_user (User): The current authenticated user dependency.
 
     Returns:
@@ -55,6 +224,7 @@ async def get_user(contact_id: int, db: AsyncSession = Depends(get_db),
         HTTPException: If the contact is not found or does not belong to the current user.
     """
     contact = await repository_contacts.get_contact_by_id(contact_id=contact_id, db=db, user=current_user)
+    await release_connection(db)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
     return contact
@@ -81,11 +251,42 @@ async def create_contact(contact: ContactShema, db: AsyncSession = Depends(get_d
     """
     user = await repository_contacts.create_contact(contact=contact, db=db, user=current_user)
     if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Contact with this email or phone already exists")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_EXISTS)
     return user
 
 
+@router.post("/batch", response_model=BatchResponse)
+async def batch_contacts(batch: BatchRequest, db: AsyncSession = Depends(get_db),
+                         current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Create, update and delete several contacts of the current user in one request and one transaction.
+
+    Deletes are applied first, then updates, then creates. Updates change only the fields they
+    contain, like ``PATCH``. Each operation gets a result, in request order, with the status
+    ``created``, ``updated``, ``deleted``, ``not_found`` or ``conflict``; operations that fail are
+    skipped and the others are applied.
+
+    Args:
+        batch (BatchRequest): The operations, at most ``CONTACT_BATCH_MAX_SIZE``.
+        db (AsyncSession): The database session dependency.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        BatchResponse: The result of each operation.
+
+    Raises:
+        HTTPException: If the batch is too large (413), or its updates conflict with each other (409),
+            in which case nothing is applied.
+    """
+    if len(batch.operations) > config.CONTACT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=messages.BATCH_TOO_LARGE)
+    try:
+        results = await repository_contacts.apply_batch(batch.operations, user=current_user, db=db)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.CONTACT_EXISTS)
+    return {"results": results}
+
+
 @router.put("/{contact_id}", response_model=ContactResponse, status_code=status.HTTP_202_ACCEPTED)
 async def update_contact(contact_id: int, contact: ContactShema, db: AsyncSession = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user)):
@@ -104,15 +305,50 @@ async def update_contact(contact_id: int, contact: ContactShema, db: AsyncSessio
         ContactResponse: The updated contact.
 
     Raises:
-        HTTPException: If the contact is not found.
+        HTTPException: If the contact is not found, or another of the user's contacts has the same email or phone.
     """
 
-    user = await repository_contacts.update_contact(contact_id=contact_id, contact=contact, db=db, user=current_user)
+    try:
+        user = await repository_contacts.update_contact(contact_id=contact_id, contact=contact, db=db,
+                                                        user=current_user)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.CONTACT_EXISTS)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
     return user
 
 
+@router.patch("/{contact_id}", response_model=ContactResponse)
+async def patch_contact(contact_id: int, contact: ContactUpdateShema, db: AsyncSession = Depends(get_db),
+                        current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Partially update a contact for the current user.
+
+    Only the fields present in the request body are changed; ``birthday`` and ``additional_data``
+    can be cleared with an explicit null.
+
+    Args:
+        contact_id (int): The ID of the contact to update.
+        contact (ContactUpdateShema): The fields to change.
+        db (AsyncSession): The database session dependency.
+        current_user (User): The current authenticated user dependency.
+
+    Returns:
+        ContactResponse: The updated contact.
+
+    Raises:
+        HTTPException: If the contact is not found, or another of the user's contacts has the same email or phone.
+    """
+    try:
+        contact = await repository_contacts.patch_contact(contact_id=contact_id, contact=contact, db=db,
+                                                          user=current_user)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.CONTACT_EXISTS)
+    if not contact:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    return contact
+
+
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact(contact_id: int = Path(..., gt=0), db: AsyncSession = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user)):
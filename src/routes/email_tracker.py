@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, status, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, status, Response
 from fastapi.responses import FileResponse
 
-from src.database.db import get_db
 from dotenv import load_dotenv
 import logging
 
@@ -14,7 +12,7 @@ router = APIRouter(prefix="/amail_tracking", tags=["email_tracking"])
 
 
 @router.get("/{username}", response_class=FileResponse, status_code=status.HTTP_200_OK)
-async def email_tracker(username: str, response: Response, db: Session = Depends(get_db)):
+async def email_tracker(username: str, response: Response):
     """
     Endpoint for tracking email openning.
 
@@ -23,7 +21,6 @@ async def email_tracker(username: str, response: Response, db: Session = Depends
     Args:
         username (str): The username of the user.
         response (Response): The response object.
-        db (Session, optional): The database session. Defaults to Depends(get_db).
 
     Returns:
         FileResponse: A FileResponse object containing the image.
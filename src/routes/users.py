@@ -58,9 +58,6 @@ async def upload_avatar(file: UploadFile = File(), db: AsyncSession = Depends(ge
 
     public_id = f"avatar/{current_user.email}"
     upload_result = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-    current_user.avatar_url = cloudinary.CloudinaryImage(public_id).build_url(
-        width=250, height=250, crop="fill", gravity="face", radius=40, corp="fill", version=upload_result.get("version")
-    )
 
     new_user = await repository_users.update_avatar(email=current_user.email, url=upload_result.get("url"), db=db)
 
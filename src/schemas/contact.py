@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 from src.schemas.user import UserResponse
 
 
@@ -13,6 +13,15 @@ class ContactShema(BaseModel):
     additional_data: Optional[str] = None
 
 
+class ContactUpdateShema(BaseModel):
+    name: str = Field(None, max_length=150, min_length=1)
+    surname: str = Field(None, min_length=1, max_length=150)
+    email: EmailStr = None
+    phone: str = Field(None, min_length=5, max_length=20)
+    birthday: Optional[date] = None
+    additional_data: Optional[str] = None
+
+
 class ContactResponse(ContactShema):
     id: int = Field(..., gt=0)
     created_at: datetime
@@ -21,3 +30,95 @@ class ContactResponse(ContactShema):
 
     class Config:
         from_attributes = True
+
+
+class ContactPage(BaseModel):
+    items: list[ContactResponse]
+    next_cursor: Optional[str] = None
+
+
+class ContactLeanResponse(BaseModel):
+    # Stored contacts were validated on the way in; a plain ``str`` email skips re-validating every row.
+    id: int
+    name: str
+    surname: str
+    email: str
+    phone: str
+    birthday: Optional[date] = None
+    additional_data: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ContactLeanPage(BaseModel):
+    items: list[ContactLeanResponse]
+    next_cursor: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportJobResponse(BaseModel):
+    job_id: str
+    format: str
+    status: str
+    processed: int
+    created: int
+    skipped: int
+    failed: int
+    errors: list[ImportRowError]
+    error: Optional[str] = None
+    updated_at: datetime
+
+
+class BatchCreate(BaseModel):
+    op: Literal["create"]
+    contact: ContactShema
+
+
+class BatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: int = Field(..., gt=0)
+    contact: ContactUpdateShema
+
+
+class BatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: int = Field(..., gt=0)
+
+
+BatchOperation = Annotated[Union[BatchCreate, BatchUpdate, BatchDelete], Field(discriminator="op")]
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
+
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["created", "updated", "deleted", "not_found", "conflict"]
+    id: Optional[int] = None
+    contact: Optional[ContactResponse] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
+
+
+class ContactChange(BaseModel):
+    id: int
+    updated_at: datetime
+    deleted: bool
+    contact: Optional[ContactResponse] = None
+
+
+class ContactChangesPage(BaseModel):
+    changes: list[ContactChange]
+    next_cursor: str
+    has_more: bool
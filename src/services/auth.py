@@ -2,17 +2,16 @@ from datetime import datetime, timedelta
 from typing import Optional
 import json
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
-import redis
-import pickle
 
 from src.database.db import get_db
 from src.repository import auth as repository_auth
 from src.conf.config import config
 from src.conf import messages
+from src.services.cache import user_cache
+from src.services import hashing
 
 from dotenv import load_dotenv
 import logging
@@ -23,14 +22,9 @@ logger = logging.getLogger(__name__)
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = hashing.pwd_context
     SECRET_KEY = config.JWT_SECRET_KEY
     ALGORITHM = config.JWT_ALGORITHM
-    cache = redis.Redis(host=config.REDIS_DOMAIN,
-                        port=config.REDIS_PORT,
-                        db=0,
-                        password=config.REDIS_PASSWORD,
-                        )
 
     def verify_password(self, plain_password, hashed_password):
         """
@@ -48,6 +42,32 @@ class Auth:
     def get_password_hash(self, password: str):
         return self.pwd_context.hash(password)
 
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Verifies a plain password against a hashed password on the hashing pool, and rehashes it
+        if the stored hash uses a deprecated scheme or a different cost.
+
+        Args:
+            plain_password (str): The plain password to be verified.
+            hashed_password (str): The hashed password to be verified against.
+
+        Returns:
+            tuple[bool, str | None]: Whether the passwords match, and the new hash to store if any.
+
+        Raises:
+            HTTPException: 503 if the hashing pool is saturated.
+        """
+        return await hashing.hashing_pool.run(hashing.verify_and_update, plain_password, hashed_password)
+
+    async def hash_password(self, password: str) -> str:
+        """
+        Hashes a password on the hashing pool.
+
+        Raises:
+            HTTPException: 503 if the hashing pool is saturated.
+        """
+        return await hashing.hashing_pool.run(hashing.hash_password, password)
+
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
     async def create_access_token(self, data: dict, expires_delta: Optional[float] = None):
@@ -116,12 +136,17 @@ class Auth:
         """
         Gets the current user using the provided token.
 
+        The user is looked up in the two-tier user cache (in-process, then Redis) before the database.
+        Concurrent misses for the same user are coalesced into a single database query. Either way a
+        :class:`~src.services.cache.UserSnapshot` is returned, so routes can use it without a
+        database session.
+
         Args:
             token (str): The token to decode.
             db (Session): The database session.
 
         Returns:
-            User: The current user.
+            UserSnapshot: The current user.
 
         Raises:
             HTTPException: If the token is invalid or has an invalid scope.
@@ -143,21 +168,12 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-        user_hash = str(email)
+        async def load_user():
+            return await repository_auth.get_user_by_email(email=email, db=db)
 
-        user = self.cache.get(user_hash)
+        user = await user_cache.get_or_load(email, load_user)
         if user is None:
-            user = await repository_auth.get_user_by_email(email=email, db=db)
-            if user is None:
-                raise credentials_exception
-            self.cache.set(user_hash, pickle.dumps(user))
-            self.cache.expire(user_hash, 300)
-        else:
-            try:
-                user = pickle.loads(user)
-            except (pickle.UnpicklingError, EOFError) as e:
-                raise credentials_exception
-
+            raise credentials_exception
         return user
 
     def create_email_token(self, data: dict):
@@ -0,0 +1,376 @@
+import asyncio
+import math
+import random
+import struct
+import time
+from collections import OrderedDict
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.entity.models import Role, User
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class CacheManager:
+    """
+    Holds the application's pooled ``redis.asyncio`` client.
+
+    The client is created in ``main.lifespan`` with :meth:`init` and closed on shutdown.
+    Tests assign a stand-in to :attr:`client` directly.
+    """
+
+    def __init__(self):
+        self.client: redis.Redis | None = None
+
+    def init(self, host: str, port: int, password: str, max_connections: int) -> redis.Redis:
+        """
+        Create the connection pool and the client on top of it.
+
+        Args:
+            host (str): The Redis host.
+            port (int): The Redis port.
+            password (str): The Redis password.
+            max_connections (int): The maximum number of pooled connections.
+
+        Returns:
+            redis.Redis: The client.
+        """
+        pool = redis.ConnectionPool(host=host, port=port, db=0, password=password,
+                                    max_connections=max_connections)
+        self.client = redis.Redis(connection_pool=pool)
+        return self.client
+
+    async def close(self):
+        """
+        Close the client and disconnect the pool.
+        """
+        if self.client is not None:
+            await self.client.aclose()
+            await self.client.connection_pool.disconnect()
+            self.client = None
+
+
+cache_manager = CacheManager()
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with a per-entry TTL.
+
+    Only used from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class UserSnapshot:
+    """
+    Compact, session-free copy of the :class:`User` fields that routes need.
+
+    Encoded as a versioned struct-packed record instead of a pickled ORM instance, so cache entries
+    carry neither the password hash, the refresh token nor SQLAlchemy instance state.
+    """
+
+    __slots__ = ("id", "username", "email", "avatar", "role", "confirmed")
+
+    VERSION = 1
+    # version, id, role code, confirmed code
+    _HEADER = struct.Struct("!BIBB")
+    _LENGTH = struct.Struct("!H")
+    _NONE = 0xFFFF
+    # Append-only: the position is the wire code of the role.
+    _ROLES = (None, Role.admin, Role.moderator, Role.user)
+    _CONFIRMED = (None, False, True)
+
+    def __init__(self, id: int, username: str, email: str, avatar: str | None = None,
+                 role: Role | None = None, confirmed: bool | None = None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.avatar = avatar
+        self.role = role
+        self.confirmed = confirmed
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, email=user.email, avatar=user.avatar,
+                   role=user.role, confirmed=user.confirmed)
+
+    def encode(self) -> bytes:
+        parts = [self._HEADER.pack(self.VERSION, self.id, self._ROLES.index(self.role),
+                                   self._CONFIRMED.index(self.confirmed))]
+        for value in (self.username, self.email, self.avatar):
+            if value is None:
+                parts.append(self._LENGTH.pack(self._NONE))
+            else:
+                raw = value.encode()
+                parts.append(self._LENGTH.pack(len(raw)))
+                parts.append(raw)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "UserSnapshot":
+        """
+        Decode a record produced by :meth:`encode`.
+
+        Raises:
+            ValueError: If the record is truncated or was written by another layout version.
+        """
+        try:
+            version, user_id, role, confirmed = cls._HEADER.unpack_from(data)
+            if version != cls.VERSION:
+                raise ValueError(f"Unsupported user snapshot version {version}")
+            offset = cls._HEADER.size
+            values = []
+            for _ in range(3):
+                (length,) = cls._LENGTH.unpack_from(data, offset)
+                offset += cls._LENGTH.size
+                if length == cls._NONE:
+                    values.append(None)
+                    continue
+                if offset + length > len(data):
+                    raise ValueError("Truncated user snapshot")
+                values.append(data[offset:offset + length].decode())
+                offset += length
+            return cls(user_id, *values, role=cls._ROLES[role], confirmed=cls._CONFIRMED[confirmed])
+        except (struct.error, IndexError, UnicodeDecodeError) as err:
+            raise ValueError(f"Malformed user snapshot: {err}")
+
+    def __eq__(self, other):
+        if not isinstance(other, UserSnapshot):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"UserSnapshot(id={self.id!r}, email={self.email!r}, role={self.role!r})"
+
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users: an in-process :class:`LocalCache` in front of Redis.
+
+    Users are cached as :class:`UserSnapshot` records.
+
+    Writes that change a user call :meth:`invalidate`, which drops the Redis entry and publishes the
+    email on :attr:`channel`; every worker runs :meth:`listen` and evicts its local copy.
+
+    :meth:`get_or_load` coalesces concurrent database loads of the same user within a worker, and
+    refreshes Redis entries probabilistically before they expire (XFetch) so that a popular user's
+    entry does not expire under load.
+    """
+
+    channel = "user-cache:invalidate"
+
+    def __init__(self, local_size: int, local_ttl: float, redis_ttl: int, early_refresh_beta: float = 1.0):
+        self.local = LocalCache(local_size, local_ttl)
+        self.redis_ttl = redis_ttl
+        self.early_refresh_beta = early_refresh_beta
+        # Moving average of the database load time, the recompute cost in XFetch.
+        self.load_seconds = 0.01
+        self._loading: dict[str, asyncio.Future] = {}
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.early_refreshes = 0
+
+    async def _lookup(self, email: str) -> tuple[UserSnapshot | None, float | None]:
+        """
+        Look a user up in both tiers.
+
+        Returns:
+            tuple[UserSnapshot | None, float | None]: The snapshot, and the remaining Redis TTL in seconds
+            if it came from Redis.
+        """
+        user = self.local.get(email)
+        if user is not None:
+            self.local_hits += 1
+            return user, None
+        async with cache_manager.client.pipeline(transaction=False) as pipe:
+            pipe.get(email)
+            pipe.pttl(email)
+            raw, pttl = await pipe.execute()
+        if raw is not None:
+            try:
+                user = UserSnapshot.decode(raw)
+            except ValueError as err:
+                logger.error(f"Error in UserCache.get {err}")
+                user = None
+        if user is None:
+            self.misses += 1
+            return None, None
+        self.redis_hits += 1
+        self.local.set(email, user)
+        return user, pttl / 1000 if pttl is not None and pttl >= 0 else None
+
+    async def get(self, email: str) -> UserSnapshot | None:
+        """
+        Get a cached user, or None on a miss in both tiers.
+        """
+        user, _ = await self._lookup(email)
+        return user
+
+    async def set(self, email: str, user: User) -> UserSnapshot:
+        """
+        Store a user in both tiers.
+
+        Returns:
+            UserSnapshot: The cached snapshot of the user.
+        """
+        snapshot = UserSnapshot.from_user(user)
+        await cache_manager.client.set(email, snapshot.encode(), ex=self.redis_ttl)
+        self.local.set(email, snapshot)
+        return snapshot
+
+    def _refresh_early(self, ttl: float | None) -> bool:
+        """
+        XFetch: refresh with a probability that grows as the entry approaches expiry, scaled by
+        the load time, so one request reloads it shortly before it expires.
+        """
+        if ttl is None or self.early_refresh_beta <= 0:
+            return False
+        return -self.load_seconds * self.early_refresh_beta * math.log(1.0 - random.random()) >= ttl
+
+    async def get_or_load(self, email: str, load) -> UserSnapshot | None:
+        """
+        Get a cached user, or load and cache it with ``load`` on a miss or an early refresh.
+
+        Concurrent calls for the same email within a worker share a single ``load``. Should the
+        loading call be cancelled, a waiting call takes over.
+
+        Args:
+            email (str): The user's email, the cache key.
+            load: An async callable returning the :class:`User` or None.
+
+        Returns:
+            UserSnapshot | None: The user, or None if ``load`` found nothing.
+        """
+        user, ttl = await self._lookup(email)
+        if user is not None:
+            if not self._refresh_early(ttl):
+                return user
+            self.early_refreshes += 1
+        while True:
+            loading = self._loading.get(email)
+            if loading is None:
+                return await self._load(email, load)
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                if not loading.cancelled():
+                    raise
+
+    async def _load(self, email: str, load) -> UserSnapshot | None:
+        loading = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved so that a failed load nobody waited for is not logged twice.
+        loading.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._loading[email] = loading
+        try:
+            started = time.monotonic()
+            user = await load()
+            self.load_seconds = 0.8 * self.load_seconds + 0.2 * (time.monotonic() - started)
+            if user is None:
+                await self.invalidate(email)
+                snapshot = None
+            else:
+                snapshot = await self.set(email, user)
+        except asyncio.CancelledError:
+            loading.cancel()
+            raise
+        except Exception as err:
+            loading.set_exception(err)
+            raise
+        finally:
+            self._loading.pop(email, None)
+        loading.set_result(snapshot)
+        return snapshot
+
+    async def invalidate(self, email: str):
+        """
+        Drop a user from Redis and from the local tier of every worker.
+        """
+        self.local.pop(email)
+        try:
+            await cache_manager.client.delete(email)
+            await cache_manager.client.publish(self.channel, email)
+        except RedisError as err:
+            logger.error(f"Error in UserCache.invalidate {err}")
+
+    async def listen(self, retry_delay: float = 1.0):
+        """
+        Evict local entries on invalidation messages until cancelled.
+
+        Messages published while the subscription is down are lost, so the local tier is cleared
+        every time the subscription is (re)established.
+        """
+        while True:
+            pubsub = cache_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        data = message["data"]
+                        self.local.pop(data.decode() if isinstance(data, bytes) else data)
+            except RedisError as err:
+                logger.error(f"Error in UserCache.listen {err}")
+                await asyncio.sleep(retry_delay)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counters of both tiers since the worker started.
+        """
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "early_refreshes": self.early_refreshes,
+            "local_size": len(self.local),
+            "hit_ratio": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else None,
+        }
+
+
+user_cache = UserCache(local_size=config.USER_CACHE_LOCAL_SIZE, local_ttl=config.USER_CACHE_LOCAL_TTL,
+                       redis_ttl=config.USER_CACHE_TTL, early_refresh_beta=config.USER_CACHE_EARLY_REFRESH_BETA)
@@ -0,0 +1,385 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Iterable, Iterator, Mapping, Sequence
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.entity.models import User
+from src.repository import contacts as repository_contacts
+from src.schemas.contact import ContactShema
+from src.services.cache import cache_manager
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson", "vcard")
+CONTACT_FIELDS = tuple(ContactShema.model_fields)
+
+# A parsed record: (record number, contact fields or None, parse error or None).
+Record = tuple[int, dict | None, str | None]
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def detect_format(filename: str | None) -> str | None:
+    """
+    Guess the import format from the file extension.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".vcf": "vcard", ".vcard": "vcard"}.get(extension)
+
+
+def _clean(record: dict) -> dict:
+    """
+    Keep the contact fields of a record, blank values as None.
+    """
+    cleaned = {}
+    for field in CONTACT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        cleaned[field] = value
+    return cleaned
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Record]:
+    """
+    Parse CSV with a header row naming the contact fields; other columns are ignored.
+    """
+    for number, row in enumerate(csv.DictReader(lines), start=1):
+        yield number, _clean(row), None
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Record]:
+    """
+    Parse one JSON object per line; blank lines are skipped.
+    """
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as err:
+            yield number, None, f"invalid JSON: {err.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, _clean(record), None
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Join vCard continuation lines, which start with a space or a tab, to the line they continue.
+    """
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _vcard_value(value: str) -> str:
+    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+def _vcard_contact(card: dict) -> dict:
+    surname, name = None, None
+    if "N" in card:
+        parts = card["N"].split(";")
+        surname = parts[0]
+        name = parts[1] if len(parts) > 1 else None
+    if not name and "FN" in card:
+        name = card["FN"]
+    birthday = card.get("BDAY")
+    if birthday and len(birthday) == 8 and birthday.isdigit():
+        birthday = f"{birthday[:4]}-{birthday[4:6]}-{birthday[6:]}"
+    return _clean({
+        "name": _vcard_value(name) if name else None,
+        "surname": _vcard_value(surname) if surname else None,
+        "email": card.get("EMAIL"),
+        "phone": card.get("TEL"),
+        "birthday": birthday,
+        "additional_data": _vcard_value(card["NOTE"]) if "NOTE" in card else None,
+    })
+
+
+def parse_vcard(lines: Iterable[str]) -> Iterator[Record]:
+    """
+    Parse vCard 3.0/4.0 cards: N, FN, EMAIL, TEL, BDAY and NOTE are read, the first value of each wins.
+    """
+    number = 0
+    card = None
+    for line in _unfold(lines):
+        upper = line.strip().upper()
+        if upper == "BEGIN:VCARD":
+            number += 1
+            card = {}
+        elif upper == "END:VCARD":
+            if card is not None:
+                yield number, _vcard_contact(card), None
+            card = None
+        elif card is not None and ":" in line:
+            key, value = line.split(":", 1)
+            # "item1.EMAIL;TYPE=work" -> "EMAIL"
+            name = key.split(";", 1)[0].rsplit(".", 1)[-1].upper()
+            card.setdefault(name, value.strip())
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson, "vcard": parse_vcard}
+
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "vcard": "text/vcard"}
+EXPORT_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "vcard": "vcf"}
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def csv_header() -> str:
+    return ",".join(CONTACT_FIELDS) + "\r\n"
+
+
+def encode_csv(rows: Sequence[Mapping]) -> str:
+    """
+    Serialize rows as CSV lines in :data:`CONTACT_FIELDS` order, without the header.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(row[field]) for field in CONTACT_FIELDS] for row in rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows: Sequence[Mapping]) -> str:
+    """
+    Serialize rows as one JSON object per line, ``id`` included.
+    """
+    return "".join(json.dumps({field: _export_value(value) for field, value in row.items()}) + "\n"
+                   for row in rows)
+
+
+def _vcard_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
+
+
+def _vcard_card(row: Mapping) -> str:
+    name, surname = _vcard_escape(row["name"]), _vcard_escape(row["surname"])
+    lines = ["BEGIN:VCARD", "VERSION:3.0", f"N:{surname};{name};;;", f"FN:{name} {surname}",
+             f"EMAIL:{row['email']}", f"TEL:{row['phone']}"]
+    if row["birthday"] is not None:
+        lines.append(f"BDAY:{row['birthday'].isoformat()}")
+    if row["additional_data"] is not None:
+        lines.append(f"NOTE:{_vcard_escape(row['additional_data'])}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def encode_vcard(rows: Sequence[Mapping]) -> str:
+    """
+    Serialize rows as vCard 3.0 cards that :func:`parse_vcard` reads back.
+    """
+    return "".join(_vcard_card(row) for row in rows)
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "vcard": encode_vcard}
+
+
+async def export_contacts(fmt: str, user: User, session_factory) -> AsyncIterator[bytes]:
+    """
+    Stream all of the user's contacts in the given format, for a ``StreamingResponse``.
+
+    Rows come from :func:`src.repository.contacts.stream_contacts` in batches of
+    ``EXPORT_BATCH_SIZE`` and are encoded one batch at a time, so memory stays flat however many
+    contacts are exported. The stream opens its own session because the request's session is
+    closed before the response body is sent.
+
+    Args:
+        fmt (str): ``csv``, ``ndjson`` or ``vcard``.
+        user (User): The owner of the contacts.
+        session_factory: Async context manager factory giving a database session.
+
+    Yields:
+        bytes: The next chunk of the file.
+    """
+    encode = ENCODERS[fmt]
+    if fmt == "csv":
+        yield csv_header().encode()
+    async with session_factory() as db:
+        async for rows in repository_contacts.stream_contacts(user, db, batch_size=config.EXPORT_BATCH_SIZE):
+            yield encode(rows).encode()
+
+
+def _validation_message(err: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in err.errors())
+
+
+def import_job_key(job_id: str) -> str:
+    return f"contacts_import:{job_id}"
+
+
+async def save_upload(file: UploadFile, max_bytes: int) -> str:
+    """
+    Copy an upload to a temporary file in chunks, so it outlives the request for the import job.
+
+    Returns:
+        str: The path of the temporary file; the import job deletes it.
+
+    Raises:
+        UploadTooLarge: If the upload exceeds ``max_bytes``.
+    """
+    fd, path = tempfile.mkstemp(prefix="contacts_import_", suffix=".upload")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+async def create_import_job(user: User, fmt: str) -> dict:
+    """
+    Register a queued import job of the user in Redis.
+
+    Returns:
+        dict: The job state.
+    """
+    job = {"job_id": uuid.uuid4().hex, "user_id": user.id, "format": fmt, "status": "queued", "processed": 0,
+           "created": 0, "skipped": 0, "failed": 0, "errors": [],
+           "updated_at": datetime.now(timezone.utc).isoformat()}
+    await _save_job(job)
+    return job
+
+
+async def _save_job(job: dict):
+    key = import_job_key(job["job_id"])
+    mapping = {field: json.dumps(value) for field, value in job.items()}
+    async with cache_manager.client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, config.IMPORT_JOB_TTL)
+        await pipe.execute()
+
+
+async def queue_import(file: UploadFile, fmt: str, user: User) -> tuple[dict, str]:
+    """
+    Save an upload and register its import job.
+
+    Returns:
+        tuple[dict, str]: The job state and the path of the saved upload, for :func:`run_import`.
+
+    Raises:
+        UploadTooLarge: If the upload exceeds ``IMPORT_MAX_BYTES``.
+    """
+    path = await save_upload(file, config.IMPORT_MAX_BYTES)
+    try:
+        job = await create_import_job(user, fmt)
+    except BaseException:
+        os.remove(path)
+        raise
+    return job, path
+
+
+async def get_import_job(job_id: str, user: User) -> dict | None:
+    """
+    The state of one of the user's import jobs, or None if it does not exist or belongs to someone else.
+    """
+    raw = await cache_manager.client.hgetall(import_job_key(job_id))
+    if not raw:
+        return None
+    job = {(field.decode() if isinstance(field, bytes) else field): json.loads(value) for field, value in raw.items()}
+    if job.get("user_id") != user.id:
+        return None
+    return job
+
+
+async def run_import(job: dict, path: str, user: User, session_factory):
+    """
+    Import the contacts of an uploaded file as a background job.
+
+    The file is parsed as a stream; records are validated with :class:`ContactShema` and written
+    in batches of ``IMPORT_BATCH_SIZE`` with multi-row upserts, so memory stays flat regardless of
+    file size. Progress is saved in Redis after every batch. At most ``IMPORT_MAX_ERRORS`` row
+    errors are kept in the report; ``failed`` counts all of them.
+
+    Args:
+        job (dict): The job state from :func:`create_import_job`.
+        path (str): The uploaded file, deleted when the job ends.
+        user (User): The owner of the imported contacts.
+        session_factory: Async context manager factory giving a database session.
+    """
+    parse = PARSERS[job["format"]]
+    job["status"] = "running"
+    batch = []
+
+    def report(number: int, error: str):
+        job["failed"] += 1
+        if len(job["errors"]) < config.IMPORT_MAX_ERRORS:
+            job["errors"].append({"row": number, "error": error})
+
+    async def flush(db):
+        created = await repository_contacts.import_contacts(batch, user=user, db=db)
+        job["created"] += created
+        job["skipped"] += len(batch) - created
+        batch.clear()
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+        await _save_job(job)
+
+    try:
+        await _save_job(job)
+        async with session_factory() as db:
+            with open(path, encoding="utf-8-sig", newline="") as lines:
+                for number, record, error in parse(lines):
+                    job["processed"] += 1
+                    if error is None:
+                        try:
+                            batch.append(ContactShema.model_validate(record).model_dump())
+                        except ValidationError as err:
+                            error = _validation_message(err)
+                    if error is not None:
+                        report(number, error)
+                    if len(batch) >= config.IMPORT_BATCH_SIZE:
+                        await flush(db)
+            if batch:
+                await flush(db)
+        job["status"] = "done"
+    except UnicodeDecodeError:
+        job["status"] = "failed"
+        job["error"] = "The file is not UTF-8 encoded"
+    except Exception as err:
+        logger.error(f"Error in run_import {err}")
+        job["status"] = "failed"
+        job["error"] = "Import failed"
+    finally:
+        os.remove(path)
+    job["updated_at"] = datetime.now(timezone.utc).isoformat()
+    try:
+        await _save_job(job)
+    except RedisError as err:
+        logger.error(f"Error in run_import {err}")
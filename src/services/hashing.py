@@ -0,0 +1,156 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.conf import messages
+from src.conf.config import config
+
+
+def build_context(schemes: list[str], bcrypt_rounds: int, argon2_time_cost: int, argon2_memory_cost: int,
+                  argon2_parallelism: int) -> CryptContext:
+    """
+    Build the password context from the configured schemes and costs.
+
+    New hashes use the first scheme; the others are only verified and are marked as needing an
+    update. Hashes of the current scheme made with a different cost also need an update, so raising
+    or lowering a cost takes effect on each user's next login.
+
+    Args:
+        schemes (list[str]): The accepted schemes, preferred first, e.g. ``["argon2", "bcrypt"]``.
+        bcrypt_rounds (int): The bcrypt log2 cost.
+        argon2_time_cost (int): The argon2 number of passes.
+        argon2_memory_cost (int): The argon2 memory in KiB.
+        argon2_parallelism (int): The argon2 number of lanes.
+
+    Returns:
+        CryptContext: The password context.
+    """
+    return CryptContext(
+        schemes=schemes,
+        default=schemes[0],
+        deprecated=schemes[1:],
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+# Module level so that process pool workers build the same context on import.
+pwd_context = build_context(config.PASSWORD_SCHEMES, config.BCRYPT_ROUNDS, config.ARGON2_TIME_COST,
+                            config.ARGON2_MEMORY_COST, config.ARGON2_PARALLELISM)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _timed(fn, *args):
+    """
+    Run ``fn`` in the worker and report when it actually started, to measure queueing time.
+    """
+    return time.time(), fn(*args)
+
+
+class HashingPool:
+    """
+    Runs password hashing on a bounded thread or process pool instead of the event loop.
+
+    At most ``workers`` calls run at once and at most ``max_pending`` more wait in the queue;
+    calls beyond that are rejected with 503 so that a login burst cannot pile up unbounded work.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Run ``fn(*args)`` on the pool.
+
+        A call counts as in flight until its job is done in the pool, even when the caller is
+        cancelled first, e.g. by a client disconnect, as a started job keeps running.
+
+        Raises:
+            HTTPException: 503 if the pool and its queue are full.
+        """
+        if self.in_flight >= self.workers + self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=messages.SERVICE_BUSY,
+                                headers={"Retry-After": "1"})
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        job = self._get_executor().submit(_timed, fn, *args)
+        self.in_flight += 1
+        job.add_done_callback(lambda _: self._job_done(loop))
+        started, result = await asyncio.wrap_future(job)
+        wait = max(0.0, started - submitted)
+        self.completed += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        return result
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop):
+        # Runs in the worker thread, or wherever the job was cancelled; in_flight belongs to the loop.
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The loop is closed, and the count with it.
+            pass
+
+    def _release(self):
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """
+        Queueing metrics of the pool since the worker started.
+        """
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 3) if self.completed else None,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(kind=config.PASSWORD_HASH_EXECUTOR, workers=config.PASSWORD_HASH_WORKERS,
+                           max_pending=config.PASSWORD_HASH_MAX_PENDING)
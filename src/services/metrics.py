@@ -0,0 +1,159 @@
+import asyncio
+import os
+from collections import defaultdict
+
+from fastapi_limiter import http_default_callback
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Scope
+
+from src.database.db import sessionmanager, replica_sessionmanager
+from src.services.cache import user_cache
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client switches to multiprocess mode when this is set before it is imported. The
+# directory must be emptied before the workers start, see ``Metrics``.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.",
+                   ["method", "route", "status"])
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template.",
+                    ["method", "route"])
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served.", multiprocess_mode="livesum")
+RATE_LIMITED = Counter("rate_limit_rejections_total", "Requests rejected by the rate limiter.", ["route"])
+DB_POOL = Gauge("db_pool_connections", "Database pool connections by state.", ["database", "state"],
+                multiprocess_mode="livesum")
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Database pool checkouts that timed out.",
+                           ["database"])
+USER_CACHE = Counter("user_cache_lookups_total", "Authenticated user lookups by the tier that answered.",
+                     ["result"])
+
+POOL_STATES = ("size", "checked_in", "checked_out", "overflow", "waiting")
+USER_CACHE_RESULTS = {"local_hit": "local_hits", "redis_hit": "redis_hits", "miss": "misses"}
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The template of the route that served a request, e.g. ``/api/contacts/{contact_id}``, so that
+    metrics are labelled per route rather than per URL.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps, such as /static, leave the mount path in root_path.
+    if scope.get("endpoint") is not None:
+        return scope.get("root_path") or "/"
+    return "unmatched"
+
+
+class Metrics:
+    """
+    Process-local metrics of the HTTP and rate limiter hot paths, exported with prometheus_client.
+
+    Requests are recorded from the event loop thread only, into plain dicts and lists that need no
+    locking. :meth:`sync` moves them into the prometheus_client metrics, along with the database
+    pool and user cache statistics; ``main.lifespan`` runs it every ``METRICS_SYNC_INTERVAL``
+    seconds and ``/metrics`` runs it before every scrape.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set, every uvicorn worker writes its values to files in that
+    directory and ``/metrics`` aggregates the files of all workers, whichever worker serves the
+    scrape. The directory has to be emptied before the workers start.
+    """
+
+    def __init__(self):
+        self.in_progress = 0
+        self._durations: dict[tuple[str, str, str], list[float]] = defaultdict(list)
+        self._rate_limited: dict[str, int] = defaultdict(int)
+        self._synced: dict[tuple, int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        self._durations[(method, route, str(status))].append(seconds)
+
+    def rate_limited(self, route: str):
+        self._rate_limited[route] += 1
+
+    def _inc_since_sync(self, counter, key: tuple, total: int):
+        delta = total - self._synced.get(key, 0)
+        if delta > 0:
+            counter.labels(*key[1:]).inc(delta)
+        self._synced[key] = total
+
+    def sync(self):
+        """
+        Move the recorded requests and the current pool and cache statistics into prometheus_client.
+        """
+        durations, self._durations = self._durations, defaultdict(list)
+        for (method, route, status), seconds in durations.items():
+            REQUESTS.labels(method, route, status).inc(len(seconds))
+            histogram = LATENCY.labels(method, route)
+            for value in seconds:
+                histogram.observe(value)
+        rate_limited, self._rate_limited = self._rate_limited, defaultdict(int)
+        for route, count in rate_limited.items():
+            RATE_LIMITED.labels(route).inc(count)
+        IN_PROGRESS.set(self.in_progress)
+
+        for database, manager in (("primary", sessionmanager), ("replica", replica_sessionmanager)):
+            if manager is None:
+                continue
+            status = manager.pool_status()
+            if not status:
+                continue
+            for state in POOL_STATES:
+                DB_POOL.labels(database, state).set(status[state])
+            self._inc_since_sync(DB_POOL_TIMEOUTS, ("timeouts", database), status["timeouts"])
+
+        stats = user_cache.stats()
+        for result, field in USER_CACHE_RESULTS.items():
+            self._inc_since_sync(USER_CACHE, ("user_cache", result), stats[field])
+
+    def registry(self) -> CollectorRegistry:
+        """
+        The registry ``/metrics`` exports: every worker's files in multiprocess mode, else this process.
+        """
+        if not MULTIPROCESS_DIR:
+            return REGISTRY
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROCESS_DIR)
+        return registry
+
+    def render(self) -> bytes:
+        self.sync()
+        return generate_latest(self.registry())
+
+    def shutdown(self):
+        """
+        Drop this worker's live gauges in multiprocess mode; its counters and histograms are kept.
+        """
+        if MULTIPROCESS_DIR:
+            multiprocess.mark_process_dead(os.getpid(), path=MULTIPROCESS_DIR)
+
+
+metrics = Metrics()
+
+
+async def run_sync(interval: float):
+    """
+    Run :meth:`Metrics.sync` every ``interval`` seconds until cancelled; started by ``main.lifespan``.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics.sync()
+        except Exception as err:
+            logger.error(f"Error in run_sync {err}")
+
+
+async def rate_limit_callback(request: Request, response: Response, pexpire: int):
+    """
+    FastAPILimiter callback counting the rejection before answering 429 as usual.
+    """
+    metrics.rate_limited(route_template(request.scope))
+    return await http_default_callback(request, response, pexpire)
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import heapq
+import hmac
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from types import CodeType, FrameType
+
+from src.conf.config import config
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = "X-Profile-Token"
+
+# Prefixes cut from the file names in frame labels.
+SITE_PACKAGES = "site-packages" + os.sep
+STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+_labels: dict[CodeType, str] = {}
+
+
+def sign_token(secret: str, expires: int) -> str:
+    """
+    A profiling token for the ``X-Profile-Token`` header, valid until the ``expires`` UNIX time.
+    """
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_token(token: str, secret: str) -> bool:
+    """
+    Check a token made by :func:`sign_token` with the same secret, and that it has not expired.
+    """
+    expires = token.partition(".")[0]
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_token(secret, int(expires)), token)
+
+
+def _label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if SITE_PACKAGES in filename:
+            filename = filename[filename.rindex(SITE_PACKAGES) + len(SITE_PACKAGES):]
+        elif filename.startswith(STDLIB):
+            filename = filename[len(STDLIB):]
+        elif filename.startswith(os.getcwd()):
+            filename = os.path.relpath(filename)
+        label = _labels[code] = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+class Sampler(threading.Thread):
+    """
+    Wall-clock sampling profiler of one asyncio task, run in its own thread.
+
+    Every ``interval`` seconds it records the task's stack: the event loop thread's current stack,
+    from the task's coroutine down, while the task runs, else the chain of coroutines the task is
+    suspended in, ending with what it awaits (a database query, a lock, a thread pool job), so that
+    time spent waiting shows up as well as time spent computing. Work the task hands to other tasks
+    is only seen as the await on them. While the loop thread computes, the sampler only gets the
+    GIL every ``sys.getswitchinterval()``, so short CPU bursts are sampled coarsely.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.task = task
+        self.loop = task.get_loop()
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks: dict[tuple[str, ...], int] = defaultdict(int)
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            try:
+                stack = self.sample()
+            except Exception as err:
+                logger.error(f"Error in Sampler.run {err}")
+                return
+            if stack:
+                self.stacks[stack] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def sample(self) -> tuple[str, ...]:
+        coro = self.task.get_coro()
+        if asyncio.current_task(self.loop) is self.task:
+            root = coro.cr_frame
+            frame: FrameType | None = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(_label(frame.f_code))
+                if frame is root:
+                    break
+                frame = frame.f_back
+            return tuple(reversed(frames))
+        frames = []
+        awaiting = coro
+        while awaiting is not None:
+            frame = getattr(awaiting, "cr_frame", None) or getattr(awaiting, "ag_frame", None) or \
+                getattr(awaiting, "gi_frame", None)
+            if frame is None:
+                frames.append("[await]")
+                break
+            frames.append(_label(frame.f_code))
+            awaiting = getattr(awaiting, "cr_await", None) or getattr(awaiting, "ag_await", None) or \
+                getattr(awaiting, "gi_yieldfrom", None)
+        return tuple(frames)
+
+
+class RequestProfile:
+    """
+    The sampled stacks of one profiled request.
+    """
+
+    __slots__ = ("id", "method", "route", "path", "status", "started_at", "duration", "samples", "stacks")
+
+    def __init__(self, id: str, method: str, route: str, path: str, status: int, started_at: float,
+                 duration: float, samples: int, stacks: dict[tuple[str, ...], int]):
+        self.id = id
+        self.method = method
+        self.route = route
+        self.path = path
+        self.status = status
+        self.started_at = started_at
+        self.duration = duration
+        self.samples = samples
+        self.stacks = stacks
+
+    def summary(self) -> dict:
+        return {"id": self.id, "method": self.method, "route": self.route, "path": self.path, "status": self.status,
+                "started_at": self.started_at, "duration_ms": round(self.duration * 1000, 1),
+                "samples": self.samples}
+
+    def folded(self) -> str:
+        """
+        The stacks in the collapsed format of flamegraph.pl, also read by speedscope: one
+        ``frame;frame;frame count`` line per distinct stack.
+        """
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfileStore:
+    """
+    This worker's request profiles: the ``size`` most recent, to fetch a requested profile by the
+    ``X-Profile-Id`` its response carried, and the ``size`` slowest since the worker started.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._recent: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._slowest: list[tuple[float, str, RequestProfile]] = []
+
+    def add(self, profile: RequestProfile):
+        self._recent[profile.id] = profile
+        while len(self._recent) > self.size:
+            self._recent.popitem(last=False)
+        entry = (profile.duration, profile.id, profile)
+        if len(self._slowest) < self.size:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        profile = self._recent.get(profile_id)
+        if profile is not None:
+            return profile
+        return next((profile for _, id, profile in self._slowest if id == profile_id), None)
+
+    def slowest(self) -> list[RequestProfile]:
+        return [profile for _, _, profile in sorted(self._slowest, reverse=True)]
+
+
+profile_store = ProfileStore(config.PROFILER_KEEP)
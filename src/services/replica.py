@@ -0,0 +1,66 @@
+from fastapi import Depends
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.db import get_db, get_replica_db
+from src.entity.models import User
+from src.services.auth import auth_service
+from src.services.cache import cache_manager
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def primary_pin_key(user_id: int) -> str:
+    """
+    Redis key marking a user who wrote recently and must read from the primary.
+    """
+    return f"primary_pin:{user_id}"
+
+
+async def pin_to_primary(user_id: int) -> None:
+    """
+    Route the user's reads to the primary for ``READ_YOUR_WRITES_SECONDS`` after a write, so they
+    see their own changes while the replicas catch up.
+
+    Args:
+        user_id (int): The user who wrote.
+    """
+    if config.READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    try:
+        await cache_manager.client.set(primary_pin_key(user_id), 1, ex=config.READ_YOUR_WRITES_SECONDS)
+    except RedisError as err:
+        logger.error(f"Error in pin_to_primary {err}")
+
+
+async def is_pinned_to_primary(user_id: int) -> bool:
+    """
+    Whether the user wrote recently. Errs on the side of the primary if Redis is unavailable.
+    """
+    try:
+        return await cache_manager.client.get(primary_pin_key(user_id)) is not None
+    except RedisError as err:
+        logger.error(f"Error in is_pinned_to_primary {err}")
+        return True
+
+
+async def get_read_db(user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db),
+                      replica: AsyncSession | None = Depends(get_replica_db)) -> AsyncSession:
+    """
+    Session for read-only routes of the current user: a replica session unless no replica is
+    configured or the user is pinned to the primary after a recent write.
+
+    Sessions only check out a connection on first use, so the unused one costs nothing.
+
+    Returns:
+        AsyncSession: The session to read with.
+    """
+    if replica is None or await is_pinned_to_primary(user.id):
+        return db
+    return replica
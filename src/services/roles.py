@@ -0,0 +1,26 @@
+from fastapi import Depends, HTTPException, status
+
+from src.conf import messages
+from src.entity.models import Role, User
+from src.services.auth import auth_service
+
+
+class RoleAccess:
+    def __init__(self, allowed_roles: list[Role]):
+        """
+        Dependency that only lets users with one of the given roles through.
+
+        Args:
+            allowed_roles (list[Role]): The roles allowed to access the route.
+        """
+        self.allowed_roles = allowed_roles
+
+    async def __call__(self, user: User = Depends(auth_service.get_current_user)):
+        """
+        Check the current user's role.
+
+        Raises:
+            HTTPException: 403 if the user's role is not allowed.
+        """
+        if user.role not in self.allowed_roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=messages.FORBIDDEN)
@@ -0,0 +1,55 @@
+import asyncio
+
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.repository import contacts as repository_contacts
+from src.services.cache import cache_manager
+
+from dotenv import load_dotenv
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_LOCK_KEY = "contacts_tombstone_compaction"
+
+
+async def compact_once(session_factory) -> int | None:
+    """
+    Compact the contact tombstones, unless another worker already did in the current interval.
+
+    A Redis key held for ``TOMBSTONE_COMPACTION_INTERVAL`` seconds elects one worker per interval.
+    If Redis is unavailable every worker compacts, which is harmless: compaction is idempotent.
+
+    Args:
+        session_factory: Async context manager factory giving a database session.
+
+    Returns:
+        int | None: The number of tombstones removed, or None if another worker holds the interval.
+    """
+    try:
+        elected = await cache_manager.client.set(COMPACTION_LOCK_KEY, 1, ex=config.TOMBSTONE_COMPACTION_INTERVAL,
+                                                 nx=True)
+    except RedisError as err:
+        logger.error(f"Error in compact_once {err}")
+        elected = True
+    if not elected:
+        return None
+    async with session_factory() as db:
+        removed = await repository_contacts.compact_tombstones(db)
+    logger.info(f"Compacted {removed} contact tombstones")
+    return removed
+
+
+async def run_compaction(session_factory, interval: float):
+    """
+    Compact the contact tombstones every ``interval`` seconds until cancelled; started by ``main.lifespan``.
+    """
+    while True:
+        try:
+            await compact_once(session_factory)
+        except Exception as err:
+            logger.error(f"Error in run_compaction {err}")
+        await asyncio.sleep(interval)
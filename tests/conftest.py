@@ -11,6 +11,10 @@ from main import app
 from src.entity.models import Base, User
 from src.database.db import get_db
 from src.services.auth import auth_service
+from src.services.cache import cache_manager, user_cache
+from tests.fake_redis import FakeRedis
+
+pytest_plugins = ["tests.query_budget"]
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -40,6 +44,14 @@ def init_models_wrap():
     asyncio.run(init_models())
 
 
+@pytest.fixture(autouse=True)
+def fake_redis():
+    cache_manager.client = FakeRedis()
+    user_cache.local.clear()
+    yield cache_manager.client
+    cache_manager.client = None
+
+
 @pytest.fixture(scope="module")
 def client():
 
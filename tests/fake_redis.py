@@ -0,0 +1,155 @@
+import asyncio
+import time
+from datetime import datetime
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the subset of ``redis.asyncio.Redis`` the application uses.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.expires = {}
+        self.subscribers = {}
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self.store.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.store
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    async def get(self, key):
+        return self.store[key] if self._alive(key) else None
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.store[key] = self._encode(value)
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expires[key] = time.time() + ex
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.store.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    async def hget(self, key, field):
+        if not self._alive(key):
+            return None
+        return self.store[key].get(field)
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        self._alive(key)
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        hash_ = self.store.setdefault(key, {})
+        for name, item in fields.items():
+            hash_[name] = self._encode(item)
+        return len(fields)
+
+    async def hgetall(self, key):
+        if not self._alive(key):
+            return {}
+        return {name.encode(): value for name, value in self.store[key].items()}
+
+    async def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self.expires[key] = time.time() + seconds
+        return True
+
+    async def expireat(self, key, when):
+        if not self._alive(key):
+            return False
+        self.expires[key] = when.timestamp() if isinstance(when, datetime) else when
+        return True
+
+    async def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires = self.expires.get(key)
+        return -1 if expires is None else round(expires - time.time())
+
+    async def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires = self.expires.get(key)
+        return -1 if expires is None else int((expires - time.time()) * 1000)
+
+    async def publish(self, channel, message):
+        subscribers = self.subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel.encode(), "data": self._encode(message)})
+        return len(subscribers)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        results = [await method(*args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.commands = []
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.channels = []
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.redis.subscribers.setdefault(channel, []).append(self)
+            self.channels.append(channel)
+            self.queue.put_nowait({"type": "subscribe", "channel": channel.encode(), "data": len(self.channels)})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.redis.subscribers[channel].remove(self)
+        self.channels = []
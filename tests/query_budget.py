@@ -0,0 +1,53 @@
+"""
+Pytest plugin failing a test when a request it makes issues more SQL statements than its budget::
+
+    @pytest.mark.query_budget(2)
+    def test_confirmed_email(client):
+        ...
+
+Every request served by ``QueryStatsMiddleware`` during the test is checked, from the per-request
+log records the middleware emits.
+"""
+import logging
+
+import pytest
+
+from src.middleware import query_stats
+
+
+class RequestQueries(logging.Handler):
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        if hasattr(record, "queries"):
+            self.records.append(record)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "query_budget(queries): fail if any request in the test runs more "
+                                       "SQL statements than queries")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    budget = marker.args[0]
+    handler = RequestQueries()
+    logger = query_stats.logger
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        result = yield
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+    over = [record.getMessage() for record in handler.records if record.queries > budget]
+    if over:
+        pytest.fail(f"Query budget of {budget} exceeded:\n" + "\n".join(over), pytrace=False)
+    return result
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+from sqlalchemy import exc, text
+
+from src.database.db import DatabaseSessionManager, SessionMetrics, release_connection
+
+
+class TestDatabaseSessionManager(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.manager = DatabaseSessionManager("sqlite+aiosqlite://", pool_size=2, max_overflow=1, pool_timeout=0.2)
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    async def test_warmup_fills_the_pool(self):
+        await self.manager.warmup()
+
+        status = self.manager.pool_status()
+        self.assertEqual((status["checked_in"], status["checked_out"]), (2, 0))
+
+    async def test_counts_checked_out_overflow_and_waiting(self):
+        release = asyncio.Event()
+        checked_out = asyncio.Event()
+        holding = 0
+
+        async def hold():
+            nonlocal holding
+            async with self.manager.session() as session:
+                await session.execute(text("SELECT 1"))
+                holding += 1
+                if holding == 3:
+                    checked_out.set()
+                await release.wait()
+
+        holders = [asyncio.create_task(hold()) for _ in range(3)]
+        await checked_out.wait()
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0.05)
+
+        status = self.manager.pool_status()
+        self.assertEqual((status["checked_out"], status["overflow"], status["waiting"]), (3, 1, 1))
+
+        release.set()
+        await asyncio.gather(*holders, waiter)
+        self.assertEqual(self.manager.pool_status()["waiting"], 0)
+
+    async def test_counts_checkout_timeouts(self):
+        release = asyncio.Event()
+
+        async def hold():
+            async with self.manager.session() as session:
+                await session.execute(text("SELECT 1"))
+                await release.wait()
+
+        holders = [asyncio.create_task(hold()) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        with self.assertRaises(exc.TimeoutError):
+            async with self.manager.session() as session:
+                await session.execute(text("SELECT 1"))
+
+        release.set()
+        await asyncio.gather(*holders)
+        self.assertEqual(self.manager.pool_status()["timeouts"], 1)
+
+    async def test_close_disposes_the_engine(self):
+        await self.manager.close()
+
+        self.assertEqual(self.manager.pool_status(), {})
+
+    async def test_session_checks_out_a_connection_on_first_query_only(self):
+        metrics = SessionMetrics()
+        async with self.manager.session() as unused:
+            self.assertEqual(self.manager.pool_status()["checked_out"], 0)
+            metrics.record("GET /unused", unused)
+        async with self.manager.session() as used:
+            await used.execute(text("SELECT 1"))
+            self.assertEqual(self.manager.pool_status()["checked_out"], 1)
+            metrics.record("GET /used", used)
+
+        self.assertEqual(metrics.stats(), {
+            "GET /unused": {"sessions": 1, "connections": 0, "avoided": 1},
+            "GET /used": {"sessions": 1, "connections": 1, "avoided": 0},
+        })
+
+    async def test_release_connection_returns_it_before_the_session_ends(self):
+        async with self.manager.session() as session:
+            value = (await session.execute(text("SELECT 1"))).scalar_one()
+            await release_connection(session)
+
+            self.assertEqual(value, 1)
+            self.assertEqual(self.manager.pool_status()["checked_out"], 0)
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import select
+
+from src.conf import messages
+from src.entity.models import Role, User
+from src.services.cache import user_cache
+from src.services.profiler import verify_token
+from tests.conftest import TestingSessionLocal, test_user
+
+
+async def set_role(role: Role):
+    async with TestingSessionLocal() as session:
+        user = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+        user.role = role
+        await session.commit()
+    user_cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_forbidden_for_users(client, get_token):
+    await set_role(Role.user)
+    response = client.get("api/admin/cache_stats", headers={"Authorization": f"Bearer {get_token}"})
+    assert response.status_code == 403, response.text
+    assert response.json()["detail"] == messages.FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_for_admin(client, get_token):
+    await set_role(Role.admin)
+    response = client.get("api/admin/cache_stats", headers={"Authorization": f"Bearer {get_token}"})
+    await set_role(Role.user)
+    assert response.status_code == 200, response.text
+    assert set(response.json()["user_cache"]) >= {"local_hits", "redis_hits", "misses", "hit_ratio"}
+
+
+@pytest.mark.asyncio
+async def test_admin_can_profile_a_request(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    await set_role(Role.admin)
+    # Cache the admin, the profiler middleware looks the user up outside the request's session.
+    assert client.get("api/admin/profiles", headers=headers).status_code == 200
+
+    response = client.get("api/contacts/", headers=headers, params={"profile": "1"})
+    profiles = client.get("api/admin/profiles", headers=headers).json()["profiles"]
+    stacks = client.get(f"api/admin/profiles/{response.headers['x-profile-id']}", headers=headers)
+    missing = client.get("api/admin/profiles/unknown", headers=headers)
+    await set_role(Role.user)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["x-profile-id"] in [profile["id"] for profile in profiles]
+    assert profiles[0]["route"] == "/api/contacts/"
+    assert stacks.status_code == 200
+    assert stacks.headers["content-type"].startswith("text/plain")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_users_cannot_profile_requests(client, get_token):
+    await set_role(Role.user)
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get("api/contacts/", headers=headers, params={"profile": "1"})
+
+    assert response.status_code == 200, response.text
+    assert "x-profile-id" not in response.headers
+    assert client.get("api/admin/profiles", headers=headers).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_profile_token(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    await set_role(Role.admin)
+    disabled = client.post("api/admin/profiles/token", headers=headers)
+    monkeypatch.setattr("src.routes.admin.config.PROFILER_SECRET", "secret")
+    response = client.post("api/admin/profiles/token", headers=headers, params={"ttl": 60})
+    await set_role(Role.user)
+
+    assert disabled.status_code == 400, disabled.text
+    assert disabled.json()["detail"] == messages.PROFILER_DISABLED
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["header"] == "X-Profile-Token"
+    assert verify_token(data["token"], "secret")
@@ -5,6 +5,8 @@ from sqlalchemy import select
 
 from src.entity.models import User
 from src.services.auth import auth_service
+from src.services.cache import cache_manager
+from src.services.hashing import build_context, pwd_context
 from tests.conftest import client, TestingSessionLocal
 from src.conf import messages
 
@@ -64,6 +66,25 @@ async def test_login(client):
     assert "token_type" in data
 
 
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash(client):
+    old_hash = build_context(["bcrypt"], 4, 2, 1024, 1).hash(user_mock["password"])
+    async with TestingSessionLocal() as session:
+        current_user = (await session.execute(select(User).filter_by(email=user_mock["email"]))).scalar_one()
+        current_user.password = old_hash
+        await session.commit()
+
+    response = client.post("api/auth/login",
+                           data={"username": user_mock["email"], "password": user_mock["password"]})
+    assert response.status_code == 200, response.text
+
+    async with TestingSessionLocal() as session:
+        current_user = (await session.execute(select(User).filter_by(email=user_mock["email"]))).scalar_one()
+    assert current_user.password != old_hash
+    assert pwd_context.verify(user_mock["password"], current_user.password)
+    assert not pwd_context.needs_update(current_user.password)
+
+
 def test_wrong_password(client):
     response = client.post("api/auth/login",
                            data={"username": user_mock["email"], "password": "wrong_password"})
@@ -118,7 +139,7 @@ async def test_refresh_token_invalid_token(client):
 
 @pytest.mark.asyncio
 async def test_confirmed_email(client, get_token):
-    with patch.object(auth_service, "cache") as redis_mok:
+    with patch.object(cache_manager, "client") as redis_mok:
         redis_mok.get.return_value = None
         tokens = get_token
         response = client.get(f"/api/auth/confirmed_email/{tokens}")
@@ -129,7 +150,7 @@ async def test_confirmed_email(client, get_token):
 
 @pytest.mark.asyncio
 async def test_confirmed_email_already_confirmed(client, get_token):
-    with patch.object(auth_service, "cache") as redis_mok:
+    with patch.object(cache_manager, "client") as redis_mok:
         redis_mok.get.return_value = None
         tokens = get_token
         client.get(f"/api/auth/confirmed_email/{tokens}")
@@ -140,6 +161,22 @@ async def test_confirmed_email_already_confirmed(client, get_token):
         assert data["message"] == messages.YOUR_EMAIL_IS_ALREADY_CONFIRMED
 
 
+@pytest.mark.asyncio
+@pytest.mark.query_budget(2)
+async def test_confirmed_email_loads_the_user_once(client):
+    email = "unconfirmed@example.com"
+    async with TestingSessionLocal() as session:
+        session.add(User(username="unconfirmed", email=email, password="hash", confirmed=False))
+        await session.commit()
+    token = auth_service.create_email_token({"sub": email})
+
+    response = client.get(f"/api/auth/confirmed_email/{token}")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["message"] == "Email confirmed"
+    assert response.headers["server-timing"].endswith('desc="2 queries"')
+
+
 @pytest.mark.asyncio
 async def test_confirmed_email_invalid_token(client):
     response = client.get("/api/auth/confirmed_email/invalid.token.string")
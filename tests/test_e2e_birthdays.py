@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.entity.models import Contact, User
+from src.services.cache import cache_manager
+from tests.conftest import TestingSessionLocal, test_user
+
+
+def test_upcoming_birthdays_requires_auth(client):
+    response = client.get("api/birthdays/upcoming_birthdays")
+    assert response.status_code == 401, response.text
+
+
+@pytest.mark.asyncio
+async def test_upcoming_birthdays_only_returns_own_contacts(client, get_token):
+    birthday = (date.today() + timedelta(days=2)).replace(year=1992)
+    async with TestingSessionLocal() as session:
+        owner = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+        stranger = User(username="stranger", email="stranger@example.com", password="x", confirmed=True)
+        session.add(stranger)
+        await session.flush()
+        session.add_all([
+            Contact(name="Mine", surname="Contact", email="mine@example.com", phone="380501230000",
+                    birthday=birthday, user_id=owner.id),
+            Contact(name="Theirs", surname="Contact", email="theirs@example.com", phone="380501231111",
+                    birthday=birthday, user_id=stranger.id),
+        ])
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("api/birthdays/upcoming_birthdays", headers=headers)
+
+    assert response.status_code == 200, response.text
+    names = [contact["name"] for contact in response.json()]
+    assert "Mine" in names
+    assert "Theirs" not in names
+    assert await cache_manager.client.ttl(test_user["email"]) > 0
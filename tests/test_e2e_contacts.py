@@ -0,0 +1,236 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import case, update
+
+from src.conf import messages
+from src.entity.models import Contact
+from src.repository.contacts import _db_now
+from tests.conftest import TestingSessionLocal
+
+
+contact_data = {"name": "Arya", "surname": "Stark", "email": "arya@example.com", "phone": "380501112233",
+                "birthday": "1997-03-11", "additional_data": "Winterfell"}
+
+
+@pytest.mark.asyncio
+async def test_update_patch_and_delete_contact(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post("api/contacts/", headers=headers, json=contact_data)
+    assert response.status_code == 200, response.text
+    contact_id = response.json()["id"]
+
+    response = client.put(f"api/contacts/{contact_id}", headers=headers,
+                          json={**contact_data, "name": "Arya II", "birthday": None})
+    assert response.status_code == 202, response.text
+    data = response.json()
+    assert data["name"] == "Arya II"
+    assert data["birthday"] == contact_data["birthday"]
+    assert data["user"]["email"] == "deadpool@example.com"
+
+    response = client.patch(f"api/contacts/{contact_id}", headers=headers,
+                            json={"phone": "380509998877", "additional_data": None})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["phone"] == "380509998877"
+    assert data["additional_data"] is None
+    assert data["name"] == "Arya II"
+
+    response = client.patch(f"api/contacts/{contact_id}", headers=headers, json={"name": None})
+    assert response.status_code == 422, response.text
+
+    response = client.delete(f"api/contacts/{contact_id}", headers=headers)
+    assert response.status_code == 204, response.text
+
+    response = client.patch(f"api/contacts/{contact_id}", headers=headers, json={"name": "Ghost"})
+    assert response.status_code == 404, response.text
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_rejected_per_user(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    first = {**contact_data, "email": "sansa@example.com", "phone": "380501110001"}
+    second = {**contact_data, "email": "bran@example.com", "phone": "380501110002"}
+    response = client.post("api/contacts/", headers=headers, json=first)
+    assert response.status_code == 200, response.text
+    response = client.post("api/contacts/", headers=headers, json=second)
+    assert response.status_code == 200, response.text
+    second_id = response.json()["id"]
+
+    response = client.post("api/contacts/", headers=headers, json={**first, "phone": "380501110003"})
+    assert response.status_code == 404, response.text
+    assert response.json()["detail"] == messages.CONTACT_EXISTS
+
+    response = client.patch(f"api/contacts/{second_id}", headers=headers, json={"phone": first["phone"]})
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == messages.CONTACT_EXISTS
+
+    response = client.get(f"api/contacts/{second_id}", headers=headers)
+    assert response.json()["phone"] == second["phone"]
+
+
+def batch_contact(n: int, **fields) -> dict:
+    return {"name": f"Direwolf{n}", "surname": "Stark", "email": f"direwolf{n}@example.com",
+            "phone": f"38050777{n:04d}", **fields}
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(6)
+async def test_batch_applies_creates_updates_and_deletes(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ids = [client.post("api/contacts/", headers=headers, json=batch_contact(n)).json()["id"] for n in range(3)]
+
+    response = client.post("api/contacts/batch", headers=headers, json={"operations": [
+        {"op": "create", "contact": batch_contact(10, birthday="2001-01-01")},
+        {"op": "update", "id": ids[0], "contact": {"name": "Ghost", "birthday": "2002-02-02"}},
+        {"op": "delete", "id": ids[1]},
+        {"op": "update", "id": ids[2], "contact": {"email": batch_contact(0)["email"]}},
+        {"op": "create", "contact": batch_contact(11, phone=batch_contact(0)["phone"])},
+        {"op": "update", "id": ids[1], "contact": {"name": "Lady"}},
+        {"op": "delete", "id": 999999},
+        {"op": "update", "id": ids[0], "contact": {"surname": "Snow"}},
+        {"op": "create", "contact": batch_contact(12)},
+    ]})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == list(range(9))
+    assert [result["status"] for result in results] == ["created", "updated", "deleted", "conflict", "conflict",
+                                                        "not_found", "not_found", "updated", "created"]
+    assert results[0]["contact"]["birthday"] == "2001-01-01"
+    assert results[0]["contact"]["user"]["email"] == "deadpool@example.com"
+    for result in (results[1], results[7]):
+        assert result["id"] == ids[0]
+        assert (result["contact"]["name"], result["contact"]["surname"]) == ("Ghost", "Snow")
+        assert result["contact"]["birthday"] == "2002-02-02"
+    assert results[3]["contact"] is None
+
+    assert client.get(f"api/contacts/{ids[1]}", headers=headers).status_code == 404
+    assert client.get(f"api/contacts/{ids[2]}", headers=headers).json()["email"] == batch_contact(2)["email"]
+    assert client.get(f"api/contacts/{results[8]['id']}", headers=headers).json()["name"] == "Direwolf12"
+
+
+@pytest.mark.asyncio
+async def test_batch_update_to_a_phone_held_before_the_batch_conflicts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ids = [client.post("api/contacts/", headers=headers, json=batch_contact(n)).json()["id"] for n in (20, 21)]
+
+    response = client.post("api/contacts/batch", headers=headers, json={"operations": [
+        {"op": "update", "id": ids[0], "contact": {"phone": "380507770099"}},
+        {"op": "update", "id": ids[1], "contact": {"phone": batch_contact(20)["phone"]}},
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert [result["status"] for result in response.json()["results"]] == ["updated", "conflict"]
+
+
+def test_batch_size_is_limited(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    monkeypatch.setattr("src.routes.contacts.config.CONTACT_BATCH_MAX_SIZE", 2)
+
+    response = client.post("api/contacts/batch", headers=headers,
+                           json={"operations": [{"op": "delete", "id": n} for n in range(1, 4)]})
+
+    assert response.status_code == 413, response.text
+    assert response.json()["detail"] == messages.BATCH_TOO_LARGE
+
+    response = client.post("api/contacts/batch", headers=headers, json={"operations": [{"op": "rename", "id": 1}]})
+    assert response.status_code == 422, response.text
+
+
+async def backdate(contact_id: int, age: timedelta):
+    async with TestingSessionLocal() as session:
+        now = await _db_now(session)
+        await session.execute(update(Contact).where(Contact.id == contact_id)
+                              .values(updated_at=now - age, deleted_at=case((Contact.deleted_at.is_(None), None),
+                                                                            else_=now - age)))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_changes_feed(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ids = [client.post("api/contacts/", headers=headers, json=batch_contact(n)).json()["id"] for n in (30, 31)]
+    for contact_id in ids:
+        await backdate(contact_id, timedelta(hours=1))
+    monkeypatch.setattr("src.repository.contacts.config.CHANGES_SETTLE_SECONDS", 600)
+
+    response = client.get("api/contacts/changes", headers=headers)
+    assert response.status_code == 200, response.text
+    page = response.json()
+    synced = {change["id"]: change for change in page["changes"]}
+    assert set(ids) <= set(synced)
+    assert synced[ids[0]]["deleted"] is False
+    assert synced[ids[0]]["contact"]["email"] == batch_contact(30)["email"]
+    assert page["has_more"] is False
+
+    assert client.delete(f"api/contacts/{ids[0]}", headers=headers).status_code == 204
+    await backdate(ids[0], timedelta(minutes=1))
+    monkeypatch.setattr("src.repository.contacts.config.CHANGES_SETTLE_SECONDS", 5)
+
+    response = client.get("api/contacts/changes", headers=headers, params={"since": page["next_cursor"]})
+    assert response.status_code == 200, response.text
+    assert [(change["id"], change["deleted"], change["contact"]) for change in response.json()["changes"]] == \
+           [(ids[0], True, None)]
+    assert client.get(f"api/contacts/{ids[0]}", headers=headers).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_pages_through_stale_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ids = [client.post("api/contacts/", headers=headers, json=batch_contact(n)).json()["id"] for n in (32, 33, 34)]
+    for contact_id in ids:
+        await backdate(contact_id, timedelta(days=60))
+
+    synced, params = [], {"limit": 2}
+    for _ in range(100):
+        response = client.get("api/contacts/changes", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        synced += [change["id"] for change in page["changes"]]
+        if not page["has_more"]:
+            break
+        params["since"] = page["next_cursor"]
+    assert not page["has_more"]
+    assert set(ids) <= set(synced)
+    assert len(synced) == len(set(synced))
+
+
+def test_changes_feed_rejects_bad_and_expired_cursors(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("api/contacts/changes", headers=headers, params={"since": "garbage"})
+    assert response.status_code == 400, response.text
+
+    monkeypatch.setattr("src.repository.contacts.config.CHANGES_SETTLE_SECONDS", 31 * 86400)
+    cursor = client.get("api/contacts/changes", headers=headers).json()["next_cursor"]
+    monkeypatch.setattr("src.repository.contacts.config.CHANGES_SETTLE_SECONDS", 5)
+
+    response = client.get("api/contacts/changes", headers=headers, params={"since": cursor})
+    assert response.status_code == 410, response.text
+    assert response.json()["detail"] == messages.CHANGES_CURSOR_EXPIRED
+
+
+@pytest.mark.query_budget(2)
+def test_lean_view_omits_the_user(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    for n in (40, 41, 42):
+        client.post("api/contacts/", headers=headers, json=batch_contact(n, birthday="1990-04-01"))
+    params = {"query": "direwolf4", "limit": 50}
+
+    full = client.get("api/contacts/", headers=headers, params=params).json()
+    response = client.get("api/contacts/", headers=headers, params={**params, "view": "lean"})
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    lean = response.json()
+    assert [{key: value for key, value in contact.items() if key != "user"} for contact in full] == lean
+    assert len(lean) == 3 and "user" not in lean[0]
+
+    response = client.get("api/contacts/", headers=headers,
+                          params={"pagination": "cursor", "limit": 2, "view": "lean", "query": "direwolf4"})
+    page = response.json()
+    assert [contact["name"] for contact in page["items"]] == ["Direwolf40", "Direwolf41"]
+    assert "user" not in page["items"][0]
+    page = client.get("api/contacts/", headers=headers, params={"pagination": "cursor", "limit": 2, "view": "lean",
+                                                                "query": "direwolf4", "after": page["next_cursor"]})
+    assert [contact["name"] for contact in page.json()["items"]] == ["Direwolf42"]
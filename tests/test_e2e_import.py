@@ -0,0 +1,112 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from main import app
+from src.conf import messages
+from src.database.db import get_session_factory
+from src.entity.models import User
+from src.services.auth import auth_service
+from tests.conftest import TestingSessionLocal
+
+CSV = ("name,surname,email,phone,birthday\n"
+       "Tyrion,Lannister,tyrion@example.com,380502220001,1980-05-01\n"
+       "Cersei,Lannister,cersei@example.com,380502220002,\n"
+       "Jaime,Lannister,jaime@example.com,380502220003,1979-13-01\n"
+       "Twin,Lannister,cersei@example.com,380502220004,\n"
+       "Tywin,Lannister,not-an-email,380502220005,\n"
+       "Kevan,Lannister,kevan@example.com,380502220006,\n")
+
+
+@pytest.fixture()
+def session_factory():
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    yield
+    del app.dependency_overrides[get_session_factory]
+
+
+def test_import_csv_reports_progress_and_row_errors(client, get_token, session_factory):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post("api/contacts/import", headers=headers,
+                           files={"file": ("book.csv", CSV.encode(), "text/csv")})
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+
+    response = client.get(f"api/contacts/import/{job_id}", headers=headers)
+
+    assert response.status_code == 200, response.text
+    job = response.json()
+    assert job["status"] == "done"
+    assert (job["processed"], job["created"], job["skipped"], job["failed"]) == (6, 3, 1, 2)
+    assert [error["row"] for error in job["errors"]] == [3, 5]
+    assert "birthday" in job["errors"][0]["error"]
+
+    response = client.get("api/contacts/", headers=headers, params={"query": "Lannister", "limit": 50})
+    assert sorted(contact["name"] for contact in response.json()) == ["Cersei", "Kevan", "Tyrion"]
+
+
+def test_import_error_report_is_capped(client, get_token, session_factory):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ndjson = "\n".join('{"name": "Nobody"}' for _ in range(5))
+    with patch("src.services.contacts_io.config.IMPORT_MAX_ERRORS", 2):
+        response = client.post("api/contacts/import", headers=headers,
+                               files={"file": ("book.ndjson", ndjson.encode(), "application/x-ndjson")})
+    job = client.get(f"api/contacts/import/{response.json()['job_id']}", headers=headers).json()
+
+    assert job["failed"] == 5
+    assert len(job["errors"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_import_job_is_private(client, get_token, session_factory):
+    response = client.post("api/contacts/import", headers={"Authorization": f"Bearer {get_token}"},
+                           files={"file": ("book.vcf", b"", "text/vcard")})
+    job_id = response.json()["job_id"]
+    async with TestingSessionLocal() as session:
+        session.add(User(username="bronn", email="bronn@example.com", password="x", confirmed=True))
+        await session.commit()
+    other_token = await auth_service.create_access_token(data={"sub": "bronn@example.com"})
+
+    response = client.get(f"api/contacts/import/{job_id}", headers={"Authorization": f"Bearer {other_token}"})
+
+    assert response.status_code == 404, response.text
+    assert response.json()["detail"] == messages.IMPORT_JOB_NOT_FOUND
+
+
+def test_import_rejects_unknown_format_and_large_files(client, get_token, session_factory):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post("api/contacts/import", headers=headers,
+                           files={"file": ("book.xlsx", b"data", "application/octet-stream")})
+    assert response.status_code == 400, response.text
+
+    with patch("src.services.contacts_io.config.IMPORT_MAX_BYTES", 10):
+        response = client.post("api/contacts/import", headers=headers,
+                               files={"file": ("book.csv", CSV.encode(), "text/csv")})
+    assert response.status_code == 413, response.text
+
+
+def test_export_streams_every_format_and_round_trips(client, get_token, session_factory):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contacts = client.get("api/contacts/", headers=headers, params={"limit": 1000}).json()
+    assert contacts
+
+    response = client.get("api/contacts/export", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.csv"'
+    assert response.text.splitlines()[0] == "name,surname,email,phone,birthday,additional_data"
+    assert len(response.text.splitlines()) == len(contacts) + 1
+
+    response = client.get("api/contacts/export", headers=headers, params={"format": "ndjson"})
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == sorted(c["id"] for c in contacts)
+
+    response = client.get("api/contacts/export", headers=headers, params={"format": "vcard"})
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.vcf"'
+    assert response.text.count("BEGIN:VCARD") == len(contacts)
+
+
+def test_export_requires_authentication(client):
+    response = client.get("api/contacts/export")
+
+    assert response.status_code == 401, response.text
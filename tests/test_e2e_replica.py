@@ -0,0 +1,64 @@
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from src.database.db import get_replica_db
+from src.entity.models import Base, Contact, User
+from tests.conftest import TestingSessionLocal, test_user
+
+REPLICA_DATABASE_URL = "sqlite+aiosqlite:///./test_replica.db"
+
+
+@pytest_asyncio.fixture()
+async def replica():
+    engine = create_async_engine(REPLICA_DATABASE_URL, connect_args={"check_same_thread": False},
+                                 poolclass=StaticPool)
+    ReplicaSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestingSessionLocal() as session:
+        owner = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+    async with ReplicaSessionLocal() as session:
+        session.add(User(id=owner.id, username=owner.username, email=owner.email, password=owner.password,
+                         confirmed=True))
+        session.add(Contact(name="Replica", surname="Only", email="replica@example.com", phone="380500000001",
+                            user_id=owner.id))
+        await session.commit()
+
+    async def override_get_replica_db():
+        async with ReplicaSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_replica_db] = override_get_replica_db
+    yield
+    del app.dependency_overrides[get_replica_db]
+    await engine.dispose()
+    os.remove("./test_replica.db")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica(client, get_token, replica):
+    response = client.get("api/contacts/", headers={"Authorization": f"Bearer {get_token}"})
+
+    assert response.status_code == 200, response.text
+    assert [contact["name"] for contact in response.json()] == ["Replica"]
+
+
+@pytest.mark.asyncio
+async def test_reads_after_a_write_go_to_the_primary(client, get_token, replica):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post("api/contacts/", headers=headers,
+                           json={"name": "Primary", "surname": "Write", "email": "primary@example.com",
+                                 "phone": "380500000002", "birthday": "1990-01-01"})
+    assert response.status_code == 200, response.text
+
+    response = client.get(f"api/contacts/{response.json()['id']}", headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Primary"
@@ -0,0 +1,61 @@
+import unittest
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.middleware.headers import HeaderInjectionMiddleware
+
+
+async def stream(request):
+    async def chunks():
+        yield b"a"
+        yield b"b"
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+class TestHeaderInjectionMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = Starlette(routes=[
+            Route("/", lambda request: PlainTextResponse("ok")),
+            Route("/own", lambda request: PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})),
+            Route("/stream", stream),
+        ])
+        app.add_middleware(HeaderInjectionMiddleware, headers={"X-Frame-Options": "DENY",
+                                                              "X-Content-Type-Options": "nosniff"})
+        self.client = TestClient(app)
+
+    def test_adds_headers(self):
+        response = self.client.get("/")
+
+        self.assertEqual(response.headers["x-frame-options"], "DENY")
+        self.assertEqual(response.headers["x-content-type-options"], "nosniff")
+        self.assertEqual(response.text, "ok")
+
+    def test_keeps_headers_set_by_the_app(self):
+        response = self.client.get("/own")
+
+        self.assertEqual(response.headers.get_list("x-frame-options"), ["SAMEORIGIN"])
+        self.assertEqual(response.headers["x-content-type-options"], "nosniff")
+
+    def test_streaming_responses(self):
+        response = self.client.get("/stream")
+
+        self.assertEqual(response.text, "ab")
+        self.assertEqual(response.headers["x-frame-options"], "DENY")
+
+
+def test_allow_origin_for_plain_requests(client):
+    response = client.get("/")
+
+    assert response.headers.get_list("access-control-allow-origin") == ["*"]
+
+
+def test_credentialed_cors_request_keeps_origin(client):
+    response = client.get("/", headers={"Origin": "https://app.example.com", "Cookie": "session=1"})
+
+    assert response.headers.get_list("access-control-allow-origin") == ["https://app.example.com"]
+    assert response.headers["access-control-allow-credentials"] == "true"
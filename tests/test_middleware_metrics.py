@@ -0,0 +1,56 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middleware.metrics import MetricsMiddleware
+from src.services.metrics import Metrics
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        @app.get("/boom")
+        async def boom():
+            raise RuntimeError("boom")
+
+        self.metrics = Metrics()
+        app.add_middleware(MetricsMiddleware, metrics=self.metrics)
+        self.client = TestClient(app, raise_server_exceptions=False)
+
+    def recorded(self) -> dict:
+        return {key: len(durations) for key, durations in self.metrics._durations.items()}
+
+    def test_labels_requests_by_route_template(self):
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+        self.client.get("/items/x")
+
+        self.assertEqual(self.recorded(), {("GET", "/items/{item_id}", "200"): 2,
+                                           ("GET", "/items/{item_id}", "422"): 1})
+        self.assertEqual(self.metrics.in_progress, 0)
+
+    def test_unmatched_and_failed_requests(self):
+        self.client.get("/nowhere/1")
+        self.client.get("/boom")
+
+        self.assertEqual(self.recorded(), {("GET", "unmatched", "404"): 1, ("GET", "/boom", "500"): 1})
+        self.assertEqual(self.metrics.in_progress, 0)
+
+
+def test_metrics_endpoint(client, get_token):
+    client.get("/api/contacts/1", headers={"Authorization": f"Bearer {get_token}"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/contacts/{contact_id}",status="404"}' in response.text
+    assert 'db_pool_connections{database="primary",state="size"}' in response.text
+    assert "user_cache_lookups_total" in response.text
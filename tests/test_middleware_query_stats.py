@@ -0,0 +1,59 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.database.db import DatabaseSessionManager, QueryStats
+from src.middleware.query_stats import QueryStatsMiddleware
+
+
+class TestQueryStats(unittest.TestCase):
+
+    def test_most_repeated(self):
+        stats = QueryStats()
+        self.assertIsNone(stats.most_repeated())
+
+        stats.record("SELECT 1", 0.001)
+        stats.record("SELECT 2", 0.002)
+        stats.record("SELECT 2", 0.003)
+
+        self.assertEqual((stats.count, round(stats.seconds, 3)), (3, 0.006))
+        self.assertEqual(stats.most_repeated(), ("SELECT 2", 2))
+
+
+class TestQueryStatsMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = DatabaseSessionManager("sqlite+aiosqlite://")
+        app = FastAPI()
+
+        @app.get("/queries/{count}")
+        async def queries(count: int):
+            async with self.manager.session() as session:
+                for n in range(count):
+                    await session.execute(text("SELECT :n"), {"n": n})
+            return {}
+
+        app.add_middleware(QueryStatsMiddleware, repeat_threshold=3)
+        self.client = TestClient(app)
+
+    def test_server_timing_header(self):
+        with self.assertLogs("src.middleware.query_stats", level="DEBUG") as logs:
+            response = self.client.get("/queries/2")
+
+        self.assertRegex(response.headers["server-timing"], r'^db;dur=\d+\.\d;desc="2 queries"$')
+        self.assertEqual(logs.records[0].levelname, "DEBUG")
+        self.assertEqual((logs.records[0].route, logs.records[0].queries), ("GET /queries/{count}", 2))
+
+    def test_warns_about_repeated_statements(self):
+        with self.assertLogs("src.middleware.query_stats", level="WARNING") as logs:
+            response = self.client.get("/queries/3")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("possible N+1: 3 x SELECT ?", logs.output[0])
+
+    def test_requests_without_queries(self):
+        response = self.client.get("/queries/0")
+
+        self.assertEqual(response.headers["server-timing"], 'db;dur=0.0;desc="0 queries"')
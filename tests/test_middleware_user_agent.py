@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.middleware.user_agent import UserAgentBanList, UserAgentBanMiddleware
+
+
+class TestUserAgentBanList(unittest.TestCase):
+
+    def test_matches_any_pattern(self):
+        ban_list = UserAgentBanList([r"python-requests", r"bot"])
+
+        self.assertTrue(ban_list.is_banned("python-requests/2.31"))
+        self.assertTrue(ban_list.is_banned("Googlebot/2.1"))
+        self.assertFalse(ban_list.is_banned("Mozilla/5.0 (X11; Linux x86_64)"))
+        self.assertFalse(ban_list.is_banned(""))
+
+    def test_verdicts_are_cached_and_bounded(self):
+        ban_list = UserAgentBanList([r"bot"], cache_size=2)
+        ban_list.is_banned("a")
+        ban_list.is_banned("b")
+        ban_list.is_banned("a")
+        ban_list.is_banned("c")
+
+        self.assertEqual(list(ban_list._verdicts), ["a", "c"])
+        with patch.object(ban_list, "_regex") as regex:
+            ban_list.is_banned("a")
+        regex.search.assert_not_called()
+
+    def test_empty_list_bans_nothing(self):
+        self.assertFalse(UserAgentBanList([]).is_banned("bot"))
+
+    def test_reloads_file_when_it_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "banned")
+            with open(path, "w") as file:
+                file.write("# crawlers\ncurl\n\n")
+            ban_list = UserAgentBanList(path=path, reload_interval=0)
+
+            self.assertTrue(ban_list.is_banned("curl/8.0"))
+            self.assertFalse(ban_list.is_banned("wget/1.21"))
+
+            with open(path, "w") as file:
+                file.write("wget\n")
+            os.utime(path, (1, 1))
+
+            self.assertFalse(ban_list.is_banned("curl/8.0"))
+            self.assertTrue(ban_list.is_banned("wget/1.21"))
+
+    def test_keeps_previous_list_on_invalid_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "banned")
+            with open(path, "w") as file:
+                file.write("curl\n")
+            ban_list = UserAgentBanList(path=path, reload_interval=0)
+
+            with open(path, "w") as file:
+                file.write("curl(\n")
+            os.utime(path, (1, 1))
+            self.assertTrue(ban_list.is_banned("curl/8.0"))
+
+            os.remove(path)
+            self.assertTrue(ban_list.is_banned("curl/8.0"))
+
+
+class TestUserAgentBanMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+        app.add_middleware(UserAgentBanMiddleware, ban_list=UserAgentBanList([r"bot"]))
+        self.client = TestClient(app)
+
+    def test_bans_matching_user_agent(self):
+        response = self.client.get("/", headers={"User-Agent": "spambot/1.0"})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"detail": "You are banned"})
+
+    def test_allows_other_user_agents(self):
+        response = self.client.get("/", headers={"User-Agent": "Mozilla/5.0"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "ok")
+
+    def test_missing_user_agent_is_allowed(self):
+        self.client.headers.pop("user-agent")
+
+        response = self.client.get("/")
+
+        self.assertEqual(response.status_code, 200)
+
+
+def test_banned_user_agent_is_rejected(client):
+    response = client.get("/", headers={"User-Agent": "python-requests/2.31"})
+
+    assert response.status_code == 403, response.text
+    assert response.json() == {"detail": "You are banned"}
@@ -100,14 +100,14 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
         mock_db = MagicMock(spec=AsyncSession)
         mock_user = User(email="test@example.com", confirmed=False)
 
-        with patch('src.repository.auth.get_user_by_email', return_value=mock_user) as mock_get_user:
+        with patch('src.repository.auth.get_user_by_email') as mock_get_user:
 
-            await confirmed_email("test@example.com", mock_db)
+            await confirmed_email(mock_user, mock_db)
 
         self.assertTrue(mock_user.confirmed)
         mock_db.add.assert_called_once_with(mock_user)
         mock_db.commit.assert_called_once()
-        mock_get_user.assert_called_once_with(email="test@example.com", db=mock_db)
+        mock_get_user.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -1,8 +1,15 @@
+import json
 import unittest
 from unittest.mock import AsyncMock, MagicMock
-from datetime import date, timedelta
-from src.repository.birthdays import get_upcoming_birthdays
-from src.entity.models import Contact
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, select
+
+from src.repository.birthdays import (get_upcoming_birthdays, birthday_window, get_cached_upcoming_birthdays,
+                                      invalidate_upcoming_birthdays, upcoming_birthdays_key)
+from src.entity.models import Contact, User
+from src.services.cache import cache_manager
+from tests.conftest import TestingSessionLocal, test_user
 
 
 class TestGetUpcomingBirthdays(unittest.IsolatedAsyncioTestCase):
@@ -10,23 +17,89 @@ class TestGetUpcomingBirthdays(unittest.IsolatedAsyncioTestCase):
     async def test_get_upcoming_birthdays(self):
         today = date.today()
         in_3_days = today + timedelta(days=3)
-        in_10_days = today + timedelta(days=10)
-        yesterday = today - timedelta(days=1)
 
         contact_1 = Contact(id=1, name="Alice", birthday=in_3_days)
-        contact_2 = Contact(id=2, name="Bob", birthday=in_10_days)
-        contact_3 = Contact(id=3, name="Charlie", birthday=yesterday)
-        contact_4 = Contact(id=4, name="Daisy", birthday=None)
 
         mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [
-            contact_1, contact_2, contact_3, contact_4
-        ]
+        mock_result.scalars.return_value.all.return_value = [contact_1]
 
         mock_session = AsyncMock()
         mock_session.execute.return_value = mock_result
 
-        result = await get_upcoming_birthdays(db=mock_session)
+        result = await get_upcoming_birthdays(user=User(id=1), db=mock_session)
 
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0].name, "Alice")
+        stmt = mock_session.execute.call_args.args[0]
+        self.assertIn("contacts.user_id = :user_id_1", str(stmt))
+        self.assertIn("contacts.birthday_md BETWEEN", str(stmt))
+
+    async def test_cached_upcoming_birthdays_hit(self):
+        key = upcoming_birthdays_key(1, date.today())
+        await cache_manager.client.hset(key, "7", json.dumps([{"id": 1, "name": "Alice"}]))
+        mock_session = AsyncMock()
+
+        result = await get_cached_upcoming_birthdays(user=User(id=1), db=mock_session, days=7)
+
+        self.assertEqual(result, [{"id": 1, "name": "Alice"}])
+        mock_session.execute.assert_not_called()
+
+    async def test_cached_upcoming_birthdays_miss_stores_until_midnight(self):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = []
+        mock_session = AsyncMock()
+        mock_session.execute.return_value = mock_result
+
+        result = await get_cached_upcoming_birthdays(user=User(id=1), db=mock_session, days=7)
+
+        self.assertEqual(result, [])
+        key = upcoming_birthdays_key(1, date.today())
+        self.assertEqual(await cache_manager.client.hget(key, "7"), b"[]")
+        midnight = datetime.combine(date.today() + timedelta(days=1), time.min)
+        self.assertAlmostEqual(await cache_manager.client.ttl(key), (midnight - datetime.now()).total_seconds(),
+                               delta=2)
+
+    async def test_invalidate_upcoming_birthdays(self):
+        key = upcoming_birthdays_key(1, date.today())
+        await cache_manager.client.hset(key, "7", "[]")
+
+        await invalidate_upcoming_birthdays(1)
+
+        self.assertIsNone(await cache_manager.client.hget(key, "7"))
+
+    def test_window_wraps_around_year_end(self):
+        self.assertEqual(birthday_window(date(2026, 12, 29), 7), (1229, 105))
+
+    def test_window_includes_feb_29_in_non_leap_year(self):
+        self.assertEqual(birthday_window(date(2027, 2, 21), 7), (221, 229))
+        self.assertEqual(birthday_window(date(2028, 2, 21), 7), (221, 228))
+
+    def test_window_spanning_a_year_is_unbounded(self):
+        self.assertIsNone(birthday_window(date(2026, 5, 1), 365))
+
+
+class TestGetUpcomingBirthdaysSQL(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async with TestingSessionLocal() as session:
+            user = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+            self.user = user
+            await session.execute(delete(Contact).where(Contact.user_id == user.id))
+            for n, (name, birthday) in enumerate([("Alice", date(1990, 1, 2)), ("Bob", date(1985, 12, 30)),
+                                                  ("Leap", date(1996, 2, 29)), ("Charlie", date(1991, 6, 15)),
+                                                  ("Daisy", None)]):
+                session.add(Contact(name=name, surname="Test", email=f"{name.lower()}@example.com",
+                                    phone=f"38050{n}000000", birthday=birthday, user_id=user.id))
+            await session.commit()
+
+    async def test_window_across_year_end_is_ordered_by_date(self):
+        async with TestingSessionLocal() as session:
+            result = await get_upcoming_birthdays(user=self.user, db=session, days=7, today=date(2026, 12, 28))
+
+        self.assertEqual([contact.name for contact in result], ["Bob", "Alice"])
+
+    async def test_feb_29_birthday_in_non_leap_year(self):
+        async with TestingSessionLocal() as session:
+            result = await get_upcoming_birthdays(user=self.user, db=session, days=3, today=date(2027, 2, 25))
+
+        self.assertEqual([contact.name for contact in result], ["Leap"])
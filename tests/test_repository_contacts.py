@@ -1,20 +1,37 @@
 import unittest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import date
+from datetime import timedelta
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.entity.models import Contact, User
-from src.schemas.contact import ContactShema
+from src.schemas.contact import BatchCreate, BatchDelete, BatchUpdate, ContactShema, ContactUpdateShema
 from src.repository.contacts import (
     get_contacts,
+    get_contacts_page,
+    encode_cursor,
+    decode_cursor,
+    _encode_values,
     get_contact_by_id,
     create_contact,
     update_contact,
-    delete_contact
+    patch_contact,
+    delete_contact,
+    apply_batch,
+    get_changes,
+    compact_tombstones,
+    CursorExpired,
+    _db_now
 )
+from tests.conftest import TestingSessionLocal, engine, test_user
 
 
 class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
+        invalidate_patcher = patch("src.repository.contacts.invalidate_upcoming_birthdays")
+        self.invalidate_upcoming_birthdays = invalidate_patcher.start()
+        self.addCleanup(invalidate_patcher.stop)
         self.user = User(id=1, username="test_user", email="test@example.com")
         self.session = AsyncMock(spec=AsyncSession)
 
@@ -61,6 +78,47 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(contacts), 1)
         self.session.execute.assert_called_once()
 
+    async def test_get_contacts_page_next_cursor(self):
+        second = Contact(id=2, name="Jane", surname="Doe", email="jane@example.com", phone="0987654321",
+                         user_id=self.user.id)
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [self.test_contact, second]
+        self.session.execute.return_value = mock_result
+
+        contacts, next_cursor = await get_contacts_page(limit=1, after=None, query=None, sort="name",
+                                                        db=self.session, user=self.user)
+
+        self.assertEqual(contacts, [self.test_contact])
+        self.assertEqual(decode_cursor(next_cursor, "name"), ["John", 1])
+        self.session.execute.assert_called_once()
+
+    async def test_get_contacts_page_last_page(self):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [self.test_contact]
+        self.session.execute.return_value = mock_result
+
+        contacts, next_cursor = await get_contacts_page(limit=10, after=encode_cursor("id", self.test_contact),
+                                                        query="john", sort="id", db=self.session, user=self.user)
+
+        self.assertEqual(len(contacts), 1)
+        self.assertIsNone(next_cursor)
+
+    async def test_get_contacts_page_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            await get_contacts_page(limit=10, after="not-a-cursor", query=None, sort="id",
+                                    db=self.session, user=self.user)
+        with self.assertRaises(ValueError):
+            await get_contacts_page(limit=10, after=encode_cursor("id", self.test_contact), query=None,
+                                    sort="name", db=self.session, user=self.user)
+        self.session.execute.assert_not_called()
+
+    def test_decode_cursor_rejects_mistyped_values(self):
+        for sort, values in (("id", ["1"]), ("id", [True]), ("name", [[1], 5]), ("name", [None, 5]),
+                             ("updated_at", [1, "2025-01-01T00:00:00", 5]),
+                             ("updated_at", ["2025-01-01T00:00:00", "yesterday", 5])):
+            with self.subTest(sort=sort, values=values), self.assertRaises(ValueError):
+                decode_cursor(_encode_values(sort, values), sort)
+
     async def test_get_contact_by_id(self):
         mock_result = MagicMock()
         mock_result.scalars.return_value.first.return_value = self.test_contact
@@ -84,45 +142,43 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
         self.session.execute.assert_called_once()
 
     async def test_create_contact_success(self):
+        created = Contact(id=5, **self.contact_data.model_dump(), user_id=self.user.id)
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = None
+        mock_result.scalars.return_value.first.return_value = created
         self.session.execute.return_value = mock_result
 
-        self.session.commit = AsyncMock()
-        self.session.refresh = AsyncMock()
-
-        self.user = MagicMock()
-        self.user.id = 1
-
         new_contact = await create_contact(contact=self.contact_data, user=self.user, db=self.session)
 
-        self.assertIsNotNone(new_contact)
-        self.assertEqual(new_contact.name, "John")
-        self.assertEqual(new_contact.user_id, 1)
-        self.session.add.assert_called_once()
+        self.assertIs(new_contact, created)
+        self.assertIs(new_contact.user, self.user)
+        self.session.execute.assert_awaited_once()
+        stmt = str(self.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("INSERT INTO contacts", stmt)
+        self.assertIn("ON CONFLICT DO NOTHING RETURNING", stmt)
+        self.session.add.assert_not_called()
         self.session.commit.assert_awaited_once()
-        self.session.refresh.assert_awaited_once()
+        self.session.refresh.assert_not_called()
+        self.invalidate_upcoming_birthdays.assert_called_once_with(1)
 
     async def test_create_contact_conflict(self):
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = self.test_contact
+        mock_result.scalars.return_value.first.return_value = None
         self.session.execute.return_value = mock_result
 
         result = await create_contact(contact=self.contact_data, user=self.user, db=self.session)
 
         self.assertIsNone(result)
         self.session.execute.assert_called_once()
-        self.session.add.assert_not_called()
         self.session.commit.assert_not_called()
+        self.invalidate_upcoming_birthdays.assert_not_called()
 
     async def test_update_contact_success(self):
+        updated = Contact(id=1, name="Updated Name", surname="Doe", email="john@example.com", phone="1234567890",
+                          user_id=self.user.id)
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = self.test_contact
+        mock_result.scalars.return_value.first.return_value = updated
         self.session.execute.return_value = mock_result
 
-        self.session.commit = AsyncMock()
-        self.session.refresh = AsyncMock()
-
         updated_data = self.contact_data.model_copy()
         updated_data.name = "Updated Name"
 
@@ -135,12 +191,20 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
 
         self.assertIsNotNone(updated_contact)
         self.assertEqual(updated_contact.name, "Updated Name")
+        self.assertIs(updated_contact.user, self.user)
+        self.session.execute.assert_awaited_once()
+        stmt = str(self.session.execute.call_args.args[0])
+        self.assertIn("UPDATE contacts SET", stmt)
+        self.assertIn("contacts.user_id = :user_id_1", stmt)
+        self.assertIn("RETURNING", stmt)
+        self.session.expunge.assert_called_once_with(updated)
         self.session.commit.assert_awaited_once()
-        self.session.refresh.assert_awaited_once()
+        self.session.refresh.assert_not_called()
+        self.invalidate_upcoming_birthdays.assert_called_once_with(self.user.id)
 
     async def test_update_contact_not_found(self):
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = None
+        mock_result.scalars.return_value.first.return_value = None
         self.session.execute.return_value = mock_result
 
         result = await update_contact(
@@ -154,12 +218,45 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
         self.session.execute.assert_called_once()
         self.session.commit.assert_not_called()
 
-    async def test_delete_contact_success(self):
+    async def test_get_contacts_lean_selects_contact_columns_only(self):
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = self.test_contact
+        mock_result.all.return_value = [("row",)]
         self.session.execute.return_value = mock_result
 
-        self.session.commit = AsyncMock()
+        contacts = await get_contacts(limit=10, offset=0, query=None, db=self.session, user=self.user, lean=True)
+
+        self.assertEqual(contacts, [("row",)])
+        stmt = str(self.session.execute.call_args.args[0])
+        self.assertNotIn("users", stmt)
+        self.assertTrue(stmt.startswith("SELECT contacts.id, contacts.name"))
+
+    async def test_patch_contact_only_sets_given_fields(self):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.first.return_value = self.test_contact
+        self.session.execute.return_value = mock_result
+
+        await patch_contact(contact_id=1, contact=ContactUpdateShema(phone="0987654321"), user=self.user,
+                            db=self.session)
+
+        stmt = self.session.execute.call_args.args[0].compile()
+        self.assertEqual(set(stmt.params) - {"id_1", "user_id_1"}, {"phone"})
+        self.session.commit.assert_awaited_once()
+
+    async def test_patch_contact_without_changes_only_reads(self):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.first.return_value = self.test_contact
+        self.session.execute.return_value = mock_result
+
+        contact = await patch_contact(contact_id=1, contact=ContactUpdateShema(), user=self.user, db=self.session)
+
+        self.assertIs(contact, self.test_contact)
+        self.assertTrue(str(self.session.execute.call_args.args[0]).startswith("SELECT"))
+        self.session.commit.assert_not_called()
+
+    async def test_delete_contact_success(self):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.first.return_value = self.test_contact
+        self.session.execute.return_value = mock_result
 
         deleted_contact = await delete_contact(
             contact_id=1,
@@ -169,12 +266,18 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
 
         self.assertIsNotNone(deleted_contact)
         self.assertEqual(deleted_contact.id, 1)
-        self.session.delete.assert_called_once_with(self.test_contact)
+        stmt = str(self.session.execute.call_args.args[0])
+        self.assertIn("UPDATE contacts SET updated_at=now(), deleted_at=now()", stmt)
+        self.assertIn("contacts.user_id = :user_id_1", stmt)
+        self.assertIn("contacts.deleted_at IS NULL", stmt)
+        self.assertIn("RETURNING", stmt)
+        self.session.delete.assert_not_called()
         self.session.commit.assert_awaited_once()
+        self.invalidate_upcoming_birthdays.assert_called_once_with(self.user.id)
 
     async def test_delete_contact_not_found(self):
         mock_result = MagicMock()
-        mock_result.scalars.return_value.unique.return_value.first.return_value = None
+        mock_result.scalars.return_value.first.return_value = None
         self.session.execute.return_value = mock_result
 
         result = await delete_contact(
@@ -185,9 +288,152 @@ class TestContactsRepository(unittest.IsolatedAsyncioTestCase):
 
         self.assertIsNone(result)
         self.session.execute.assert_called_once()
-        self.session.delete.assert_not_called()
         self.session.commit.assert_not_called()
 
 
+class TestApplyBatchSQL(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async with TestingSessionLocal() as session:
+            self.user = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+            contacts = [Contact(name=f"Batch{n}", surname="Test", email=f"batch{n}@example.com",
+                                phone=f"38063{n:07d}", user_id=self.user.id) for n in range(20)]
+            session.add_all(contacts)
+            await session.commit()
+            self.ids = [contact.id for contact in contacts]
+        self.statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self.record)
+
+    async def asyncTearDown(self):
+        event.remove(engine.sync_engine, "before_cursor_execute", self.record)
+        async with TestingSessionLocal() as session:
+            await session.execute(delete(Contact).where(Contact.email.like("batch%")))
+            await session.commit()
+
+    def record(self, conn, cursor, statement, *args):
+        self.statements.append(statement.split()[0])
+
+    async def test_each_kind_of_operation_is_one_statement(self):
+        operations = [
+            *(BatchDelete(op="delete", id=contact_id) for contact_id in self.ids[:5]),
+            *(BatchUpdate(op="update", id=contact_id, contact=ContactUpdateShema(name=f"Renamed{n}",
+                                                                                  email=f"batch{n}b@example.com"))
+              for n, contact_id in enumerate(self.ids[5:])),
+            *(BatchCreate(op="create", contact=ContactShema(name="New", surname="Test",
+                                                            email=f"batch{n}c@example.com", phone=f"38064{n:07d}"))
+              for n in range(10)),
+        ]
+
+        async with TestingSessionLocal() as session:
+            results = await apply_batch(operations, user=self.user, db=session)
+
+        self.assertEqual([result["status"] for result in results],
+                         ["deleted"] * 5 + ["updated"] * 15 + ["created"] * 10)
+        self.assertEqual(results[5]["contact"].name, "Renamed0")
+        self.assertEqual(self.statements, ["UPDATE", "SELECT", "SELECT", "UPDATE", "INSERT"])
+
+
+class TestChangesFeedSQL(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async with TestingSessionLocal() as session:
+            self.user = User(username="changes", email="changes@example.com", password="x", confirmed=True)
+            session.add(self.user)
+            await session.commit()
+            self.now = await _db_now(session)
+            contacts = [Contact(name=f"Change{n}", surname="Test", email=f"change{n}@example.com",
+                                phone=f"38066{n:07d}", user_id=self.user.id) for n in range(5)]
+            session.add_all(contacts)
+            await session.commit()
+            self.ids = [contact.id for contact in contacts]
+        # Written an hour ago, one second apart, in reverse ID order.
+        for n, contact_id in enumerate(reversed(self.ids)):
+            await self.backdate(contact_id, timedelta(hours=1) - timedelta(seconds=n))
+
+    async def asyncTearDown(self):
+        async with TestingSessionLocal() as session:
+            await session.execute(delete(Contact).where(Contact.user_id == self.user.id))
+            await session.execute(delete(User).where(User.id == self.user.id))
+            await session.commit()
+
+    async def backdate(self, contact_id: int, age: timedelta, deleted: bool = False):
+        values = {"updated_at": self.now - age}
+        if deleted:
+            values["deleted_at"] = self.now - age
+        async with TestingSessionLocal() as session:
+            await session.execute(update(Contact).where(Contact.id == contact_id).values(**values))
+            await session.commit()
+
+    async def changes(self, since, limit=100, settle=5):
+        with patch("src.repository.contacts.config.CHANGES_SETTLE_SECONDS", settle):
+            async with TestingSessionLocal() as session:
+                return await get_changes(since=since, limit=limit, user=self.user, db=session)
+
+    async def test_full_sync_pages_then_only_changes(self):
+        # Synced 10 minutes ago.
+        first, cursor, has_more = await self.changes(None, limit=3, settle=600)
+        self.assertEqual([contact.id for contact in first], self.ids[::-1][:3])
+        self.assertTrue(has_more)
+        rest, cursor, has_more = await self.changes(cursor, settle=600)
+        self.assertEqual([contact.id for contact in rest], self.ids[::-1][3:])
+        self.assertFalse(has_more)
+
+        async with TestingSessionLocal() as session:
+            await delete_contact(self.ids[0], user=self.user, db=session)
+        await self.backdate(self.ids[0], timedelta(minutes=1), deleted=True)
+        async with TestingSessionLocal() as session:
+            await patch_contact(self.ids[3], ContactUpdateShema(name="Renamed"), user=self.user, db=session)
+        await self.backdate(self.ids[3], timedelta(seconds=30))
+
+        changes, cursor, has_more = await self.changes(cursor)
+
+        self.assertEqual([(contact.id, contact.deleted_at is not None) for contact in changes],
+                         [(self.ids[0], True), (self.ids[3], False)])
+        self.assertEqual(changes[1].name, "Renamed")
+        self.assertEqual((await self.changes(cursor))[0], [])
+
+    async def test_recent_changes_wait_for_the_settle_window(self):
+        await self.backdate(self.ids[0], timedelta(seconds=1))
+
+        changes, _, _ = await self.changes(None)
+
+        self.assertNotIn(self.ids[0], [contact.id for contact in changes])
+
+    async def test_tombstone_frees_email_and_is_not_read(self):
+        async with TestingSessionLocal() as session:
+            await delete_contact(self.ids[1], user=self.user, db=session)
+        async with TestingSessionLocal() as session:
+            self.assertIsNone(await get_contact_by_id(self.ids[1], user=self.user, db=session))
+            contacts, _ = await get_contacts_page(limit=10, after=None, query="change1", sort="id", db=session,
+                                                  user=self.user)
+            self.assertEqual(contacts, [])
+            again = await create_contact(ContactShema(name="Again", surname="Test", email="change1@example.com",
+                                                      phone="380660000001"), user=self.user, db=session)
+        self.assertIsNotNone(again)
+
+    async def test_expired_cursor_and_compaction(self):
+        # Synced 31 days ago.
+        _, cursor, _ = await self.changes(None, settle=31 * 86400)
+        async with TestingSessionLocal() as session:
+            await delete_contact(self.ids[2], user=self.user, db=session)
+            await delete_contact(self.ids[4], user=self.user, db=session)
+        await self.backdate(self.ids[2], timedelta(days=31), deleted=True)
+
+        with patch("src.repository.contacts.config.TOMBSTONE_RETENTION_DAYS", 30):
+            async with TestingSessionLocal() as session:
+                removed = await compact_tombstones(session)
+            with self.assertRaises(CursorExpired):
+                await self.changes(cursor)
+
+        self.assertEqual(removed, 1)
+        async with TestingSessionLocal() as session:
+            left = (await session.execute(select(Contact.id).where(Contact.user_id == self.user.id))).scalars().all()
+        self.assertEqual(sorted(left), [contact_id for contact_id in self.ids if contact_id != self.ids[2]])
+
+    async def test_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            await self.changes(encode_cursor("id", Contact(id=1)))
+
+
 if __name__ == '__main__':
     unittest.main()
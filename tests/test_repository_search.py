@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import delete, select
+
+from src.entity.models import Contact, User
+from src.repository.contacts import get_contacts
+from src.repository.search import search_condition, search_rank
+from sqlalchemy.dialects import postgresql
+from tests.conftest import TestingSessionLocal, test_user
+
+
+async def seed(session):
+    user = (await session.execute(select(User).filter_by(email=test_user["email"]))).scalar_one()
+    await session.execute(delete(Contact).where(Contact.user_id == user.id))
+    session.add_all([
+        Contact(name="Johnny", surname="Walker", email="walker@example.com", phone="380501112233",
+                user_id=user.id),
+        Contact(name="Anna", surname="Smith", email="anna@example.com", phone="380504445566",
+                additional_data="met john at the conference", user_id=user.id),
+        Contact(name="Bob", surname="Marley", email="bob@example.com", phone="380507778899",
+                user_id=user.id),
+    ])
+    await session.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_fts5_substring_search_is_ranked():
+    async with TestingSessionLocal() as session:
+        user = await seed(session)
+
+        contacts = await get_contacts(limit=10, offset=0, query="john", db=session, user=user)
+
+        assert [contact.name for contact in contacts] == ["Johnny", "Anna"]
+
+
+@pytest.mark.asyncio
+async def test_fts5_index_follows_updates_and_deletes():
+    async with TestingSessionLocal() as session:
+        user = await seed(session)
+        bob = (await session.execute(select(Contact).filter_by(name="Bob"))).unique().scalar_one()
+        bob.phone = "380509990000"
+        await session.commit()
+
+        assert await get_contacts(limit=10, offset=0, query="7778", db=session, user=user) == []
+        found = await get_contacts(limit=10, offset=0, query="9990", db=session, user=user)
+        assert [contact.name for contact in found] == ["Bob"]
+
+        await session.delete(bob)
+        await session.commit()
+        assert await get_contacts(limit=10, offset=0, query="9990", db=session, user=user) == []
+
+
+@pytest.mark.asyncio
+async def test_short_query_falls_back_to_like():
+    async with TestingSessionLocal() as session:
+        user = await seed(session)
+
+        contacts = await get_contacts(limit=10, offset=0, query="bo", db=session, user=user)
+
+        assert [contact.name for contact in contacts] == ["Bob"]
+
+
+def test_postgres_search_uses_tsvector_and_trigram_columns():
+    condition = str(search_condition("john doe", "postgresql").compile(dialect=postgresql.dialect()))
+    rank = str(search_rank("john", "postgresql").compile(dialect=postgresql.dialect()))
+
+    assert "contacts.search_vector @@ to_tsquery" in condition
+    assert "contacts.name ILIKE" in condition
+    assert "similarity(contacts.name" in rank and "ts_rank_cd" in rank
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from src.entity.models import User
+from src.services.auth import auth_service
+from src.services.cache import user_cache
+
+
+class TestGetCurrentUser(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.user = User(id=1, username="jon", email="jon@example.com", confirmed=True)
+        self.token = await auth_service.create_access_token(data={"sub": self.user.email})
+
+    async def test_concurrent_misses_load_the_user_once(self):
+        async def slow_load(email, db):
+            await asyncio.sleep(0.05)
+            return self.user
+
+        with patch("src.services.auth.repository_auth.get_user_by_email",
+                   AsyncMock(side_effect=slow_load)) as get_user_by_email:
+            users = await asyncio.gather(*(auth_service.get_current_user(self.token, db=AsyncMock())
+                                           for _ in range(1000)))
+
+        get_user_by_email.assert_awaited_once()
+        self.assertEqual({user.email for user in users}, {self.user.email})
+        self.assertGreaterEqual(user_cache.coalesced, 999)
+
+    async def test_failed_load_is_raised_to_every_waiter(self):
+        async def failing_load(email, db):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("database is down")
+
+        with patch("src.services.auth.repository_auth.get_user_by_email",
+                   AsyncMock(side_effect=failing_load)) as get_user_by_email:
+            results = await asyncio.gather(*(auth_service.get_current_user(self.token, db=AsyncMock())
+                                             for _ in range(10)), return_exceptions=True)
+
+        get_user_by_email.assert_awaited_once()
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+
+    async def test_unknown_user_is_unauthorized(self):
+        with patch("src.services.auth.repository_auth.get_user_by_email", AsyncMock(return_value=None)):
+            with self.assertRaises(HTTPException) as err:
+                await auth_service.get_current_user(self.token, db=AsyncMock())
+
+        self.assertEqual(err.exception.status_code, 401)
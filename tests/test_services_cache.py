@@ -0,0 +1,138 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from src.entity.models import Role, User
+from src.services.cache import LocalCache, UserCache, UserSnapshot, cache_manager
+
+
+class TestLocalCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        cache = LocalCache(maxsize=2, ttl=10)
+        with patch("src.services.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("src.services.cache.time.monotonic", return_value=111):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class TestUserSnapshot(unittest.TestCase):
+
+    def test_round_trip_keeps_only_public_fields(self):
+        user = User(id=7, username="jon", email="jon@example.com", avatar=None, role=Role.admin, confirmed=True,
+                    password="hash", refresh_token="secret")
+
+        snapshot = UserSnapshot.from_user(user)
+        data = snapshot.encode()
+
+        self.assertEqual(UserSnapshot.decode(data), snapshot)
+        self.assertNotIn(b"hash", data)
+        self.assertNotIn(b"secret", data)
+        self.assertFalse(hasattr(snapshot, "__dict__"))
+
+    def test_rejects_other_versions_and_truncated_records(self):
+        data = UserSnapshot(id=1, username="jon", email="jon@example.com", avatar="http://a").encode()
+
+        with self.assertRaises(ValueError):
+            UserSnapshot.decode(b"\x02" + data[1:])
+        with self.assertRaises(ValueError):
+            UserSnapshot.decode(data[:-3])
+
+
+class TestUserCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_counts_local_redis_hits_and_misses(self):
+        worker_1 = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        worker_2 = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        user = User(id=1, email="test@example.com", username="test")
+
+        self.assertIsNone(await worker_1.get(user.email))
+        await worker_1.set(user.email, user)
+        self.assertEqual((await worker_1.get(user.email)).email, user.email)
+        self.assertEqual((await worker_2.get(user.email)).email, user.email)
+
+        self.assertEqual(worker_1.stats()["local_hits"], 1)
+        self.assertEqual(worker_1.stats()["misses"], 1)
+        self.assertEqual(worker_2.stats()["redis_hits"], 1)
+        self.assertEqual(await cache_manager.client.ttl(user.email), 300)
+
+    async def test_unreadable_redis_entry_is_a_miss(self):
+        worker = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        await cache_manager.client.set("test@example.com", b"\x80\x04legacy-pickle")
+
+        self.assertIsNone(await worker.get("test@example.com"))
+        self.assertEqual(worker.stats()["misses"], 1)
+
+    async def test_invalidate_evicts_other_workers(self):
+        worker_1 = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        worker_2 = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        listener = asyncio.create_task(worker_2.listen())
+        await asyncio.sleep(0)
+        user = User(id=1, email="test@example.com", username="test")
+        await worker_1.set(user.email, user)
+        await worker_2.get(user.email)
+        self.assertEqual(len(worker_2.local), 1)
+
+        await worker_1.invalidate(user.email)
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(worker_2.local), 0)
+        self.assertIsNone(await cache_manager.client.get(user.email))
+        listener.cancel()
+
+    async def test_cancelled_load_is_taken_over_by_a_waiter(self):
+        worker = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        user = User(id=1, email="test@example.com", username="test")
+        started = asyncio.Event()
+
+        async def hanging_load():
+            started.set()
+            await asyncio.sleep(60)
+
+        leader = asyncio.create_task(worker.get_or_load(user.email, hanging_load))
+        await started.wait()
+        follower = asyncio.create_task(worker.get_or_load(user.email, AsyncMock(return_value=user)))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        self.assertEqual((await follower).email, user.email)
+        self.assertEqual(worker.coalesced, 1)
+
+    async def test_entry_close_to_expiry_is_refreshed_early(self):
+        worker = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        user = User(id=1, email="test@example.com", username="test")
+        await cache_manager.client.set(user.email, UserSnapshot.from_user(user).encode(), ex=1)
+        worker.load_seconds = 0.5
+        load = AsyncMock(return_value=user)
+
+        with patch("src.services.cache.random.random", return_value=0.999999):
+            await worker.get_or_load(user.email, load)
+
+        load.assert_awaited_once()
+        self.assertEqual(worker.early_refreshes, 1)
+        self.assertEqual(await cache_manager.client.ttl(user.email), 300)
+
+    async def test_fresh_entry_is_not_refreshed(self):
+        worker = UserCache(local_size=10, local_ttl=60, redis_ttl=300)
+        user = User(id=1, email="test@example.com", username="test")
+        await worker.set(user.email, user)
+        worker.local.clear()
+        load = AsyncMock(return_value=user)
+
+        with patch("src.services.cache.random.random", return_value=0.999999):
+            await worker.get_or_load(user.email, load)
+
+        load.assert_not_awaited()
+        self.assertEqual(worker.redis_hits, 1)
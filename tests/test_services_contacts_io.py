@@ -0,0 +1,133 @@
+import io
+import json
+import tracemalloc
+import unittest
+from datetime import date
+
+from sqlalchemy import delete, insert
+
+from src.entity.models import Contact, User
+from src.services.contacts_io import (CONTACT_FIELDS, csv_header, detect_format, encode_csv, encode_ndjson,
+                                      encode_vcard, export_contacts, parse_csv, parse_ndjson, parse_vcard)
+from tests.conftest import TestingSessionLocal
+
+
+class TestParsers(unittest.TestCase):
+
+    def test_csv_keeps_contact_columns_and_blanks_as_none(self):
+        lines = io.StringIO("name,surname,email,phone,birthday,company\n"
+                            "Jon,Snow,jon@example.com,380501234567,,Night's Watch\n")
+
+        records = list(parse_csv(lines))
+
+        self.assertEqual(records, [(1, {"name": "Jon", "surname": "Snow", "email": "jon@example.com",
+                                        "phone": "380501234567", "birthday": None, "additional_data": None},
+                                    None)])
+
+    def test_ndjson_reports_broken_lines_and_skips_blank_ones(self):
+        lines = io.StringIO('{"name": "Jon"}\n\nnot json\n[1, 2]\n')
+
+        records = list(parse_ndjson(lines))
+
+        self.assertEqual([(number, error is None) for number, _, error in records], [(1, True), (2, False),
+                                                                                      (3, False)])
+        self.assertEqual(records[0][1]["name"], "Jon")
+        self.assertIsNone(records[0][1]["email"])
+
+    def test_vcard_unfolds_lines_and_maps_fields(self):
+        lines = io.StringIO("BEGIN:VCARD\r\n"
+                            "VERSION:3.0\r\n"
+                            "N:Stark;Arya;;;\r\n"
+                            "FN:Arya Stark\r\n"
+                            "item1.EMAIL;TYPE=INTERNET:arya@exa\r\n"
+                            " mple.com\r\n"
+                            "TEL;TYPE=CELL:380501112233\r\n"
+                            "TEL;TYPE=HOME:380500000000\r\n"
+                            "BDAY:19970311\r\n"
+                            "NOTE:Needle\\, Valar Morghulis\r\n"
+                            "END:VCARD\r\n"
+                            "BEGIN:VCARD\r\n"
+                            "FN:Hodor\r\n"
+                            "END:VCARD\r\n")
+
+        records = list(parse_vcard(lines))
+
+        self.assertEqual(records[0], (1, {"name": "Arya", "surname": "Stark", "email": "arya@example.com",
+                                          "phone": "380501112233", "birthday": "1997-03-11",
+                                          "additional_data": "Needle, Valar Morghulis"}, None))
+        self.assertEqual(records[1][0], 2)
+        self.assertEqual(records[1][1]["name"], "Hodor")
+        self.assertIsNone(records[1][1]["surname"])
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("book.CSV"), "csv")
+        self.assertEqual(detect_format("book.jsonl"), "ndjson")
+        self.assertEqual(detect_format("book.vcf"), "vcard")
+        self.assertIsNone(detect_format("book.xlsx"))
+        self.assertIsNone(detect_format(None))
+
+
+class TestEncoders(unittest.TestCase):
+
+    rows = [{"id": 1, "name": "Sansa", "surname": "Stark", "email": "sansa@example.com", "phone": "380501112244",
+             "birthday": date(1996, 2, 21), "additional_data": "Queen; in the North, \\o/\nWinterfell"},
+            {"id": 2, "name": "Hodor", "surname": "Hodor", "email": "hodor@example.com", "phone": "380501112255",
+             "birthday": None, "additional_data": None}]
+
+    def expected(self, row: dict) -> dict:
+        record = {field: row[field] for field in CONTACT_FIELDS}
+        record["birthday"] = row["birthday"].isoformat() if row["birthday"] else None
+        return record
+
+    def test_csv_round_trip(self):
+        lines = io.StringIO(csv_header() + encode_csv(self.rows), newline="")
+
+        self.assertEqual([record for _, record, _ in parse_csv(lines)], [self.expected(row) for row in self.rows])
+
+    def test_vcard_round_trip(self):
+        lines = io.StringIO(encode_vcard(self.rows), newline="")
+
+        self.assertEqual([record for _, record, _ in parse_vcard(lines)], [self.expected(row) for row in self.rows])
+
+    def test_ndjson_keeps_ids(self):
+        lines = encode_ndjson(self.rows).splitlines()
+
+        self.assertEqual([json.loads(line)["id"] for line in lines], [1, 2])
+        self.assertEqual(json.loads(lines[0])["birthday"], "1996-02-21")
+
+
+class TestExportContacts(unittest.IsolatedAsyncioTestCase):
+    rows = 50_000
+
+    async def asyncSetUp(self):
+        async with TestingSessionLocal() as session:
+            self.user = User(username="hotpie", email="hotpie@example.com", password="x", confirmed=True)
+            session.add(self.user)
+            await session.commit()
+            await session.execute(insert(Contact.__table__), [
+                {"name": f"Pie{n}", "surname": "Baker", "email": f"pie{n}@example.com", "phone": f"38060{n:07d}",
+                 "birthday": date(1990, 1, 1), "additional_data": "Crossroads Inn", "user_id": self.user.id}
+                for n in range(self.rows)])
+            await session.commit()
+
+    async def asyncTearDown(self):
+        async with TestingSessionLocal() as session:
+            await session.execute(delete(Contact).where(Contact.user_id == self.user.id))
+            await session.execute(delete(User).where(User.id == self.user.id))
+            await session.commit()
+
+    async def test_memory_stays_below_a_ceiling(self):
+        size = lines = 0
+        tracemalloc.start()
+        try:
+            async for chunk in export_contacts("csv", self.user, TestingSessionLocal):
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, self.rows + 1)
+        self.assertGreater(size, 3 * 2 ** 20)
+        # A fraction of the file itself: only one batch of rows is held at a time.
+        self.assertLess(peak, 2 * 2 ** 20)
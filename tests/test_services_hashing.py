@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import unittest
+
+from fastapi import HTTPException
+
+from src.services.hashing import HashingPool, build_context, hash_password, verify_password
+
+
+class TestBuildContext(unittest.TestCase):
+
+    def test_deprecated_scheme_is_rehashed_with_the_preferred_one(self):
+        old = build_context(["bcrypt"], 4, 2, 1024, 1).hash("secret")
+        context = build_context(["argon2", "bcrypt"], 4, 2, 1024, 1)
+
+        verified, new_hash = context.verify_and_update("secret", old)
+
+        self.assertTrue(verified)
+        self.assertTrue(new_hash.startswith("$argon2id$"))
+        self.assertFalse(context.needs_update(new_hash))
+
+    def test_cost_change_is_rehashed(self):
+        old = build_context(["bcrypt"], 4, 2, 1024, 1).hash("secret")
+
+        self.assertTrue(build_context(["bcrypt"], 5, 2, 1024, 1).needs_update(old))
+        self.assertFalse(build_context(["bcrypt"], 4, 2, 1024, 1).needs_update(old))
+
+    def test_wrong_password_is_not_rehashed(self):
+        old = build_context(["bcrypt"], 4, 2, 1024, 1).hash("secret")
+
+        self.assertEqual(build_context(["argon2", "bcrypt"], 4, 2, 1024, 1).verify_and_update("wrong", old),
+                         (False, None))
+
+
+class TestHashingPool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.pool = HashingPool(kind="thread", workers=1, max_pending=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    async def test_hash_and_verify_off_the_event_loop(self):
+        hashed = await self.pool.run(hash_password, "secret")
+
+        self.assertTrue(await self.pool.run(verify_password, "secret", hashed))
+        self.assertFalse(await self.pool.run(verify_password, "wrong", hashed))
+        self.assertEqual(self.pool.stats()["completed"], 3)
+
+    async def test_rejects_when_workers_and_queue_are_full(self):
+        release = threading.Event()
+        running = asyncio.ensure_future(self.pool.run(release.wait))
+        queued = asyncio.ensure_future(self.pool.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with self.assertRaises(HTTPException) as err:
+            await self.pool.run(release.wait)
+        self.assertEqual(err.exception.status_code, 503)
+        stats = self.pool.stats()
+        self.assertEqual((stats["in_flight"], stats["queued"], stats["rejected"]), (2, 1, 1))
+
+        release.set()
+        await asyncio.gather(running, queued)
+        self.assertEqual(self.pool.stats()["in_flight"], 0)
+
+    async def test_cancelled_caller_keeps_its_slot_until_the_job_ends(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        running = asyncio.ensure_future(self.pool.run(release.wait))
+        queued = asyncio.ensure_future(self.pool.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        running.cancel()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.pool.stats()["in_flight"], 2)
+        with self.assertRaises(HTTPException):
+            await self.pool.run(release.wait)
+
+        release.set()
+        await queued
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.pool.stats()["in_flight"], 0)
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+
+from src.services.cache import user_cache
+from src.services.metrics import Metrics, rate_limit_callback, route_template, metrics
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestRouteTemplate(unittest.TestCase):
+
+    def test_route_mount_and_unmatched(self):
+        route = MagicMock(path="/api/contacts/{contact_id}")
+
+        self.assertEqual(route_template({"route": route}), "/api/contacts/{contact_id}")
+        self.assertEqual(route_template({"endpoint": object(), "root_path": "/static"}), "/static")
+        self.assertEqual(route_template({}), "unmatched")
+
+
+class TestMetricsSync(unittest.TestCase):
+
+    def test_moves_requests_into_prometheus(self):
+        before = sample("http_request_duration_seconds_count", method="GET", route="/sync-test")
+        recorder = Metrics()
+        recorder.observe("GET", "/sync-test", 200, 0.02)
+        recorder.observe("GET", "/sync-test", 200, 0.3)
+        recorder.observe("GET", "/sync-test", 404, 0.001)
+
+        recorder.sync()
+        recorder.sync()
+
+        self.assertEqual(sample("http_requests_total", method="GET", route="/sync-test", status="200"), 2)
+        self.assertEqual(sample("http_requests_total", method="GET", route="/sync-test", status="404"), 1)
+        self.assertEqual(sample("http_request_duration_seconds_count", method="GET", route="/sync-test") - before, 3)
+        self.assertEqual(sample("http_request_duration_seconds_bucket", method="GET", route="/sync-test", le="0.025"),
+                         2)
+
+    def test_user_cache_counters_are_exported_as_deltas(self):
+        recorder = Metrics()
+        recorder.sync()
+        before = sample("user_cache_lookups_total", result="local_hit")
+        with patch.object(user_cache, "local_hits", user_cache.local_hits + 5):
+            recorder.sync()
+            recorder.sync()
+
+        self.assertEqual(sample("user_cache_lookups_total", result="local_hit") - before, 5)
+
+    def test_exports_pool_status(self):
+        Metrics().sync()
+
+        self.assertGreater(sample("db_pool_connections", database="primary", state="size"), 0)
+
+
+class TestRateLimitCallback(unittest.IsolatedAsyncioTestCase):
+
+    async def test_counts_and_rejects(self):
+        request = MagicMock(scope={"route": MagicMock(path="/api/users/avatar")})
+        before = metrics._rate_limited["/api/users/avatar"]
+
+        with self.assertRaises(HTTPException) as raised:
+            await rate_limit_callback(request, MagicMock(), 1500)
+
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(raised.exception.headers, {"Retry-After": "2"})
+        self.assertEqual(metrics._rate_limited["/api/users/avatar"] - before, 1)
+
+
+WORKER = """
+from src.services.metrics import metrics
+metrics.in_progress = 1
+metrics.observe("GET", "/api/contacts", 200, 0.01)
+metrics.sync()
+"""
+
+SCRAPE = """
+from src.services.metrics import metrics
+print(metrics.render().decode())
+"""
+
+
+class TestMultiprocess(unittest.TestCase):
+
+    def run_python(self, code: str, directory: str) -> str:
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+        return subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True,
+                              text=True, timeout=60).stdout
+
+    def test_aggregates_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.run_python(WORKER, directory)
+            self.run_python(WORKER, directory)
+
+            output = self.run_python(SCRAPE, directory)
+
+        self.assertIn('http_requests_total{method="GET",route="/api/contacts",status="200"} 2.0', output)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/api/contacts"} 2.0', output)
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middleware.profiler import ProfilerMiddleware
+from src.services.profiler import ProfileStore, RequestProfile, Sampler, sign_token, verify_token
+
+
+def profile(id: str, duration: float) -> RequestProfile:
+    return RequestProfile(id=id, method="GET", route="/", path="/", status=200, started_at=0, duration=duration,
+                          samples=1, stacks={("main", "handler"): 3, ("main",): 1})
+
+
+class TestTokens(unittest.TestCase):
+
+    def test_valid_token(self):
+        self.assertTrue(verify_token(sign_token("secret", int(time.time()) + 60), "secret"))
+
+    def test_rejects_expired_forged_and_malformed_tokens(self):
+        expires = int(time.time()) + 60
+        self.assertFalse(verify_token(sign_token("secret", int(time.time()) - 1), "secret"))
+        self.assertFalse(verify_token(sign_token("other", expires), "secret"))
+        self.assertFalse(verify_token(sign_token("secret", expires).replace(str(expires), str(expires + 1)),
+                                      "secret"))
+        self.assertFalse(verify_token("garbage", "secret"))
+        self.assertFalse(verify_token(sign_token("", expires), ""))
+
+
+class TestProfileStore(unittest.TestCase):
+
+    def test_keeps_recent_and_slowest(self):
+        store = ProfileStore(size=2)
+        for id, duration in (("a", 3.0), ("b", 0.1), ("c", 2.0), ("d", 0.2)):
+            store.add(profile(id, duration))
+
+        self.assertEqual([p.id for p in store.slowest()], ["a", "c"])
+        self.assertEqual(store.get("d").id, "d")
+        self.assertEqual(store.get("a").id, "a")
+        self.assertIsNone(store.get("b"))
+
+    def test_folded_stacks(self):
+        self.assertEqual(profile("a", 1).folded(), "main 1\nmain;handler 3\n")
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSampler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_samples_running_and_awaiting_stacks(self):
+        async def handler():
+            busy(0.1)
+            await asyncio.sleep(0.05)
+
+        task = asyncio.create_task(handler())
+        sampler = Sampler(task, interval=0.002)
+        sampler.start()
+        await task
+        sampler.stop()
+
+        stacks = list(sampler.stacks)
+        self.assertTrue(any(stack[0].startswith("TestSampler.test_samples_running_and_awaiting_stacks.<locals>"
+                                                ".handler") and stack[-1].startswith("busy") for stack in stacks))
+        self.assertTrue(any(stack[-1] == "[await]" for stack in stacks))
+        self.assertEqual(sampler.samples, sum(sampler.stacks.values()))
+
+
+class TestProfilerMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow():
+            busy(0.03)
+            return {}
+
+        self.store = ProfileStore(size=5)
+        app.add_middleware(ProfilerMiddleware, store=self.store, session_factory=None, secret="secret",
+                           interval=0.002)
+        self.client = TestClient(app)
+
+    def test_signed_header_profiles_the_request(self):
+        token = sign_token("secret", int(time.time()) + 60)
+
+        response = self.client.get("/slow", headers={"X-Profile-Token": token})
+
+        found = self.store.get(response.headers["x-profile-id"])
+        self.assertEqual((found.route, found.status), ("/slow", 200))
+        self.assertGreater(found.samples, 0)
+        self.assertIn("busy", found.folded())
+
+    def test_other_requests_are_not_profiled(self):
+        response = self.client.get("/slow", headers={"X-Profile-Token": sign_token("wrong", int(time.time()) + 60)})
+        self.assertNotIn("x-profile-id", response.headers)
+
+        response = self.client.get("/slow", params={"profile": "1"})
+        self.assertNotIn("x-profile-id", response.headers)
+        self.assertEqual(self.store.slowest(), [])
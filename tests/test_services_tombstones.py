@@ -0,0 +1,31 @@
+import contextlib
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from redis.exceptions import RedisError
+
+from src.services import tombstones
+from src.services.cache import cache_manager
+
+
+@contextlib.asynccontextmanager
+async def session_factory():
+    yield AsyncMock()
+
+
+class TestCompactOnce(unittest.IsolatedAsyncioTestCase):
+
+    async def test_one_worker_compacts_per_interval(self):
+        with patch.object(tombstones.repository_contacts, "compact_tombstones", AsyncMock(return_value=3)) as compact:
+            self.assertEqual(await tombstones.compact_once(session_factory), 3)
+            self.assertIsNone(await tombstones.compact_once(session_factory))
+
+        compact.assert_awaited_once()
+        self.assertGreater(await cache_manager.client.ttl(tombstones.COMPACTION_LOCK_KEY), 0)
+
+    async def test_compacts_without_redis(self):
+        with patch.object(cache_manager.client, "set", AsyncMock(side_effect=RedisError("down"))), \
+                patch.object(tombstones.repository_contacts, "compact_tombstones", AsyncMock(return_value=0)) as compact:
+            self.assertEqual(await tombstones.compact_once(session_factory), 0)
+
+        compact.assert_awaited_once()